@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark streaming appends onto a `TimeSeries`
+
+This compares appending many short buffers onto a growable `TimeSeries`
+(see `TimeSeries.reserve`) against the default `TimeSeries.append`, which
+re-allocates the output for every buffer.
+"""
+
+from __future__ import (division, print_function)
+
+import timeit
+
+import numpy
+
+from gwpy.timeseries import TimeSeries
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+
+SAMPLE_RATE = 16384
+
+
+def buffers(n):
+    """Create ``n`` one-second `TimeSeries`, as from a data stream
+    """
+    return [TimeSeries(numpy.random.random(SAMPLE_RATE),
+                       sample_rate=SAMPLE_RATE, epoch=i) for i in range(n)]
+
+
+def stream(data, capacity=None):
+    out = data[0].copy()
+    if capacity is not None:
+        out = out.reserve(capacity)
+    for ts in data[1:]:
+        out = out.append(ts)
+    return out.shrink_to_fit()
+
+
+def bench(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+if __name__ == '__main__':
+    for n in (64, 256, 1024):
+        data = buffers(n)
+        old = bench(lambda: stream(data))
+        new = bench(lambda: stream(data, capacity=SAMPLE_RATE))
+        pre = bench(lambda: stream(data, capacity=n * SAMPLE_RATE))
+        print("%d buffers: resize %.3fs, growable %.3fs (x%.1f), "
+              "reserved %.3fs (x%.1f)"
+              % (n, old, new, old / new, pre, old / pre))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark `TimeSeries.average_fft` and `TimeSeries.fftgram`
+
+This compares the batched strided-FFT implementation against the
+segment-by-segment loop it replaced.
+"""
+
+from __future__ import (division, print_function)
+
+import timeit
+
+import numpy
+from scipy import signal
+
+from gwpy.timeseries import TimeSeries
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+
+DURATION = 600
+SAMPLE_RATE = 16384
+FFTLENGTH = 1
+OVERLAP = .5
+
+
+def average_fft_loop(ts, fftlength, overlap, window):
+    """The original segment-by-segment `average_fft` implementation
+    """
+    nfft = int(fftlength * ts.sample_rate.value)
+    nstride = nfft - int(overlap * ts.sample_rate.value)
+    win = signal.get_window(window, nfft)
+    ffts = [(ts[i:i+nfft].detrend() * win).fft(nfft=nfft).value for
+            i in range(0, ts.size - nfft + 1, nstride)]
+    return numpy.mean(ffts, axis=0) / win.mean()
+
+
+def fftgram_loop(ts, stride):
+    """The original segment-by-segment `fftgram` implementation
+    """
+    nfft = int(stride * ts.sample_rate.value)
+    return numpy.asarray([ts[i:i+nfft].fft().value for
+                          i in range(0, ts.size - nfft + 1, nfft)])
+
+
+def bench(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+if __name__ == '__main__':
+    data = TimeSeries(numpy.random.normal(size=DURATION * SAMPLE_RATE),
+                      sample_rate=SAMPLE_RATE)
+    print("Data: %d seconds at %d Hz" % (DURATION, SAMPLE_RATE))
+
+    old = bench(lambda: average_fft_loop(data, FFTLENGTH, OVERLAP, 'hanning'))
+    new = bench(lambda: data.average_fft(FFTLENGTH, OVERLAP, 'hanning'))
+    print("average_fft: loop %.3fs, batched %.3fs (x%.1f)"
+          % (old, new, old / new))
+
+    old = bench(lambda: fftgram_loop(data, FFTLENGTH))
+    new = bench(lambda: data.fftgram(FFTLENGTH))
+    print("fftgram:     loop %.3fs, batched %.3fs (x%.1f)"
+          % (old, new, old / new))
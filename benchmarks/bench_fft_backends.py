@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark the available `gwpy.fft` backends
+
+This times a batch of real-input FFTs, and `TimeSeries.spectrogram`,
+using each backend that can be imported.
+"""
+
+from __future__ import (division, print_function)
+
+import timeit
+
+import numpy
+
+from gwpy import fft
+from gwpy.timeseries import TimeSeries
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+
+DURATION = 3600
+SAMPLE_RATE = 4096
+STRIDE = 20
+FFTLENGTH = 4
+OVERLAP = 2
+
+BACKENDS = [
+    ('numpy', {}),
+    ('scipy', {}),
+    ('scipy', {'workers': -1}),
+    ('pyfftw', {}),
+    ('pyfftw', {'threads': 4}),
+]
+
+
+def bench(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+if __name__ == '__main__':
+    data = TimeSeries(numpy.random.normal(size=DURATION * SAMPLE_RATE),
+                      sample_rate=SAMPLE_RATE)
+    nfft = FFTLENGTH * SAMPLE_RATE
+    block = numpy.random.normal(size=(256, nfft))
+    print("Data: %d seconds at %d Hz" % (DURATION, SAMPLE_RATE))
+    for name, kwargs in BACKENDS:
+        label = name + ''.join(', %s=%s' % kw for kw in kwargs.items())
+        try:
+            with fft.backend(name, **kwargs):
+                fft.rfft(block)  # warm up plans
+                tfft = bench(lambda: fft.rfft(block, axis=-1))
+                tspec = bench(lambda: data.spectrogram(STRIDE, FFTLENGTH,
+                                                       OVERLAP))
+        except ImportError as e:
+            print("%s: skipped (%s)" % (label, e))
+            continue
+        print("%s: rfft(256 x %d) %.3fs, spectrogram %.3fs"
+              % (label, nfft, tfft, tspec))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark reading many short GWF files with frameCPP
+
+This compares the preallocating `read_timeseriesdict` against the
+original method of appending the data from each file onto the output,
+which copies all of the data read so far for every new file.
+"""
+
+from __future__ import (division, print_function)
+
+import os
+import shutil
+import tempfile
+import timeit
+
+import numpy
+
+from gwpy.timeseries import (TimeSeries, TimeSeriesDict)
+from gwpy.timeseries.io.gwf import framecpp
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+
+EPOCH = 1000000000
+SAMPLE_RATE = 4096
+NCHANNELS = 4
+
+
+def write_frames(directory, nfiles):
+    """Write ``nfiles`` one-second GWF files of random data
+    """
+    channels = ['X1:TEST-%d' % i for i in range(NCHANNELS)]
+    files = []
+    for i in range(nfiles):
+        gps = EPOCH + i
+        tsd = TimeSeriesDict()
+        for c in channels:
+            tsd[c] = TimeSeries(numpy.random.random(SAMPLE_RATE),
+                                sample_rate=SAMPLE_RATE, epoch=gps,
+                                name=c, channel=c)
+        fp = os.path.join(directory, 'X-TEST-%d-1.gwf' % gps)
+        tsd.write(fp, format='framecpp')
+        files.append(fp)
+    return channels, files
+
+
+def append_loop(files, channels):
+    """Read each file and append it onto the output
+
+    Returns the output and the number of samples copied
+    """
+    out = TimeSeriesDict()
+    ncopy = 0
+    for fp in files:
+        new = framecpp._read_frame(fp, channels, dtype={})
+        for c in out:
+            ncopy += out[c].size + new[c].size  # resize, then fill
+        out.append(new, copy=False)
+    return out, ncopy
+
+
+def preallocated_loop(files, channels):
+    """Read each file directly into preallocated output arrays
+
+    This is what `read_timeseriesdict` does, returns the output and the
+    number of samples copied
+    """
+    out = TimeSeriesDict()
+    nsamp = {}
+    ncopy = 0
+    for fp in files:
+        before = dict(nsamp)
+        sizes = dict((c, out[c].size) for c in out)
+        framecpp._read_frame(fp, channels, dtype={}, out=out, nsamp=nsamp,
+                             duration=len(files))
+        for c in out:
+            ncopy += nsamp[c] - before.get(c, 0)  # fill
+            if c in sizes and out[c].size != sizes[c]:
+                ncopy += before[c]  # resize
+    return out, ncopy
+
+
+def bench(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+if __name__ == '__main__':
+    tmpdir = tempfile.mkdtemp()
+    try:
+        channels, files = write_frames(tmpdir, 512)
+        for nfiles in (64, 128, 256, 512):
+            sub = files[:nfiles]
+            ncopy = append_loop(sub, channels)[1]
+            nsamp = preallocated_loop(sub, channels)[1]
+            old = bench(lambda: append_loop(sub, channels))
+            new = bench(lambda: TimeSeriesDict.read(sub, channels,
+                                                    format='framecpp'))
+            print("%d files: append %.3fs (%d samples copied), "
+                  "preallocated %.3fs (%d samples copied) (x%.1f)"
+                  % (nfiles, old, ncopy, new, nsamp, old / new))
+    finally:
+        shutil.rmtree(tmpdir)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark joining many short `TimeSeries`
+
+This compares the single-allocation `TimeSeriesList.join` and
+`TimeSeriesList.coalesce` against the original method of appending each
+element onto a copy of the first, which resizes the output for every
+element.
+"""
+
+from __future__ import (division, print_function)
+
+import timeit
+
+import numpy
+
+from gwpy.timeseries import (TimeSeries, TimeSeriesList)
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+
+SAMPLE_RATE = 256
+
+
+def create(n, gap=0):
+    """Create a list of ``n`` one-second `TimeSeries`
+
+    A gap is left after every ``gap`` elements, if given
+    """
+    tsl = TimeSeriesList()
+    epoch = 0
+    for i in range(n):
+        if gap and i and not i % gap:
+            epoch += 1
+        tsl.append(TimeSeries(numpy.random.random(SAMPLE_RATE),
+                              sample_rate=SAMPLE_RATE, epoch=epoch))
+        epoch += 1
+    return tsl
+
+
+def append_loop(tsl, pad=0.0, gap='raise'):
+    """Join a list by appending each element onto the first
+    """
+    tsl.sort(key=lambda t: t.epoch.gps)
+    out = tsl[0].copy()
+    for ts in tsl[1:]:
+        out.append(ts, gap=gap, pad=pad)
+    return out
+
+
+def bench(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+if __name__ == '__main__':
+    for n in (1000, 2000, 4000, 8000):
+        tsl = create(n)
+        old = bench(lambda: append_loop(tsl))
+        new = bench(lambda: tsl.join())
+        print("join %d segments: append %.3fs, preallocated %.3fs (x%.1f)"
+              % (n, old, new, old / new))
+        gappy = create(n, gap=10)
+        old = bench(lambda: append_loop(gappy, gap='pad'))
+        new = bench(lambda: gappy.join(gap='pad'))
+        print("join %d segments with gaps: append %.3fs, preallocated %.3fs "
+              "(x%.1f)" % (n, old, new, old / new))
+        new = bench(lambda: TimeSeriesList(*gappy).coalesce())
+        print("coalesce %d segments into %d: %.3fs"
+              % (n, len(TimeSeriesList(*gappy).coalesce()), new))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark a fixed-duration online data buffer
+
+This compares `RingTimeSeries.update` against `TimeSeries.update`, which
+shifts all of the stored data for every new buffer.
+"""
+
+from __future__ import (division, print_function)
+
+import timeit
+
+import numpy
+
+from gwpy.timeseries import (TimeSeries, RingTimeSeries)
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+
+SAMPLE_RATE = 16384
+NUPDATES = 16
+
+
+def buffers(start, n):
+    return [TimeSeries(numpy.random.random(SAMPLE_RATE),
+                       sample_rate=SAMPLE_RATE, epoch=start + i) for
+            i in range(n)]
+
+
+def bench(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+if __name__ == '__main__':
+    for duration in (60, 600, 3600):
+        data = TimeSeries(numpy.random.random(duration * SAMPLE_RATE),
+                          sample_rate=SAMPLE_RATE, epoch=0)
+        new = buffers(duration, NUPDATES)
+
+        def shift():
+            ts = data.copy()
+            for buffer_ in new:
+                ts.update(buffer_)
+
+        def ring():
+            ring_ = RingTimeSeries(duration).update(data)
+            for buffer_ in new:
+                ring_.update(buffer_)
+
+        old = bench(shift)
+        new_ = bench(ring)
+        print("%d seconds, %d updates: shift %.3fs, ring %.3fs (x%.1f)"
+              % (duration, NUPDATES, old, new_, old / new_))
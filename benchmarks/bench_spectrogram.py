@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark `TimeSeries.spectrogram`
+
+This compares the single-pass batched Welch implementation against
+calling `TimeSeries.psd` for each stride.
+"""
+
+from __future__ import (division, print_function)
+
+import timeit
+
+import numpy
+
+from gwpy.timeseries import TimeSeries
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+
+DURATION = 3600
+SAMPLE_RATE = 4096
+STRIDE = 20
+FFTLENGTH = 4
+OVERLAP = 2
+
+
+def spectrogram_loop(ts, stride, fftlength, overlap):
+    """Calculate a spectrogram by calling `TimeSeries.psd` for each stride
+    """
+    nsamp = int(stride * ts.sample_rate.value)
+    return numpy.asarray([
+        ts[i:i+nsamp].psd(fftlength, overlap, window='hanning').value for
+        i in range(0, ts.size - nsamp + 1, nsamp)])
+
+
+def bench(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+if __name__ == '__main__':
+    data = TimeSeries(numpy.random.normal(size=DURATION * SAMPLE_RATE),
+                      sample_rate=SAMPLE_RATE)
+    print("Data: %d seconds at %d Hz" % (DURATION, SAMPLE_RATE))
+    old = bench(lambda: spectrogram_loop(data, STRIDE, FFTLENGTH, OVERLAP))
+    new = bench(lambda: data.spectrogram(STRIDE, FFTLENGTH, OVERLAP))
+    print("spectrogram: per-stride %.3fs, batched %.3fs (x%.1f)"
+          % (old, new, old / new))
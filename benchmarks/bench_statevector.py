@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark `StateVector` bit operations
+
+This compares the vectorised `StateVector.boolean`, `StateVector.resample`,
+and `StateVector.to_dqflags` against the original per-sample loops.
+"""
+
+from __future__ import (division, print_function)
+
+import timeit
+
+import numpy
+
+from gwpy.timeseries import StateVector
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+
+DURATION = 86400
+SAMPLE_RATE = 16
+NBITS = 32
+
+
+def boolean_loop(sv):
+    """Unpack bits by looping over each sample
+    """
+    nbits = len(sv.bits)
+    boolean = numpy.zeros((sv.size, nbits), dtype=bool)
+    for i, d in enumerate(sv.value):
+        boolean[i, :] = [int(d) >> j & 1 for j in range(nbits)]
+    return boolean
+
+
+def resample_loop(sv, rate):
+    """Downsample by looping over each new sample and bit
+    """
+    factor = int(sv.sample_rate.value / rate)
+    old = sv.value.reshape((sv.size // factor, factor))
+    type_ = sv.dtype.type
+    return numpy.array([
+        numpy.sum([type_((x >> bit & 1).all() * (2 ** bit)) for
+                   bit in range(len(sv.bits))], dtype=sv.dtype) for
+        x in old])
+
+
+def bench(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def new(sv):
+    """Return a copy of ``sv`` without any cached attributes
+    """
+    return StateVector(sv.value, sample_rate=sv.sample_rate)
+
+
+if __name__ == '__main__':
+    # generate slowly-varying random bits
+    size = DURATION * SAMPLE_RATE
+    flips = numpy.random.random((size, NBITS)) < 1e-3
+    bits = numpy.cumsum(flips, axis=0) % 2
+    data = (bits * (2 ** numpy.arange(NBITS))).sum(axis=1).astype('uint32')
+    sv = StateVector(data, sample_rate=SAMPLE_RATE)
+    print("Data: %d seconds at %d Hz" % (DURATION, SAMPLE_RATE))
+
+    old = bench(lambda: boolean_loop(sv), number=1)
+    vec = bench(lambda: new(sv).boolean)
+    print("boolean: loop %.3fs, vectorised %.3fs (x%.1f)"
+          % (old, vec, old / vec))
+
+    old = bench(lambda: resample_loop(sv, 1), number=1)
+    vec = bench(lambda: sv.resample(1))
+    print("resample: loop %.3fs, vectorised %.3fs (x%.1f)"
+          % (old, vec, old / vec))
+
+    vec = bench(lambda: new(sv).to_dqflags())
+    print("to_dqflags: %.3fs" % vec)
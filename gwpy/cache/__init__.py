@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Local on-disk cache of data retrieved from remote sources
+
+When enabled, the data returned by `TimeSeriesDict.get`,
+`TimeSeriesDict.fetch`, and `TimeSeriesDict.find` (and the equivalent
+`TimeSeries` methods) are stored for each channel in a local directory.
+Later requests for the same channel, made with the same method and the
+same arguments (e.g. ``dtype``, or the NDS ``host``), are served from disk
+where possible,
+with only the missing parts of the requested interval retrieved from the
+original source.
+
+The cache is disabled by default, and can be enabled for all calls with
+`enable`::
+
+    >>> from gwpy import cache
+    >>> cache.enable()
+    >>> data = TimeSeries.get('H1:LDAS-STRAIN', 968654552, 968654562)
+
+or for a single call with the ``cache`` keyword argument::
+
+    >>> data = TimeSeries.get('H1:LDAS-STRAIN', 968654552, 968654562,
+    ...                       cache='/tmp/gwpy-cache')
+
+The total size of the stored data is limited, with the least recently
+used data removed first, and a single directory can be shared by several
+processes.
+"""
+
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+from .datacache import (DataCache, enable, disable, get_default, with_cache,
+                        request_tag)
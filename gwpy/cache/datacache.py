@@ -0,0 +1,535 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""On-disk cache of time-series data
+"""
+
+from __future__ import division
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy
+
+try:
+    import fcntl
+except ImportError:  # not POSIX
+    fcntl = None
+
+from ..segments import (Segment, SegmentList)
+from ..time import to_gps
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+__all__ = ['DataCache', 'enable', 'disable', 'get_default', 'with_cache',
+           'request_tag']
+
+DEFAULT_DIRECTORY_ENV = 'GWPY_CACHE_DIR'
+
+#: default maximum size (bytes) of the cache on disk
+DEFAULT_MAXSIZE = 2 * 1024 ** 3
+
+INDEX_FILE = 'index.json'
+LOCK_FILE = '.lock'
+
+#: keyword arguments of cached methods that don't affect the data returned
+IGNORED_KWARGS = ('verbose', 'nproc', 'pad', 'verify', 'concurrency')
+
+_DEFAULT = {}
+
+
+class DataCache(object):
+    """Directory of time-series data, indexed by channel and GPS segment
+
+    Data are stored as compressed chunks, one for each request made to the
+    underlying data source. Requests that are fully covered by stored data
+    are served directly, while only the missing sub-segments of partially
+    covered requests are retrieved.
+
+    Data are indexed by channel and an optional ``tag`` that identifies
+    the other parameters of the request (e.g. the data type, or the NDS
+    host), so that data retrieved in different ways are stored separately.
+
+    Parameters
+    ----------
+    directory : `str`, optional
+        path of cache directory, defaults to the value of the
+        ``GWPY_CACHE_DIR`` environment variable, otherwise
+        ``~/.cache/gwpy``
+    maxsize : `int`, optional
+        maximum total size (bytes) of the stored data, when this is
+        exceeded the least recently used chunks are removed,
+        default: `DEFAULT_MAXSIZE`
+
+    Notes
+    -----
+    The index of the cache is protected by a file lock, so the same
+    directory can be shared by multiple processes. Only the index is
+    locked, so data for the same channel and interval may occasionally be
+    retrieved by two processes at once, in which case only the first is
+    stored.
+    """
+    def __init__(self, directory=None, maxsize=DEFAULT_MAXSIZE):
+        if directory is None:
+            directory = os.getenv(DEFAULT_DIRECTORY_ENV, os.path.join(
+                os.path.expanduser('~'), '.cache', 'gwpy'))
+        self.directory = os.path.abspath(directory)
+        self.maxsize = maxsize
+        self.stats = {'hits': 0, 'partial': 0, 'misses': 0}
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:  # made by another process
+                if not os.path.isdir(self.directory):
+                    raise
+
+    def __repr__(self):
+        return '<%s(%r, maxsize=%d)>' % (type(self).__name__,
+                                         self.directory, self.maxsize)
+
+    # -- index ----------------------------------
+
+    @contextmanager
+    def _index(self, write=True):
+        """Lock and load the index, saving any changes afterwards
+        """
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, write and fcntl.LOCK_EX or fcntl.LOCK_SH)
+            try:
+                index = self._read_index()
+                yield index
+                if write:
+                    self._write_index(index)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        # write to a temporary file, then move into place, so that the
+        # index is never left half-written
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(index, f)
+        os.rename(tmp, os.path.join(self.directory, INDEX_FILE))
+
+    @staticmethod
+    def _key(channel, tag=None):
+        """Return the index key for this channel and request tag
+        """
+        if tag:
+            return '%s;%s' % (str(channel), tag)
+        return str(channel)
+
+    @staticmethod
+    def _chunk_name(key, segment):
+        """Return the relative path of the chunk for this key and segment
+        """
+        tag = re.sub(r'[^\w.-]', '_', key)
+        digest = hashlib.md5(key.encode('utf-8')).hexdigest()[:8]
+        return os.path.join('%s-%s' % (tag, digest), '%s-%s.npz'
+                            % (repr(segment[0]), repr(segment[1])))
+
+    # -- public methods -------------------------
+
+    @property
+    def size(self):
+        """Total size (bytes) of the data stored in this cache
+        """
+        with self._index(write=False) as index:
+            return sum(chunk[3] for chunks in index.itervalues()
+                       for chunk in chunks)
+
+    def coverage(self, channel, tag=None):
+        """Return the segments for which data are stored for a channel
+
+        Parameters
+        ----------
+        channel : `str`, `~gwpy.detector.Channel`
+            the channel of interest
+        tag : `str`, optional
+            identifier of the request parameters, see `request_tag`
+
+        Returns
+        -------
+        segments : `~gwpy.segments.SegmentList`
+            the coalesced list of stored segments
+        """
+        with self._index(write=False) as index:
+            return SegmentList(Segment(c[0], c[1]) for c in
+                               index.get(self._key(channel, tag),
+                                         [])).coalesce()
+
+    def read(self, channel, start, end, series_class, tag=None):
+        """Read all stored data for a channel overlapping an interval
+
+        Parameters
+        ----------
+        channel : `str`, `~gwpy.detector.Channel`
+            the channel of interest
+        start : `float`
+            GPS start time of interval
+        end : `float`
+            GPS end time of interval
+        series_class : `type`
+            the type of series to return, e.g. `TimeSeries`
+        tag : `str`, optional
+            identifier of the request parameters, see `request_tag`
+
+        Returns
+        -------
+        data : `list`
+            a `list` of ``series_class`` objects, one for each chunk
+        coverage : `~gwpy.segments.SegmentList`
+            the parts of ``[start, end)`` covered by the data
+        """
+        key = self._key(channel, tag)
+        span = Segment(start, end)
+        now = time.time()
+        found = []
+        with self._index() as index:
+            for chunk in index.get(key, []):
+                seg = Segment(chunk[0], chunk[1])
+                if seg.intersects(span):
+                    chunk[4] = now
+                    found.append((seg, chunk[2]))
+        out = []
+        coverage = SegmentList()
+        for seg, path in found:
+            try:
+                out.append(self._load(path, series_class, span))
+            except (IOError, OSError, ValueError, KeyError):
+                continue  # evicted by another process, or corrupt
+            coverage.append(seg & span)
+        return out, coverage.coalesce()
+
+    def _load(self, path, series_class, span):
+        """Load a single chunk, cropped to the given span
+        """
+        npz = numpy.load(os.path.join(self.directory, path))
+        try:
+            meta = json.loads(str(npz['metadata']))
+            data = series_class(npz['data'], epoch=meta['x0'],
+                                sample_rate=meta['sample_rate'],
+                                unit=meta['unit'], name=meta['name'],
+                                channel=meta['channel'], copy=False)
+        finally:
+            npz.close()
+        if not data.size:
+            return data
+        start, end = data.span
+        return data.crop(max(start, span[0]), min(end, span[1]))
+
+    def store(self, channel, segment, data, tag=None):
+        """Store data for a channel
+
+        Parameters
+        ----------
+        channel : `str`, `~gwpy.detector.Channel`
+            the channel of interest
+        segment : `~gwpy.segments.Segment`
+            the interval for which these data were requested, this may
+            differ from the span of the data by up to one sample
+        data : `~gwpy.timeseries.TimeSeries`
+            the data to store
+        tag : `str`, optional
+            identifier of the request parameters, see `request_tag`
+        """
+        key = self._key(channel, tag)
+        segment = Segment(float(segment[0]), float(segment[1]))
+        path = self._chunk_name(key, segment)
+        target = os.path.join(self.directory, path)
+        if not os.path.isdir(os.path.dirname(target)):
+            try:
+                os.makedirs(os.path.dirname(target))
+            except OSError:
+                if not os.path.isdir(os.path.dirname(target)):
+                    raise
+        metadata = {
+            'x0': data.x0.value,
+            'sample_rate': data.sample_rate.value,
+            'unit': str(data.unit),
+            'name': data.name,
+            'channel': data.channel and data.channel.ndsname or None,
+        }
+        # write to a temporary file in the same directory, then move
+        # into place
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target),
+                                   suffix='.npz')
+        with os.fdopen(fd, 'wb') as f:
+            numpy.savez_compressed(f, data=data.value,
+                                   metadata=json.dumps(metadata))
+        with self._index() as index:
+            chunks = index.setdefault(key, [])
+            # another process may have stored these data already
+            if any(Segment(c[0], c[1]).intersects(segment) for c in chunks):
+                os.remove(tmp)
+                return
+            os.rename(tmp, target)
+            chunks.append([segment[0], segment[1], path,
+                           os.path.getsize(target), time.time()])
+            chunks.sort()
+            self._evict(index)
+
+    def _evict(self, index):
+        """Remove the least recently used chunks until within `maxsize`
+        """
+        chunks = sorted((chunk[4], key, chunk) for key in index
+                        for chunk in index[key])
+        total = sum(chunk[3] for _, _, chunk in chunks)
+        while chunks and total > self.maxsize:
+            _, key, chunk = chunks.pop(0)
+            index[key].remove(chunk)
+            if not index[key]:
+                index.pop(key)
+            total -= chunk[3]
+            try:
+                os.remove(os.path.join(self.directory, chunk[2]))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove all data from this cache
+        """
+        with self._index() as index:
+            for chunks in index.itervalues():
+                for chunk in chunks:
+                    try:
+                        os.remove(os.path.join(self.directory, chunk[2]))
+                    except OSError:
+                        pass
+            index.clear()
+
+    def get(self, cls, channels, start, end, retrieve, pad=None, tag=None):
+        """Get data for a number of channels, using stored data if possible
+
+        Parameters
+        ----------
+        cls : `type`
+            the type of dict to return, e.g. `TimeSeriesDict`
+        channels : `list`
+            the channels of interest
+        start : `~gwpy.time.LIGOTimeGPS`, `float`, `str`
+            GPS start time of interval
+        end : `~gwpy.time.LIGOTimeGPS`, `float`, `str`
+            GPS end time of interval
+        retrieve : `callable`
+            method to call as ``retrieve(channels, start, end)`` to
+            retrieve data that aren't stored, returning an instance of
+            ``cls``
+        pad : `float`, optional
+            value with which to fill gaps, if given, data retrieved with
+            gaps may be padded, so are not stored
+        tag : `str`, optional
+            identifier of the request parameters, see `request_tag`,
+            data are only shared between requests with the same tag
+
+        Returns
+        -------
+        data : ``cls``
+            the data for each channel
+        """
+        from ..timeseries.core import _join
+        start = float(to_gps(start))
+        end = float(to_gps(end))
+        span = SegmentList([Segment(start, end)])
+
+        # read stored data, and work out what is missing for each channel
+        pieces = {}
+        missing = {}
+        for channel in channels:
+            pieces[channel], coverage = self.read(channel, start, end,
+                                                  cls.EntryClass, tag=tag)
+            need = span - coverage
+            if not abs(need):
+                self.stats['hits'] += 1
+            elif abs(coverage):
+                self.stats['partial'] += 1
+            else:
+                self.stats['misses'] += 1
+            missing.setdefault(tuple(map(tuple, need)), []).append(channel)
+
+        # retrieve missing data, grouping channels that need the same
+        # segments into a single request
+        for segments, group in missing.iteritems():
+            for seg in segments:
+                new = retrieve(group, seg[0], seg[1])
+                for channel in group:
+                    pieces[channel].append(new[channel])
+                    if pad is None:
+                        self.store(channel, seg, new[channel], tag=tag)
+
+        # join everything together
+        out = cls()
+        for channel in channels:
+            data = sorted((p for p in pieces[channel] if p.size),
+                          key=lambda x: x.span[0])
+            if not data:  # nothing to join, use whatever we have
+                out[channel] = pieces[channel][0]
+            else:
+                out[channel] = _join(data, pad=pad or 0.0,
+                                     gap=pad is None and 'raise' or 'pad')
+        return out
+
+
+# -- default cache ------------------------------------------------------------
+
+def enable(directory=None, maxsize=DEFAULT_MAXSIZE):
+    """Use a `DataCache` for all calls to `get`, `fetch`, and `find`
+
+    Parameters
+    ----------
+    directory : `str`, optional
+        path of cache directory, see `DataCache`
+    maxsize : `int`, optional
+        maximum total size (bytes) of the stored data
+
+    Returns
+    -------
+    cache : `DataCache`
+        the new default cache
+
+    Examples
+    --------
+    >>> from gwpy import cache
+    >>> cache.enable('/tmp/gwpy-cache')
+    >>> data = TimeSeries.get('L1:IMC-PWR_IN_OUT_DQ', 'Jan 1', 'Jan 2')
+    """
+    _DEFAULT['cache'] = cache = DataCache(directory, maxsize=maxsize)
+    return cache
+
+
+def disable():
+    """Stop using the default `DataCache`
+    """
+    _DEFAULT.pop('cache', None)
+
+
+def get_default():
+    """Return the default `DataCache`, or `None` if not enabled
+    """
+    return _DEFAULT.get('cache', None)
+
+
+def _resolve(cache):
+    """Return the `DataCache` to use given the ``cache`` keyword argument
+    """
+    if cache is None:
+        return get_default()
+    if cache is False:
+        return None
+    if isinstance(cache, DataCache):
+        return cache
+    return DataCache(cache)
+
+
+def _normalise(value):
+    """Convert a request parameter into something JSON can sort and dump
+    """
+    if isinstance(value, dict):
+        return dict((str(k), _normalise(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_normalise(v) for v in value]
+    if value is None or isinstance(value, (bool, int, long, float)):
+        return value
+    return str(value)
+
+
+def request_tag(method, *args, **kwargs):
+    """Return a tag identifying the parameters of a data request
+
+    Parameters
+    ----------
+    method : `str`
+        the name of the method used to retrieve the data,
+        e.g. ``'fetch'``
+    *args, **kwargs
+        the other arguments of the request (excluding the channels and
+        the GPS interval), keyword arguments that don't change the data
+        (see `IGNORED_KWARGS`) are ignored
+
+    Returns
+    -------
+    tag : `str`
+        ``method`` followed by a hash of the request parameters
+
+    Raises
+    ------
+    TypeError
+        if the parameters cannot be identified, e.g. if an NDS
+        connection is given whose host cannot be determined
+    """
+    params = dict((key, value) for (key, value) in kwargs.items() if
+                  key not in IGNORED_KWARGS)
+    # identify open connections by their host, not by the object
+    connection = params.pop('connection', None)
+    if connection is not None:
+        try:
+            params['host'] = connection.get_host()
+            params['port'] = connection.get_port()
+        except AttributeError:
+            raise TypeError("Cannot identify NDS connection %r" % connection)
+    spec = json.dumps([_normalise(list(args)), _normalise(params)],
+                      sort_keys=True)
+    return '%s-%s' % (method, hashlib.md5(spec.encode('utf-8')).hexdigest())
+
+
+def with_cache(func):
+    """Decorate a method to retrieve data using a `DataCache`
+
+    The decorated method must have the signature
+    ``func(cls, channels, start, end, ...)`` and return an instance of
+    ``cls``. An optional ``cache`` keyword argument is added, which can
+    be a `DataCache`, a path to a cache directory, `None` to use the
+    default cache (if `enable` has been called), or `False` to not use
+    any cache.
+
+    Data are stored separately for each method, and for each set of
+    arguments that affect the data returned, see `request_tag`.
+    """
+    @wraps(func)
+    def wrapped(cls, channels, start, end, *args, **kwargs):
+        cache = _resolve(kwargs.pop('cache', None))
+        if cache is not None:
+            try:
+                tag = request_tag(func.__name__, *args, **kwargs)
+            except TypeError:  # can't tell requests apart, so don't cache
+                cache = None
+        if cache is None:
+            return func(cls, channels, start, end, *args, **kwargs)
+
+        def _retrieve(channels_, start_, end_):
+            return func(cls, channels_, start_, end_, *args, **kwargs)
+
+        return cache.get(cls, channels, start, end, _retrieve,
+                         pad=kwargs.get('pad', None), tag=tag)
+    return wrapped
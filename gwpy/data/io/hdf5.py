@@ -25,15 +25,19 @@ from astropy.time import Time
 from ... import version
 from ...detector import Channel
 from ...io import (hdf5 as hdf5io, registry)
+from ...time import to_gps
 from ...utils.deps import with_import
 from .. import (Array, Series, Array2D)
 
 __author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
 __version__ = version.version
 
+# (offset, spacing) metadata pairs that define the x-axis of a dataset
+XAXIS_ATTRS = [('x0', 'dx'), ('epoch', 'dt')]
+
 
 @with_import('h5py')
-def array_from_hdf5(f, name=None, array_type=Array):
+def array_from_hdf5(f, name=None, array_type=Array, start=None, end=None):
     """Read an `Array` from the given HDF5 object
 
     Parameters
@@ -46,6 +50,19 @@ def array_from_hdf5(f, name=None, array_type=Array):
 
     name : `str`
         path in HDF hierarchy of dataset.
+
+    start : `~gwpy.time.LIGOTimeGPS`, `float`, `str`, optional
+        x-axis value (e.g. GPS start time) from which to read data,
+        defaults to the start of the dataset
+
+    end : `~gwpy.time.LIGOTimeGPS`, `float`, `str`, optional
+        x-axis value (e.g. GPS end time) at which to stop reading data,
+        defaults to the end of the dataset
+
+    Notes
+    -----
+    If ``start`` or ``end`` are given, only the relevant samples of the
+    dataset are read from disk.
     """
     h5file = hdf5io.open_hdf5(f)
 
@@ -73,7 +90,12 @@ def array_from_hdf5(f, name=None, array_type=Array):
                     raise
 
         # read array, close file, and return
-        out = array_type(dataset[()], **dict(dataset.attrs))
+        attrs = dict(dataset.attrs)
+        if start is None and end is None:
+            out = array_type(dataset[()], **attrs)
+        else:
+            slice_ = _hyperslab(dataset, attrs, start, end)
+            out = array_type(dataset[slice_], **attrs)
     finally:
         if not isinstance(f, (h5py.Dataset, h5py.Group)):
             h5file.close()
@@ -81,6 +103,30 @@ def array_from_hdf5(f, name=None, array_type=Array):
     return out
 
 
+def _hyperslab(dataset, attrs, start, end):
+    """Find the slice of ``dataset`` to read for the given x-axis span
+
+    The x-axis offset in ``attrs`` is updated in place to match the
+    returned slice.
+    """
+    for x0key, dxkey in XAXIS_ATTRS:
+        if x0key in attrs and dxkey in attrs:
+            break
+    else:
+        raise ValueError("Cannot determine the x-axis of HDF5 dataset %r, "
+                         "please read without start= or end="
+                         % dataset.name)
+    x0 = float(attrs[x0key])
+    dx = float(attrs[dxkey])
+    if start is not None:
+        start = float(to_gps(start))
+    if end is not None:
+        end = float(to_gps(end))
+    slice_ = hdf5io.hyperslab(dataset.shape[0], x0, dx, start=start, end=end)
+    attrs[x0key] = x0 + slice_.start * dx
+    return slice_
+
+
 @with_import('h5py')
 def array_to_hdf5(array, output, name=None, group=None, compression='gzip',
                   array_type=Array, **kwargs):
@@ -19,6 +19,7 @@
 """The `Series` is a one-dimensional array with metadata
 """
 
+from copy import deepcopy
 from warnings import warn
 from math import floor
 
@@ -33,6 +34,9 @@ from ..utils.docstring import interpolate_docstring
 __version__ = version.version
 __author__ = "Duncan Macleod <duncan.macleod@ligo.org>"
 
+#: factor by which the storage of a growable `Series` is increased when full
+GROWTH_FACTOR = 2
+
 
 interpolate_docstring.update(
     ArrayXaxis=(
@@ -233,6 +237,15 @@ class Series(Array):
         return new
     copy.__doc__ = Array.copy.__doc__
 
+    def copy_metadata(self):
+        """Return a deepcopy of the metadata for this array
+
+        The storage buffer of a growable series is not included.
+        """
+        metadata = self.__dict__.copy()
+        metadata.pop('_buffer', None)
+        return deepcopy(metadata)
+
     def zip(self):
         """Zip the `xindex` and `value` arrays of this `Series`
 
@@ -416,6 +429,13 @@ class Series(Array):
         -------
         series : `Series`
             a new series containing joined data sets
+
+        Notes
+        -----
+        If this series is growable (see `Series.reserve`), the data are
+        written into its spare capacity (growing the storage if needed), and
+        a new view of the filled storage is returned; this series is left
+        unchanged, so the returned series should always be used.
         """
         # check metadata
         self.is_compatible(other)
@@ -435,7 +455,7 @@ class Series(Array):
                 gapshape = list(self.shape)
                 gapshape[0] = int(ngap)
                 padding = numpy.ones(gapshape, dtype=self.dtype) * pad
-                self.append(padding, inplace=True, resize=resize)
+                self = self.append(padding, inplace=True, resize=resize)
             elif gap == 'ignore':
                 pass
             elif self.xspan[0] < other.xspan[0] < self.xspan[1]:
@@ -454,7 +474,10 @@ class Series(Array):
             return self
 
         # resize first
-        if resize:
+        if resize and self._buffer is not None:
+            N = other.shape[0]
+            self = self._grow(self.shape[0] + N)
+        elif resize:
             N = other.shape[0]
             s = list(self.shape)
             s[0] = self.shape[0] + other.shape[0]
@@ -549,7 +572,7 @@ class Series(Array):
         """
         out = other.append(self, gap=gap, inplace=False,
                            pad=pad, resize=resize)
-        if inplace:
+        if inplace and self._buffer is None:
             self.resize(out.shape, refcheck=False)
             self[:] = out[:]
             self.x0 = out.x0.copy()
@@ -558,6 +581,126 @@ class Series(Array):
         else:
             return out
 
+    # -- growable storage -----------------------
+
+    @property
+    def _buffer(self):
+        """The growable storage for this series, or `None`
+        """
+        try:
+            return self.__dict__['_buffer']
+        except KeyError:
+            return None
+
+    @property
+    def capacity(self):
+        """Number of samples this series can hold before its storage
+        must be re-allocated
+
+        For series that are not growable this is just the number of samples.
+
+        :type: `int`
+        """
+        buffer_ = self._buffer
+        if buffer_ is None:
+            return self.shape[0]
+        return buffer_.data.shape[0]
+
+    def reserve(self, capacity):
+        """Return a growable copy of this series
+
+        Appending to a growable series writes the new data into spare
+        capacity at the end of its storage, growing the storage by a
+        factor of `GROWTH_FACTOR` when full, so that repeated calls to
+        `~Series.append` take amortized constant time per sample.
+
+        Growable storage is only supported for regularly-sampled series.
+
+        Parameters
+        ----------
+        capacity : `int`
+            the minimum number of samples to allocate storage for
+
+        Returns
+        -------
+        series : `Series`
+            a new series with the same data and metadata as this one,
+            with room for at least ``capacity`` samples
+
+        See Also
+        --------
+        Series.shrink_to_fit
+            to release the spare capacity once all data have been appended
+
+        Examples
+        --------
+        >>> a = TimeSeries([1, 2, 3], sample_rate=1).reserve(1024)
+        >>> for i in range(10):
+        ...     a = a.append(TimeSeries([1, 2, 3], sample_rate=1,
+        ...                             epoch=a.span[1]))
+        >>> a = a.shrink_to_fit()
+        """
+        n = self.shape[0]
+        data = numpy.empty((max(int(capacity), n),) + self.shape[1:],
+                           dtype=self.dtype)
+        data[:n] = self.value
+        return self._view_buffer(_SeriesBuffer(data, n))
+
+    def shrink_to_fit(self):
+        """Release the spare capacity of a growable series
+
+        Returns
+        -------
+        series : `Series`
+            a series that owns exactly its data, with the same data and
+            metadata as this one; this series is returned unchanged if it
+            isn't growable
+        """
+        buffer_ = self._buffer
+        if buffer_ is None:
+            return self
+        if (self.shape[0] == buffer_.data.shape[0] and
+                self._starts_buffer(buffer_)):
+            new = buffer_.data.view(type(self))
+        else:
+            new = self.value.copy().view(type(self))
+        new.__dict__ = self.__dict__.copy()
+        del new.__dict__['_buffer']
+        return new
+
+    def _starts_buffer(self, buffer_):
+        return (self.__array_interface__['data'][0] ==
+                buffer_.data.__array_interface__['data'][0])
+
+    def _view_buffer(self, buffer_):
+        """Return a view of the filled part of a buffer, with the same
+        metadata as this series
+        """
+        new = buffer_.data[:buffer_.size].view(type(self))
+        new.__dict__ = self.__dict__.copy()
+        new.__dict__.pop('_xindex', None)
+        new.__dict__['_buffer'] = buffer_
+        return new
+
+    def _grow(self, size):
+        """Return a growable view of this series with ``size`` samples
+
+        The first ``self.shape[0]`` samples hold the data of this series,
+        the rest are uninitialised.
+        """
+        buffer_ = self._buffer
+        n = self.shape[0]
+        # if this isn't the most recent view of its buffer, or the buffer
+        # is full, copy into a new buffer
+        if (n != buffer_.size or size > buffer_.data.shape[0] or
+                not self._starts_buffer(buffer_)):
+            capacity = max(size, int(buffer_.data.shape[0] * GROWTH_FACTOR))
+            data = numpy.empty((capacity,) + self.shape[1:], dtype=self.dtype)
+            data[:n] = self.value
+            buffer_ = _SeriesBuffer(data, n)
+        buffer_.size = size
+        return self._view_buffer(buffer_)
+
     def update(self, other, inplace=True):
         """Update this series by appending new data from an other
         and dropping the same amount of data off the start.
@@ -656,3 +799,22 @@ class Series(Array):
         new.__dict__ = self.copy_metadata()
         new.x0 -= self.dx * pad_width[0]
         return new
+
+
+class _SeriesBuffer(object):
+    """Storage for a growable `Series`
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        the storage array, whose first axis gives the capacity
+    size : `int`
+        the number of samples in use by the most recent view of this buffer
+    """
+    def __init__(self, data, size):
+        self.data = data
+        self.size = size
+
+    def __deepcopy__(self, memo):
+        # growable storage is never copied with the metadata
+        return None
@@ -780,7 +780,7 @@ class ChannelList(list):
     @classmethod
     @with_import('nds2')
     def query_nds2(cls, names, host=None, port=None, connection=None,
-                   type=None, unique=False):
+                   type=None, unique=False, warn=True):
         """Query an NDS server for channel information
 
         Parameters
@@ -797,6 +797,10 @@ class ChannelList(list):
             NDS2 channel type with which to restrict query
         unique : `bool`, optional
             require a unique query result for each name given, default `False`
+        warn : `bool`, optional
+            emit an `~gwpy.io.nds.NDSWarning` if ``unique=True`` and
+            several channels with different parameters match a name,
+            default `True`
 
         Returns
         -------
@@ -816,14 +820,18 @@ class ChannelList(list):
 
            A `host` is required if an open `connection` is not given
         """
-        from ..io.nds import (auth_connect, NDSWarning)
+        from ..io.nds import (CONNECTION_POOL, NDSWarning)
         out = cls()
         # connect
         if connection is None:
             if host is None:
                 raise ValueError("Please given either an open nds2.connection,"
                                  " or the name of the host to connect to")
-            connection = auth_connect(host, port)
+            return CONNECTION_POOL.call(
+                lambda conn: cls.query_nds2(names, connection=conn,
+                                            type=type, unique=unique,
+                                            warn=warn),
+                host, port)
         if isinstance(names, str):
             names = [names]
         for name in names:
@@ -853,9 +861,10 @@ class ChannelList(list):
                     % (name, '\n    '.join(['%s (%s, %s)'
                        % (str(c), c.type, c.sample_rate) for c in found])))
             elif unique and len(found) > 1:
-                warnings.warn('Multiple instances of %r found with different '
-                              'parameters, returning first.' % name,
-                              NDSWarning)
+                if warn:
+                    warnings.warn('Multiple instances of %r found with '
+                                  'different parameters, returning first.'
+                                  % name, NDSWarning)
                 out.append(found[0])
             else:
                 out.extend(found)
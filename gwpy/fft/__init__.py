@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Pluggable fast Fourier transform backends
+
+All Fourier transforms performed by the GWpy `TimeSeries`, `Spectrum`,
+and `Spectrogram` objects, and the `gwpy.spectrum` methods, are
+dispatched through the functions in this module, which call the
+currently selected backend:
+
+- ``'numpy'`` : :mod:`numpy.fft` (default)
+- ``'scipy'`` : :mod:`scipy.fft`, optionally multi-threaded
+- ``'pyfftw'`` : :mod:`pyfftw`, optionally multi-threaded with
+  persistent wisdom
+
+The default backend can be set with the ``GWPY_FFT_BACKEND`` environment
+variable, or with `set_backend`, or temporarily changed using the
+`backend` context manager::
+
+    >>> from gwpy import fft
+    >>> with fft.backend('pyfftw', threads=4):
+    ...     specgram = data.spectrogram(20, 4, 2)
+
+New backends can be added by sub-classing `FFTBackend` and calling
+`register_backend`.
+"""
+
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+from .registry import (FFTBackend, register_backend, set_backend,
+                       get_backend, backend, fft, ifft, rfft, irfft)
+
+# register builtin backends
+from . import (numpy_, scipy_, pyfftw_)
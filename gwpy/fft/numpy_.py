@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""FFT backend using :mod:`numpy.fft`
+"""
+
+from numpy import fft as npfft
+
+from .registry import (FFTBackend, register_backend)
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+
+class NumpyBackend(FFTBackend):
+    """FFT backend using :mod:`numpy.fft`
+
+    This is the default backend, it takes no options.
+    """
+    name = 'numpy'
+
+    def fft(self, a, n=None, axis=-1):
+        return npfft.fft(a, n=n, axis=axis)
+
+    def ifft(self, a, n=None, axis=-1):
+        return npfft.ifft(a, n=n, axis=axis)
+
+    def rfft(self, a, n=None, axis=-1):
+        return npfft.rfft(a, n=n, axis=axis)
+
+    def irfft(self, a, n=None, axis=-1):
+        return npfft.irfft(a, n=n, axis=axis)
+
+register_backend(NumpyBackend)
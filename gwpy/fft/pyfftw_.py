@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""FFT backend using `pyFFTW <https://github.com/pyFFTW/pyFFTW>`_
+"""
+
+import atexit
+import os
+import pickle
+
+from ..utils import import_method_dependency
+from .registry import (FFTBackend, register_backend)
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+WISDOM_ENV = 'GWPY_FFTW_WISDOM'
+
+# wisdom files already imported by this process
+_WISDOM_FILES = set()
+
+
+class PyFFTWBackend(FFTBackend):
+    """FFT backend using the :mod:`pyfftw.interfaces.numpy_fft` module
+
+    The `pyfftw.interfaces` cache is enabled, so repeated transforms of
+    the same shape and type reuse the same FFTW plan.
+
+    Parameters
+    ----------
+    threads : `int`, optional, default: ``1``
+        number of threads to use for each transform
+    planner_effort : `str`, optional, default: ``'FFTW_ESTIMATE'``
+        amount of work FFTW should do when planning new transforms
+    wisdom : `str`, optional
+        path of file in which to persist FFTW wisdom between processes,
+        defaults to the value of the ``GWPY_FFTW_WISDOM`` environment
+        variable. Existing wisdom is imported now, and the accumulated
+        wisdom is written back when the process exits.
+    """
+    name = 'pyfftw'
+
+    def __init__(self, threads=1, planner_effort='FFTW_ESTIMATE',
+                 wisdom=None):
+        self._pyfftw = import_method_dependency('pyfftw')
+        self._fft = import_method_dependency('pyfftw.interfaces.numpy_fft')
+        import_method_dependency('pyfftw.interfaces.cache').enable()
+        self.threads = threads
+        self.planner_effort = planner_effort
+        self.wisdom = wisdom or os.getenv(WISDOM_ENV)
+        if self.wisdom and self.wisdom not in _WISDOM_FILES:
+            self.load_wisdom(self.wisdom)
+            atexit.register(self.save_wisdom, self.wisdom)
+            _WISDOM_FILES.add(self.wisdom)
+
+    def load_wisdom(self, path):
+        """Import FFTW wisdom from the given file, if it exists
+        """
+        if os.path.isfile(path):
+            with open(path, 'rb') as fobj:
+                self._pyfftw.import_wisdom(pickle.load(fobj))
+
+    def save_wisdom(self, path):
+        """Export the accumulated FFTW wisdom to the given file
+        """
+        with open(path, 'wb') as fobj:
+            pickle.dump(self._pyfftw.export_wisdom(), fobj)
+
+    def _kwargs(self):
+        return {'threads': self.threads,
+                'planner_effort': self.planner_effort}
+
+    def fft(self, a, n=None, axis=-1):
+        return self._fft.fft(a, n=n, axis=axis, **self._kwargs())
+
+    def ifft(self, a, n=None, axis=-1):
+        return self._fft.ifft(a, n=n, axis=axis, **self._kwargs())
+
+    def rfft(self, a, n=None, axis=-1):
+        return self._fft.rfft(a, n=n, axis=axis, **self._kwargs())
+
+    def irfft(self, a, n=None, axis=-1):
+        return self._fft.irfft(a, n=n, axis=axis, **self._kwargs())
+
+register_backend(PyFFTWBackend)
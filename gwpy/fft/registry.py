@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Registry of FFT backends
+
+Backends are registered by name with `register_backend`, and selected
+either globally with `set_backend`, or temporarily (for the current
+thread) with the `backend` context manager. The default backend is
+read from the ``GWPY_FFT_BACKEND`` environment variable, falling back
+to ``'numpy'``.
+"""
+
+import os
+import warnings
+from contextlib import contextmanager
+from threading import local
+
+from ..utils.compat import OrderedDict
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+BACKENDS = OrderedDict()
+DEFAULT_BACKEND_ENV = 'GWPY_FFT_BACKEND'
+
+# the global backend instance, and a thread-local override
+_DEFAULT = {}
+_LOCAL = local()
+
+
+class FFTBackend(object):
+    """Base class for FFT backends
+
+    Sub-classes should provide the `fft`, `ifft`, `rfft`, and `irfft`
+    methods, with the same call signature and normalisation conventions
+    as the equivalent functions in :mod:`numpy.fft`. Any keyword
+    arguments given to `set_backend` or `backend` are passed to the
+    constructor.
+    """
+    name = None
+
+    def __repr__(self):
+        return '<%s(%r)>' % (type(self).__name__, self.name)
+
+    def fft(self, a, n=None, axis=-1):
+        raise NotImplementedError("%s does not implement fft"
+                                  % type(self).__name__)
+
+    def ifft(self, a, n=None, axis=-1):
+        raise NotImplementedError("%s does not implement ifft"
+                                  % type(self).__name__)
+
+    def rfft(self, a, n=None, axis=-1):
+        raise NotImplementedError("%s does not implement rfft"
+                                  % type(self).__name__)
+
+    def irfft(self, a, n=None, axis=-1):
+        raise NotImplementedError("%s does not implement irfft"
+                                  % type(self).__name__)
+
+
+def register_backend(backend, name=None, force=False):
+    """Register a new FFT backend
+
+    Parameters
+    ----------
+    backend : `type`
+        sub-class of `FFTBackend` to register
+    name : `str`, optional
+        name of the backend, defaults to ``backend.name``
+    force : `bool`, optional, default: `False`
+        override an existing registration with the same name
+    """
+    if name is None:
+        name = backend.name
+    if name in BACKENDS and not force:
+        raise KeyError("'%s' already registered, use force=True to override."
+                       % name)
+    BACKENDS[name] = backend
+
+
+def _create_backend(name, **kwargs):
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError("No FFT backend registered with name %r, "
+                         "available backends are: %s"
+                         % (name, ', '.join(BACKENDS.keys())))
+    return backend(**kwargs)
+
+
+def set_backend(name, **kwargs):
+    """Set the default FFT backend for this process
+
+    Parameters
+    ----------
+    name : `str`
+        name of the registered backend to use
+    **kwargs
+        other keyword arguments are passed to the backend constructor,
+        e.g. ``workers`` for the ``'scipy'`` backend
+
+    Returns
+    -------
+    backend : `FFTBackend`
+        the new default backend
+    """
+    _DEFAULT['backend'] = backend = _create_backend(name, **kwargs)
+    return backend
+
+
+def get_backend():
+    """Return the FFT backend currently in use
+
+    Returns
+    -------
+    backend : `FFTBackend`
+        the backend set by the innermost active `backend` context in this
+        thread, otherwise the process default
+    """
+    try:
+        return _LOCAL.stack[-1]
+    except (AttributeError, IndexError):
+        pass
+    try:
+        return _DEFAULT['backend']
+    except KeyError:
+        name = os.getenv(DEFAULT_BACKEND_ENV, 'numpy')
+        try:
+            return set_backend(name)
+        except (ImportError, ValueError) as e:
+            warnings.warn("Cannot use FFT backend %r set by %s, using "
+                          "'numpy' instead: %s"
+                          % (name, DEFAULT_BACKEND_ENV, str(e)))
+            return set_backend('numpy')
+
+
+@contextmanager
+def backend(name, **kwargs):
+    """Context manager to temporarily use a different FFT backend
+
+    The backend is only changed for the current thread.
+
+    Parameters
+    ----------
+    name : `str`
+        name of the registered backend to use
+    **kwargs
+        other keyword arguments are passed to the backend constructor
+
+    Examples
+    --------
+    >>> from gwpy import fft
+    >>> with fft.backend('scipy', workers=4):
+    ...     psd = data.psd(4, 2)
+    """
+    new = _create_backend(name, **kwargs)
+    try:
+        stack = _LOCAL.stack
+    except AttributeError:
+        stack = _LOCAL.stack = []
+    stack.append(new)
+    try:
+        yield new
+    finally:
+        stack.pop()
+
+
+# -- dispatch -----------------------------------------------------------------
+
+def fft(a, n=None, axis=-1):
+    """Compute the one-dimensional discrete Fourier transform
+
+    See :func:`numpy.fft.fft` for details.
+    """
+    return get_backend().fft(a, n=n, axis=axis)
+
+
+def ifft(a, n=None, axis=-1):
+    """Compute the one-dimensional inverse discrete Fourier transform
+
+    See :func:`numpy.fft.ifft` for details.
+    """
+    return get_backend().ifft(a, n=n, axis=axis)
+
+
+def rfft(a, n=None, axis=-1):
+    """Compute the one-dimensional discrete Fourier transform for real input
+
+    See :func:`numpy.fft.rfft` for details.
+    """
+    return get_backend().rfft(a, n=n, axis=axis)
+
+
+def irfft(a, n=None, axis=-1):
+    """Compute the inverse of the DFT for real input, as given by `rfft`
+
+    See :func:`numpy.fft.irfft` for details.
+    """
+    return get_backend().irfft(a, n=n, axis=axis)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""FFT backend using :mod:`scipy.fft`
+"""
+
+from ..utils import import_method_dependency
+from .registry import (FFTBackend, register_backend)
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+
+class ScipyBackend(FFTBackend):
+    """FFT backend using :mod:`scipy.fft` (`scipy` >= 1.4 only)
+
+    Parameters
+    ----------
+    workers : `int`, optional
+        maximum number of threads to use for each transform, negative
+        values count back from the number of CPUs, default is to use
+        a single thread
+    """
+    name = 'scipy'
+
+    def __init__(self, workers=None):
+        self._fft = import_method_dependency('scipy.fft')
+        if not hasattr(self._fft, 'rfft'):  # scipy < 1.4
+            raise ImportError("The 'scipy' FFT backend requires scipy >= 1.4")
+        self.workers = workers
+
+    def fft(self, a, n=None, axis=-1):
+        return self._fft.fft(a, n=n, axis=axis, workers=self.workers)
+
+    def ifft(self, a, n=None, axis=-1):
+        return self._fft.ifft(a, n=n, axis=axis, workers=self.workers)
+
+    def rfft(self, a, n=None, axis=-1):
+        return self._fft.rfft(a, n=n, axis=axis, workers=self.workers)
+
+    def irfft(self, a, n=None, axis=-1):
+        return self._fft.irfft(a, n=n, axis=axis, workers=self.workers)
+
+register_backend(ScipyBackend)
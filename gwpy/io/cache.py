@@ -20,17 +20,15 @@
 """
 
 from __future__ import division
-from math import ceil
-from multiprocessing import (cpu_count, Process, Queue as ProcessQueue)
+from functools import partial
 from six import string_types
-import warnings
 
 from glue.lal import (Cache, CacheEntry)
 from glue.ligolw.table import Table
 
 from astropy.io.registry import _get_valid_format
 
-from .. import version
+from .. import (version, parallel)
 from .utils import GzipFile
 
 __author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
@@ -104,8 +102,8 @@ def read_cache(cache, target, nproc, post, *args, **kwargs):
         on disk.
     target : `type`
         target class to read into.
-    nproc : `int`
-        number of individual processes to use.
+    nproc : `int`, `~gwpy.parallel.Executor`
+        number of parallel workers to use, or the executor to use.
     post : `function`
         function to post-process output object before returning.
         The output of this method will be returns, so in-place operations
@@ -149,11 +147,9 @@ def read_cache(cache, target, nproc, post, *args, **kwargs):
         cache.sort(key=lambda ce: ce.segment[0])
 
     # force one file per process minimum
-    nproc = min(nproc, len(cache))
-    if nproc > cpu_count():
-        warnings.warn("Using %d processes on a %d-core machine is "
-                      "unrecommended...but not forbidden."
-                      % (nproc, cpu_count()))
+    if not isinstance(nproc, parallel.Executor):
+        nproc = min(nproc, len(cache))
+    executor = parallel.get_executor(nproc)
 
     # work out underlying data type
     try:
@@ -167,42 +163,16 @@ def read_cache(cache, target, nproc, post, *args, **kwargs):
         if 'format' not in kwargs:
             raise
 
-    if nproc <= 1:
+    if executor.nworkers == 1 or len(cache) <= 1:
         return target.read(cache, *args, **kwargs)
 
-    # define how to read each sub-cache
-    def _read(q, sc, i):
-        try:
-            q.put((i, target.read(sc, *args, **kwargs)))
-        except Exception as e:
-            q.put(e)
-
-    # separate cache into parts
-    fperproc = int(ceil(len(cache) / nproc))
-    subcaches = [cache.__class__(cache[i:i+fperproc]) for
-                 i in range(0, len(cache), fperproc)]
-
-    # start all processes
-    queue = ProcessQueue(nproc)
-    proclist = []
-    for i, subcache in enumerate(subcaches):
-        process = Process(target=_read, args=(queue, subcache, i))
-        process.daemon = True
-        proclist.append(process)
-        process.start()
-
-    # get data and block
-    pout = []
-    for i in range(len(proclist)):
-        result = queue.get()
-        if isinstance(result, Exception):
-            raise result
-        pout.append(result)
-    for process in proclist:
-        process.join()
+    # separate cache into parts, and read them in parallel
+    subcaches = [cache.__class__(cache[chunk]) for
+                 chunk in parallel.chunks(len(cache), executor)]
+    data = executor.map(partial(_read_cache_chunk, target=target, args=args,
+                                kwargs=kwargs), subcaches)
 
     # combine and return
-    data = zip(*sorted(pout, key=lambda out: out[0]))[1]
     try:
         if issubclass(target, Table):
             out = data[0]
@@ -219,6 +189,12 @@ def read_cache(cache, target, nproc, post, *args, **kwargs):
         return out
 
 
+def _read_cache_chunk(subcache, target, args, kwargs):
+    """Read one sub-cache for `read_cache`
+    """
+    return target.read(subcache, *args, **kwargs)
+
+
 def read_cache_factory(target):
     """Generate a read_cache method specific to a given target class.
 
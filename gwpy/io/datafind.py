@@ -17,19 +17,38 @@
 # along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
 
 """User-friendly extensions to `glue.datafind`
+
+Queries made through a `DatafindSession` (including those made by
+`find_frametype` and `find_best_frametype`) are memoized for a short time,
+and re-use a single connection to the server.
 """
 
 import os.path
+import socket
+from copy import copy
+import time
+import warnings
+from threading import (Lock, RLock)
+
+from six.moves import http_client
 
 from glue.lal import CacheEntry
 
 from .. import version
 from ..time import to_gps
 from ..utils import with_import
+from ..utils.compat import OrderedDict
+from .gwf_index import get_index
 
 __version__ = version.version
 __author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
 
+#: default number of seconds for which to memoize datafind queries
+DEFAULT_TTL = 300
+
+_SESSIONS = {}
+_SESSIONS_LOCK = Lock()
+
 
 @with_import('glue.datafind')
 def connect(host=None, port=None):
@@ -56,69 +75,376 @@ def connect(host=None, port=None):
         return datafind.GWDataFindHTTPConnection(host=host, port=port)
 
 
-def find_frametype(channel, gpstime=None, frametype_match=None,
-                   host=None, port=None, return_all=False, exclude_tape=False):
-    """Find the frametype(s) that hold data for a given channel
+# -- sessions -----------------------------------------------------------------
+
+class DatafindSession(object):
+    """A re-usable connection to a datafind server, with memoized queries
+
+    The results of `find_types`, `find_latest`, and `find_frame_urls`
+    are stored for ``ttl`` seconds, so repeated queries (e.g. when finding
+    data for many channels) only go to the server once, and all queries
+    use the same connection.
+
+    Parameters
+    ----------
+    host : `str`, optional
+        name of datafind server to query
+    port : `int`, optional
+        port of datafind server on host
+    ttl : `float`, optional
+        number of seconds for which to store the result of each query,
+        default: `DEFAULT_TTL`, use ``0`` to disable memoization
+    connection : `~glue.datafind.GWDataFindHTTPConnection`, optional
+        open connection to use, by default a new connection is opened
+        with `connect` when first needed
+    index : `~gwpy.io.gwf_index.GWFIndex`, optional
+        the index of GWF table-of-contents information to use when
+        searching frames for channels, defaults to
+        :func:`~gwpy.io.gwf_index.get_index`
+
+    Examples
+    --------
+    >>> from gwpy.io.datafind import DatafindSession
+    >>> session = DatafindSession()
+    >>> session.find_best_frametypes(['L1:LDAS-STRAIN', 'H1:LDAS-STRAIN'],
+    ...                              968654552, 968654562)
+    OrderedDict([('L1:LDAS-STRAIN', 'L1_LDAS_C02_L2'),
+                 ('H1:LDAS-STRAIN', 'H1_LDAS_C02_L2')])
     """
-    from ..detector import Channel
-    channel = Channel(channel)
-    name = channel.name
-    if gpstime is not None:
-        gpstime = to_gps(gpstime).seconds
-    connection = connect(host, port)
-    types = connection.find_types(channel.ifo[0], match=frametype_match)
-    # get reference frame for all types
-    frames = []
-    for ft in types:
-        try:
-            if gpstime is None:
-                frame = connection.find_latest(
-                    channel.ifo[0], ft, urltype='file')[0]
+    def __init__(self, host=None, port=None, ttl=None, connection=None,
+                 index=None):
+        self.host = host
+        self.port = port
+        if ttl is None:
+            ttl = DEFAULT_TTL
+        self.ttl = ttl
+        self.index = index
+        self._connection = connection
+        self._pid = connection is not None and os.getpid() or None
+        self._results = {}
+        self._lock = RLock()
+
+    def __repr__(self):
+        return '<%s(host=%r, port=%r)>' % (type(self).__name__, self.host,
+                                           self.port)
+
+    # -- connection -------------------------
+
+    @property
+    def connection(self):
+        """The open connection to the datafind server
+
+        A new connection is opened in each process, so that a session can
+        be used safely with `multiprocessing`.
+        """
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = connect(self.host, self.port)
+            self._pid = os.getpid()
+        return self._connection
+
+    def _query(self, method, *args, **kwargs):
+        """Call a method of the connection, memoizing the result
+
+        A copy of the result is returned, so callers can't modify the
+        stored value.
+        """
+        key = (method, args, tuple(sorted(kwargs.items())))
+        with self._lock:
+            try:
+                created, result = self._results[key]
+            except KeyError:
+                pass
             else:
-                frame = connection.find_frame_urls(
-                    channel.ifo[0], ft, gpstime, gpstime, urltype='file',
-                    on_gaps='ignore')[0]
-        except (IndexError, RuntimeError):
-            continue
-        else:
-            if os.access(frame.path, os.R_OK) and (
-                    not exclude_tape or not on_tape(frame)):
-                frames.append((ft, frame.path))
-    # sort frames by allocated block size and regular size
-    # (to put frames on tape at the bottom of the list)
-    frames.sort(key=lambda x: (on_tape(x[1]), num_channels(x[1])))
-    # search each frametype for the given channel
-    found = []
-    for ft, path in frames:
-        if get_channel_type(name, path):
+                if time.time() - created < self.ttl:
+                    return copy(result)
+            try:
+                result = getattr(self.connection, method)(*args, **kwargs)
+            except (http_client.HTTPException, socket.error):
+                # the server may have closed an idle connection, so
+                # reconnect and try once more
+                self._connection = None
+                result = getattr(self.connection, method)(*args, **kwargs)
+            if self.ttl > 0:
+                self._results[key] = (time.time(), result)
+            return copy(result)
+
+    def clear(self):
+        """Forget the results of all previous queries
+        """
+        with self._lock:
+            self._results.clear()
+
+    # -- queries ----------------------------
+
+    def find_types(self, observatory, match=None):
+        """Find the available frametypes for an observatory
+
+        See :meth:`glue.datafind.GWDataFindHTTPConnection.find_types`
+        """
+        return self._query('find_types', observatory, match=match)
+
+    def find_latest(self, observatory, frametype, urltype='file'):
+        """Find the most recent frame of the given type
+
+        See :meth:`glue.datafind.GWDataFindHTTPConnection.find_latest`
+        """
+        return self._query('find_latest', observatory, frametype,
+                           urltype=urltype)
+
+    def find_frame_urls(self, observatory, frametype, start, end,
+                        urltype='file', on_gaps='warn'):
+        """Find the frames of the given type covering a GPS interval
+
+        The server is queried once for each interval, regardless of
+        ``on_gaps``.
+
+        Parameters
+        ----------
+        observatory : `str`
+            single-character name of observatory
+        frametype : `str`
+            name of frametype
+        start : `~gwpy.time.LIGOTimeGPS`, `int`
+            GPS start time of interval
+        end : `~gwpy.time.LIGOTimeGPS`, `int`
+            GPS end time of interval
+        urltype : `str`, optional, default: ``'file'``
+            type of URL to return
+        on_gaps : `str`, optional, default: ``'warn'``
+            what to do if the frames don't cover the interval, one of
+            ``'ignore'``, ``'warn'``, or ``'error'``
+
+        Returns
+        -------
+        cache : `~glue.lal.Cache`
+            the frames found
+
+        Raises
+        ------
+        RuntimeError
+            if ``on_gaps='error'`` and the frames don't cover the interval
+        """
+        cache = self._query('find_frame_urls', observatory, frametype,
+                            start, end, urltype=urltype, on_gaps='ignore')
+        if on_gaps == 'ignore':
+            return cache
+        from ..segments import (Segment, SegmentList)
+        span = SegmentList([Segment(start, end)])
+        missing = (span - SegmentList(e.segment for e in cache)).coalesce()
+        if not abs(missing):
+            return cache
+        msg = "Missing segments: \n%s" % "\n".join(map(str, missing))
+        if on_gaps == 'warn':
+            warnings.warn(msg)
+            return cache
+        raise RuntimeError(msg)
+
+    # -- frametype resolution ---------------
+
+    def find_frametypes(self, channels, gpstime=None, frametype_match=None,
+                        return_all=False, exclude_tape=False):
+        """Find the frametype(s) that hold data for a number of channels
+
+        For each observatory, one reference frame is found for each
+        frametype, and the table of contents of each frame is read once
+        for all channels.
+
+        Parameters
+        ----------
+        channels : `list`
+            the channels to find
+        gpstime : `int`, optional
+            a reference GPS time at which to search for frame files,
+            defaults to the latest available frames
+        frametype_match : `str`, optional
+            a regular expression string to use to down-select from the
+            list of all available frametypes
+        return_all: `bool`, default: `False`
+            return all matched frame types, otherwise only the first match
+            is returned for each channel
+        exclude_tape : `bool`, default: `False`
+            do not search frame files that appear to be on magnetic tape
+
+        Returns
+        -------
+        frametypes : `~collections.OrderedDict`
+            the matching frametype, or `list` of frametypes, for each
+            channel
+
+        Raises
+        ------
+        ValueError
+            if any of the channels cannot be found in any frametype
+        """
+        from ..detector import Channel
+        if gpstime is not None:
+            gpstime = to_gps(gpstime).seconds
+        index = self.index
+        if index is None:
+            index = get_index()
+
+        # group channels by observatory
+        byobs = OrderedDict()
+        for channel in channels:
+            byobs.setdefault(Channel(channel).ifo[0], []).append(channel)
+
+        names = dict((channel, Channel(channel).name) for
+                     channel in channels)
+        found = OrderedDict((channel, []) for channel in channels)
+        for observatory, clist in byobs.iteritems():
+            # get reference frame for all types
+            frames = []
+            for ft in self.find_types(observatory, match=frametype_match):
+                try:
+                    if gpstime is None:
+                        frame = self.find_latest(observatory, ft)[0]
+                    else:
+                        frame = self.find_frame_urls(
+                            observatory, ft, gpstime, gpstime,
+                            on_gaps='ignore')[0]
+                except (IndexError, RuntimeError):
+                    continue
+                if os.access(frame.path, os.R_OK) and (
+                        not exclude_tape or not on_tape(frame)):
+                    frames.append((ft, frame.path))
+            # sort frames by allocated block size and regular size
+            # (to put frames on tape at the bottom of the list)
+            frames.sort(key=lambda x: (on_tape(x[1]),
+                                       index.num_channels(x[1])))
+            # search each frametype for all channels
+            for ft, path in frames:
+                toc = index.get(path).channels
+                for channel in clist:
+                    if names[channel] in toc:
+                        found[channel].append(ft)
+
+        for channel, types in found.iteritems():
+            if not types and gpstime:
+                raise ValueError("Cannot locate %r in any known frametype "
+                                 "at GPS=%d" % (names[channel], gpstime))
+            elif not types:
+                raise ValueError("Cannot locate %r in any known frametype"
+                                 % names[channel])
             if not return_all:
-                return ft
-            else:
-                found.append(ft)
-    if len(found) == 0 and gpstime:
-        raise ValueError("Cannot locate %r in any known frametype at GPS=%d"
-                         % (name, gpstime))
-    elif len(found) == 0:
-        raise ValueError("Cannot locate %r in any known frametype" % name)
-    else:
+                found[channel] = types[0]
         return found
 
+    def find_best_frametypes(self, channels, start, end, urltype='file',
+                             allow_tape=True):
+        """Select the best frametype from which to read each channel
+
+        The preferred frametype for each channel (see `find_frametypes`)
+        is used if it covers the whole interval, otherwise the frametype
+        with the most coverage is chosen.
+
+        Parameters
+        ----------
+        channels : `list`
+            the channels to find
+        start : `~gwpy.time.LIGOTimeGPS`, `float`, `str`
+            GPS start time of interval
+        end : `~gwpy.time.LIGOTimeGPS`, `float`, `str`
+            GPS end time of interval
+        urltype : `str`, optional, default: ``'file'``
+            type of URL to search for
+        allow_tape : `bool`, optional, default: `True`
+            allow the use of frames that are held on tape
+
+        Returns
+        -------
+        frametypes : `~collections.OrderedDict`
+            the best frametype for each channel
+
+        Raises
+        ------
+        ValueError
+            if no valid frametypes are found for any channel
+        """
+        start = to_gps(start).seconds
+        end = to_gps(end).seconds
+        alltypes = self.find_frametypes(channels, gpstime=start,
+                                        return_all=True,
+                                        exclude_tape=not allow_tape)
+        out = OrderedDict()
+        for channel, types in alltypes.iteritems():
+            observatory = str(channel)[0]
+            try:
+                cache = self.find_frame_urls(observatory, types[0], start,
+                                             end, urltype=urltype,
+                                             on_gaps='error')
+                if not allow_tape and on_tape(*cache):
+                    raise RuntimeError()
+            except RuntimeError:
+                cache = [(ft, self.find_frame_urls(
+                    observatory, ft, start, end, urltype=urltype,
+                    on_gaps='ignore')) for ft in types]
+                if not allow_tape:
+                    cache = [ftc for ftc in cache if not on_tape(*ftc[1])]
+                cache.sort(key=lambda x: len(x[1]) and
+                           -abs(x[1].to_segmentlistdict().values()[0]) or 0)
+                try:
+                    out[channel] = cache[0][0]
+                except IndexError:
+                    raise ValueError("Cannot find any valid frametypes for "
+                                     "%r" % str(channel))
+            else:
+                out[channel] = types[0]
+        return out
+
+
+def get_session(host=None, port=None):
+    """Return the shared `DatafindSession` for a datafind server
+
+    Parameters
+    ----------
+    host : `str`, optional
+        name of datafind server to query
+    port : `int`, optional
+        port of datafind server on host
+
+    Returns
+    -------
+    session : `DatafindSession`
+        the session for this server, created the first time it is needed
+    """
+    key = (host, port and int(port))
+    with _SESSIONS_LOCK:
+        try:
+            return _SESSIONS[key]
+        except KeyError:
+            _SESSIONS[key] = session = DatafindSession(host, port)
+            return session
+
+
+def find_frametype(channel, gpstime=None, frametype_match=None,
+                   host=None, port=None, return_all=False, exclude_tape=False):
+    """Find the frametype(s) that hold data for a given channel
+
+    See Also
+    --------
+    DatafindSession.find_frametypes
+        for details of the arguments, and to find many channels at once
+    """
+    return get_session(host, port).find_frametypes(
+        [channel], gpstime=gpstime, frametype_match=frametype_match,
+        return_all=return_all, exclude_tape=exclude_tape)[channel]
+
 
-@with_import('lalframe')
 def num_channels(framefile):
     """Find the total number of channels in this framefile
+
+    The table of contents is read from the `~gwpy.io.gwf_index`, so is only
+    parsed the first time each file is queried.
     """
-    frfile = lalframe.FrameUFrFileOpen(framefile, "r")
-    frtoc = lalframe.FrameUFrTOCRead(frfile)
-    return sum(
-        getattr(lalframe, 'FrameUFrTOCQuery%sN' % type_.title())(frtoc) for
-        type_ in ['adc', 'proc', 'sim'])
+    return get_index().num_channels(framefile)
 
 
-@with_import('lalframe')
 def get_channel_type(channel, framefile):
     """Find the channel type in a given frame file
 
+    The table of contents is read from the `~gwpy.io.gwf_index`, so is only
+    parsed the first time each file is queried.
+
     Parameters
     ----------
     channel : `str`, `~gwpy.detector.Channel`
@@ -133,57 +459,21 @@ def get_channel_type(channel, framefile):
         channel exists in the table-of-contents for the given frame,
         otherwise `False`
     """
-    name = str(channel)
-    # read frame and table of contents
-    frfile = lalframe.FrameUFrFileOpen(framefile, "r")
-    frtoc = lalframe.FrameUFrTOCRead(frfile)
-    for type_ in ['sim', 'proc', 'adc']:
-        query = getattr(lalframe, 'FrameUFrTOCQuery%sName' % type_.title())
-        i = 0
-        while True:
-            try:
-                c = query(frtoc, i)
-            except RuntimeError:
-                break
-            else:
-                if c == name:
-                    return type_
-            i += 1
-    return False
+    return get_index().channel_type(channel, framefile)
 
 
 def find_best_frametype(channel, start, end, urltype='file',
                         host=None, port=None, allow_tape=True):
     """Intelligently select the best frametype from which to read this channel
+
+    See Also
+    --------
+    DatafindSession.find_best_frametypes
+        for details of the arguments, and to find many channels at once
     """
-    start = to_gps(start).seconds
-    end = to_gps(end).seconds
-    frametype = find_frametype(channel, gpstime=start, host=host, port=port,
-                               exclude_tape=not allow_tape)
-    connection = connect(host=host, port=port)
-    try:
-        cache = connection.find_frame_urls(channel[0], frametype,
-                                           start, end, urltype=urltype,
-                                           on_gaps='error')
-        if not allow_tape and on_tape(*cache):
-            raise RuntimeError()
-    except RuntimeError:
-        alltypes = find_frametype(channel, gpstime=start, host=host, port=port,
-                                  return_all=True, exclude_tape=not allow_tape)
-        cache = [(ft, connection.find_frame_urls(
-            channel[0], ft, start, end, urltype=urltype,
-            on_gaps='ignore')) for ft in alltypes]
-        if not allow_tape:
-            cache = [ftc for ftc in cache if not on_tape(*ftc[1])]
-        cache.sort(key=lambda x:
-            len(x[1]) and -abs(x[1].to_segmentlistdict().values()[0]) or 0)
-        try:
-            return cache[0][0]
-        except IndexError:
-            raise ValueError("Cannot find any valid frametypes for %r"
-                             % channel)
-    else:
-        return frametype
+    return get_session(host, port).find_best_frametypes(
+        [channel], start, end, urltype=urltype,
+        allow_tape=allow_tape)[channel]
 
 
 def on_tape(*files):
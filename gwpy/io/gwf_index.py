@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Persistent index of GWF table-of-contents information
+
+Reading the table of contents (TOC) of a GWF file requires opening and
+parsing the end of the file. This module stores what GWpy needs from the
+TOC of each file (the frame epochs and durations, and the name and type of
+each channel) in a small SQLite database, so that the TOC is parsed only
+once for each file. An entry is re-parsed whenever the modification time
+or size of its file changes.
+
+The sample rate and data type of a channel aren't stored in the TOC
+itself; they can be recorded in the index using
+`GWFIndex.update_channel`.
+
+The database used by `get_index` is given by the ``GWPY_GWF_INDEX``
+environment variable, defaulting to ``~/.cache/gwpy/gwf-index.sqlite``.
+Use ``GWPY_GWF_INDEX=:memory:`` to keep the index in memory for the
+lifetime of each process only.
+"""
+
+import os
+import sqlite3
+from collections import namedtuple
+from threading import Lock
+
+from glue.lal import CacheEntry
+
+from ..utils.compat import OrderedDict
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+__all__ = ['GWFIndex', 'get_index']
+
+INDEX_ENV = 'GWPY_GWF_INDEX'
+DEFAULT_INDEX = os.path.join('~', '.cache', 'gwpy', 'gwf-index.sqlite')
+
+CHANNEL_TYPES = ('adc', 'proc', 'sim')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime REAL,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS frames (
+    path TEXT,
+    frame INTEGER,
+    gps REAL,
+    duration REAL,
+    PRIMARY KEY (path, frame)
+);
+CREATE TABLE IF NOT EXISTS channels (
+    path TEXT,
+    name TEXT,
+    type TEXT,
+    sample_rate REAL,
+    dtype TEXT,
+    offsets TEXT,
+    PRIMARY KEY (path, name)
+);
+"""
+
+#: Information about one channel in a GWF file
+ChannelInfo = namedtuple('ChannelInfo',
+                         ('name', 'type', 'sample_rate', 'dtype', 'offsets'))
+
+#: Information about one GWF file
+FileInfo = namedtuple('FileInfo', ('path', 'mtime', 'epochs', 'durations',
+                                   'channels'))
+
+
+# -- TOC parsing --------------------------------------------------------------
+
+def _format_offsets(value):
+    """Format a TOC entry as a `list` of byte offsets, if possible
+    """
+    try:
+        return [int(x) for x in value]
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_toc_framecpp(path):
+    try:
+        from LDAStools import frameCPP
+    except ImportError:
+        import frameCPP
+    toc = frameCPP.IFrameFStream(path).GetTOC()
+    epochs = [s + n * 1e-9 for (s, n) in
+              zip(toc.GetGTimeS(), toc.GetGTimeN())]
+    durations = list(toc.GetDt())
+    channels = []
+    for ctype in CHANNEL_TYPES:
+        try:
+            table = getattr(toc, 'Get%s' % ctype.title())()
+        except AttributeError:
+            continue
+        try:
+            items = table.items()
+        except AttributeError:
+            items = [(name, None) for name in table]
+        for name, value in items:
+            channels.append((str(name), ctype, _format_offsets(value)))
+    return epochs, durations, channels
+
+
+def _read_toc_lalframe(path):
+    import lalframe
+    frfile = lalframe.FrameUFrFileOpen(path, "r")
+    frtoc = lalframe.FrameUFrTOCRead(frfile)
+    nframe = lalframe.FrameUFrTOCQueryNFrame(frtoc)
+    epochs = [sum(lalframe.FrameUFrTOCQueryGTimeModf(frtoc, i)) for
+              i in range(nframe)]
+    durations = [lalframe.FrameUFrTOCQueryDt(frtoc, i) for i in range(nframe)]
+    channels = []
+    for ctype in CHANNEL_TYPES:
+        nchan = getattr(lalframe, 'FrameUFrTOCQuery%sN' % ctype.title())(frtoc)
+        query = getattr(lalframe, 'FrameUFrTOCQuery%sName' % ctype.title())
+        channels.extend((query(frtoc, i), ctype, None) for i in range(nchan))
+    return epochs, durations, channels
+
+
+def read_toc(path):
+    """Read the table of contents of a GWF file
+
+    This uses frameCPP if available, otherwise lalframe.
+
+    Parameters
+    ----------
+    path : `str`
+        path of GWF file to read
+
+    Returns
+    -------
+    epochs : `list` of `float`
+        the GPS start time of each frame in the file
+    durations : `list` of `float`
+        the duration of each frame in the file
+    channels : `list` of `tuple`
+        ``(name, type, offsets)`` for each channel in the file, with
+        ``offsets`` giving the position of the channel's data in each frame,
+        or `None` if unknown
+
+    Raises
+    ------
+    ImportError
+        if neither frameCPP nor lalframe can be imported
+    """
+    try:
+        return _read_toc_framecpp(path)
+    except ImportError:
+        pass
+    try:
+        return _read_toc_lalframe(path)
+    except ImportError:
+        raise ImportError("Cannot read GWF table of contents without either "
+                          "frameCPP or lalframe")
+
+
+# -- index --------------------------------------------------------------------
+
+class GWFIndex(object):
+    """An on-disk index of GWF file table-of-contents information
+
+    Parameters
+    ----------
+    database : `str`, optional
+        path of the SQLite database in which to store the index, defaults
+        to the ``GWPY_GWF_INDEX`` environment variable, or
+        ``~/.cache/gwpy/gwf-index.sqlite``, use ``':memory:'`` for an
+        index that isn't saved to disk
+
+    Examples
+    --------
+    >>> from gwpy.io.gwf_index import get_index
+    >>> index = get_index()
+    >>> index.channel_type('L1:LDAS-STRAIN', 'HLV-GW100916-968654552-1.gwf')
+    'proc'
+    """
+    def __init__(self, database=None):
+        if database is None:
+            database = os.getenv(INDEX_ENV, DEFAULT_INDEX)
+        if database != ':memory:':
+            database = os.path.abspath(os.path.expanduser(database))
+        self.database = database
+        self._lock = Lock()
+        self._conn = None
+        self._pid = None
+
+    def __repr__(self):
+        return '<%s(%r)>' % (type(self).__name__, self.database)
+
+    # -- connection -------------------------
+
+    def _connect(self):
+        database = self.database
+        if database != ':memory:':
+            try:
+                dirname = os.path.dirname(database)
+                if not os.path.isdir(dirname):
+                    os.makedirs(dirname)
+                conn = sqlite3.connect(database, timeout=30,
+                                       check_same_thread=False)
+                conn.executescript(SCHEMA)
+            except (OSError, sqlite3.Error):
+                # can't write the index, so just keep it for this process
+                database = ':memory:'
+            else:
+                return conn
+        conn = sqlite3.connect(database, check_same_thread=False)
+        conn.executescript(SCHEMA)
+        return conn
+
+    @property
+    def connection(self):
+        """The open `sqlite3.Connection` to the index database
+
+        A new connection is opened in each process, so that the index
+        can be used safely with `multiprocessing`.
+        """
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = self._connect()
+            self._pid = os.getpid()
+        return self._conn
+
+    # -- parse and store --------------------
+
+    @staticmethod
+    def parse(path):
+        """Read the table of contents of a GWF file
+
+        See `read_toc` for details, sub-classes can override this method
+        to index files in other ways.
+        """
+        return read_toc(path)
+
+    def _update(self, path, mtime, size):
+        epochs, durations, channels = self.parse(path)
+        conn = self.connection
+        with conn:
+            for table in ('files', 'frames', 'channels'):
+                conn.execute('DELETE FROM %s WHERE path = ?' % table, (path,))
+            conn.execute('INSERT INTO files VALUES (?, ?, ?)',
+                         (path, mtime, size))
+            conn.executemany(
+                'INSERT INTO frames VALUES (?, ?, ?, ?)',
+                [(path, i, float(gps), float(dt)) for
+                 i, (gps, dt) in enumerate(zip(epochs, durations))])
+            conn.executemany(
+                'INSERT OR REPLACE INTO channels VALUES (?, ?, ?, ?, ?, ?)',
+                [(path, str(name), ctype, None, None,
+                  offsets and ','.join(map(str, offsets)) or None) for
+                 (name, ctype, offsets) in channels])
+
+    def _refresh(self, framefile):
+        """Make sure the index entry for this file is up-to-date
+
+        Returns the absolute path of the file
+        """
+        if isinstance(framefile, CacheEntry):
+            framefile = framefile.path
+        path = os.path.abspath(framefile)
+        stat = os.stat(path)
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT mtime, size FROM files WHERE path = ?',
+                (path,)).fetchone()
+            if row is None or tuple(row) != (stat.st_mtime, stat.st_size):
+                self._update(path, stat.st_mtime, stat.st_size)
+        return path
+
+    # -- queries ----------------------------
+
+    def get(self, framefile):
+        """Return the index entry for a GWF file
+
+        The table of contents is parsed only if the file hasn't been
+        indexed before, or has changed since it was last indexed.
+
+        Parameters
+        ----------
+        framefile : `str`, :class:`~glue.lal.CacheEntry`
+            path of GWF file
+
+        Returns
+        -------
+        info : `FileInfo`
+            the ``path``, ``mtime``, ``epochs``, ``durations``, and
+            ``channels`` (an `~collections.OrderedDict` of `ChannelInfo`)
+            for this file
+        """
+        path = self._refresh(framefile)
+        conn = self.connection
+        with self._lock:
+            mtime = conn.execute('SELECT mtime FROM files WHERE path = ?',
+                                 (path,)).fetchone()[0]
+            frames = conn.execute(
+                'SELECT gps, duration FROM frames WHERE path = ? '
+                'ORDER BY frame', (path,)).fetchall()
+            rows = conn.execute(
+                'SELECT name, type, sample_rate, dtype, offsets FROM channels '
+                'WHERE path = ? ORDER BY rowid', (path,)).fetchall()
+        channels = OrderedDict()
+        for name, ctype, rate, dtype, offsets in rows:
+            if offsets:
+                offsets = [int(x) for x in offsets.split(',')]
+            channels[str(name)] = ChannelInfo(str(name), str(ctype), rate,
+                                              dtype and str(dtype), offsets)
+        return FileInfo(path, mtime, [f[0] for f in frames],
+                        [f[1] for f in frames], channels)
+
+    def channel_type(self, channel, framefile):
+        """Find the type of a channel in a GWF file
+
+        Parameters
+        ----------
+        channel : `str`, `~gwpy.detector.Channel`
+            name of data channel to find
+        framefile : `str`
+            path of GWF file in which to search
+
+        Returns
+        -------
+        ctype : `str`
+            the type of the channel (``'adc'``, ``'proc'``, or ``'sim'``),
+            if the channel exists in the given frame, otherwise `False`
+        """
+        path = self._refresh(framefile)
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT type FROM channels WHERE path = ? AND name = ?',
+                (path, str(channel))).fetchone()
+        return row is not None and str(row[0])
+
+    def num_channels(self, framefile):
+        """Find the total number of channels in a GWF file
+        """
+        path = self._refresh(framefile)
+        with self._lock:
+            return self.connection.execute(
+                'SELECT COUNT(*) FROM channels WHERE path = ?',
+                (path,)).fetchone()[0]
+
+    def segments(self, framefile):
+        """Find the GPS segment covered by each frame in a GWF file
+
+        Returns
+        -------
+        segments : `list` of `~gwpy.segments.Segment`
+            one ``[start, end)`` segment per frame
+        """
+        from ..segments import Segment
+        info = self.get(framefile)
+        return [Segment(gps, gps + dt) for
+                (gps, dt) in zip(info.epochs, info.durations)]
+
+    def update_channel(self, framefile, channel, sample_rate=None,
+                       dtype=None):
+        """Record the sample rate and data type of a channel in a GWF file
+
+        Parameters
+        ----------
+        framefile : `str`
+            path of GWF file
+        channel : `str`, `~gwpy.detector.Channel`
+            name of data channel
+        sample_rate : `float`, optional
+            sample rate (Hertz) of the channel
+        dtype : `numpy.dtype`, `str`, optional
+            data type of the channel
+        """
+        if isinstance(framefile, CacheEntry):
+            framefile = framefile.path
+        path = os.path.abspath(framefile)
+        if dtype is not None:
+            dtype = str(dtype)
+        conn = self.connection
+        with self._lock:
+            with conn:
+                conn.execute(
+                    'UPDATE channels SET '
+                    'sample_rate = COALESCE(?, sample_rate), '
+                    'dtype = COALESCE(?, dtype) WHERE path = ? AND name = ?',
+                    (sample_rate, dtype, path, str(channel)))
+
+    def clear(self):
+        """Remove all entries from this index
+        """
+        conn = self.connection
+        with self._lock:
+            with conn:
+                for table in ('files', 'frames', 'channels'):
+                    conn.execute('DELETE FROM %s' % table)
+
+
+_INDEX = {}
+
+
+def get_index():
+    """Return the process-wide `GWFIndex`
+
+    The database location is read from the ``GWPY_GWF_INDEX`` environment
+    variable when this is first called.
+    """
+    try:
+        return _INDEX['index']
+    except KeyError:
+        _INDEX['index'] = index = GWFIndex()
+        return index
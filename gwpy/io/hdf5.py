@@ -57,3 +57,39 @@ def identify_hdf5(origin, path, fileobj, *args, **kwargs):
         return True
     else:
         return False
+
+
+def hyperslab(size, x0, dx, start=None, end=None):
+    """Find the `slice` of a dataset that covers the given x-axis span
+
+    The indices are computed in the same way as in `Series.crop`, and are
+    restricted to the extent of the dataset.
+
+    Parameters
+    ----------
+    size : `int`
+        the number of samples along the first axis of the dataset
+    x0 : `float`
+        the x-axis value of the first sample
+    dx : `float`
+        the x-axis spacing between samples
+    start : `float`, optional
+        the lower limit of the desired span, defaults to ``x0``
+    end : `float`, optional
+        the upper limit of the desired span, defaults to the end of the
+        dataset
+
+    Returns
+    -------
+    slice_ : `slice`
+        the slice of the first axis of the dataset to read
+    """
+    if start is None:
+        idx0 = 0
+    else:
+        idx0 = min(max(int(float(start - x0) / dx), 0), size)
+    if end is None:
+        idx1 = size
+    else:
+        idx1 = min(max(int(float(end - x0) / dx), idx0), size)
+    return slice(idx0, idx1)
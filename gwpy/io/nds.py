@@ -23,8 +23,12 @@ to LIGO data.
 from __future__ import print_function
 
 import os
+import re
 import sys
+import threading
+import time
 import warnings
+from contextlib import contextmanager
 
 import nds2
 
@@ -45,6 +49,16 @@ DEFAULT_HOSTS = OrderedDict([
     ('C1', ('nds40.ligo.caltech.edu', 31200)),
     ('C0', ('nds40.ligo.caltech.edu', 31200))])
 
+#: default maximum number of simultaneous requests made when fetching data
+#: for many channels from a list of servers
+FETCH_CONCURRENCY = 4
+
+#: pattern matching `RuntimeError` messages that mean an NDS connection has
+#: been closed or broken, rather than that the request itself failed
+DEAD_CONNECTION_ERROR = re.compile(
+    r'(connection|socket).*(closed|reset|lost|abort|refused)|broken pipe|'
+    r'not connected|end of file|\beof\b', re.I)
+
 # set type dicts
 NDS2_CHANNEL_TYPESTR = {}
 for ctype in (nds2.channel.CHANNEL_TYPE_RAW,
@@ -169,3 +183,223 @@ def auth_connect(host, port=None):
         else:
             raise
     return connection
+
+
+# -- connection pooling -------------------------------------------------------
+
+def _close(connection):
+    """Close an NDS connection, ignoring any errors
+    """
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def _is_alive(connection):
+    """Return `True` if the given NDS connection can be re-used
+
+    A connection in the middle of an iteration (e.g. one abandoned by
+    an exception) cannot be used for a new request. This check doesn't
+    contact the server, so can't tell whether the server has closed the
+    connection, see `ConnectionPool.call`.
+    """
+    try:
+        return not connection.has_next()
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def _is_dead_connection_error(exc):
+    """Return `True` if the given exception means that an NDS connection
+    can no longer be used, see `DEAD_CONNECTION_ERROR`
+    """
+    return (isinstance(exc, RuntimeError) and
+            DEAD_CONNECTION_ERROR.search(str(exc)) is not None)
+
+
+class ConnectionPool(object):
+    """Pool of open NDS connections, keyed by ``(host, port)``
+
+    Connections are checked out with `ConnectionPool.get` (or the
+    `ConnectionPool.connection` context manager) and returned with
+    `ConnectionPool.put`, so that sequential requests to the same server
+    don't pay for a new connection (and authentication) each time.
+    `ConnectionPool.call` does all of this for a single function call,
+    retrying with a new connection if a re-used one has gone stale.
+
+    Parameters
+    ----------
+    maxsize : `int`, optional, default: ``4``
+        maximum number of idle connections to hold for each server
+    timeout : `float`, optional, default: ``300``
+        number of seconds after which an idle connection is closed
+    connect : `callable`, optional
+        method to open a new connection, taking ``(host, port)``,
+        defaults to `auth_connect`
+    check : `callable`, optional
+        method taking a connection and returning `True` if it can be
+        re-used, this is called for each connection checked out of the
+        pool
+
+    Notes
+    -----
+    All methods are thread-safe, a connection is only ever used by the
+    caller that checked it out.
+    """
+    def __init__(self, maxsize=4, timeout=300, connect=None, check=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._connect = connect or auth_connect
+        self._check = check or _is_alive
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(idle) for idle in self._idle.itervalues())
+
+    def _pop_idle(self, key):
+        """Pop the most recently used, unexpired connection for a key
+        """
+        with self._lock:
+            idle = self._idle.get(key, [])
+            expired = []
+            if self.timeout is not None:
+                now = time.time()
+                while idle and now - idle[0][1] > self.timeout:
+                    expired.append(idle.pop(0)[0])
+            connection = idle.pop()[0] if idle else None
+        for conn in expired:
+            _close(conn)
+        return connection
+
+    def get(self, host, port=None):
+        """Check out a connection to the given server
+
+        An idle connection is re-used if one passes the health check,
+        otherwise a new connection is opened.
+
+        Parameters
+        ----------
+        host : `str`
+            name of server with which to connect
+        port : `int`, optional
+            connection port
+
+        Returns
+        -------
+        connection : `nds2.connection`
+            an open connection, which should be handed back with
+            `ConnectionPool.put` when finished
+        """
+        return self._checkout(host, port)[0]
+
+    def _checkout(self, host, port=None):
+        """Check out a connection, and whether it was re-used
+        """
+        key = (host, port)
+        while True:
+            connection = self._pop_idle(key)
+            if connection is None:
+                return self._connect(host, port), False
+            if self._check(connection):
+                return connection, True
+            _close(connection)
+
+    def put(self, connection, host, port=None):
+        """Return a connection to the pool
+
+        The connection is closed if the pool already holds ``maxsize``
+        idle connections for this server.
+        """
+        key = (host, port)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append((connection, time.time()))
+                return
+        _close(connection)
+
+    @contextmanager
+    def connection(self, host, port=None):
+        """Context manager to check out a connection for a block of code
+
+        The connection is returned to the pool afterwards, unless an
+        exception was raised, in which case it is closed.
+
+        Examples
+        --------
+        >>> with CONNECTION_POOL.connection('nds.ligo.caltech.edu') as conn:
+        ...     conn.find_channels('L1:*')
+        """
+        conn = self.get(host, port)
+        try:
+            yield conn
+        except Exception:
+            _close(conn)
+            raise
+        else:
+            self.put(conn, host, port)
+
+    def call(self, func, host, port=None):
+        """Call a function with a connection to the given server
+
+        The server may have closed an idle connection without the pool
+        knowing, so if ``func`` raises a `RuntimeError` (as raised by
+        `nds2`) using a re-used connection, and the error message says
+        that the connection was closed or broken (see
+        `DEAD_CONNECTION_ERROR`), that connection is closed and ``func``
+        is called once more with a new connection. Any other error
+        (e.g. missing data) is raised straight away.
+
+        Parameters
+        ----------
+        func : `callable`
+            method to call as ``func(connection)``
+        host : `str`
+            name of server with which to connect
+        port : `int`, optional
+            connection port
+
+        Returns
+        -------
+        result
+            the return value of ``func``
+
+        Examples
+        --------
+        >>> CONNECTION_POOL.call(lambda conn: conn.find_channels('L1:*'),
+        ...                      'nds.ligo.caltech.edu')
+        """
+        conn, reused = self._checkout(host, port)
+        try:
+            result = func(conn)
+        except RuntimeError as e:
+            _close(conn)
+            if not (reused and _is_dead_connection_error(e)):
+                raise
+            conn = self._connect(host, port)
+            try:
+                result = func(conn)
+            except Exception:
+                _close(conn)
+                raise
+        except Exception:
+            _close(conn)
+            raise
+        self.put(conn, host, port)
+        return result
+
+    def clear(self):
+        """Close all idle connections
+        """
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.itervalues():
+            for conn, _ in connections:
+                _close(conn)
+
+
+#: the pool of connections used by all NDS queries in GWpy
+CONNECTION_POOL = ConnectionPool()
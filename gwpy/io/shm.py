@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Shared-memory transport of array data between processes
+
+When data are read in parallel, the parent process lays out a single
+memory-mapped buffer large enough to hold the joined output arrays, and
+each worker writes its samples directly into the right region of that
+buffer, returning only a small amount of metadata. The final arrays are
+views of the buffer, so no data are pickled, piped, or joined.
+
+The buffer is a file in ``/dev/shm`` where available and large enough
+(otherwise the default temporary directory), that is unlinked as soon as
+the workers have finished writing, so its memory is released when the
+last array using it is deleted.
+"""
+
+import os
+import tempfile
+
+import numpy
+
+from ..utils.compat import OrderedDict
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+#: directory in which to create shared buffers
+SHM_DIR = os.path.isdir('/dev/shm') and '/dev/shm' or None
+
+#: byte alignment of each array in a shared buffer
+ALIGNMENT = 64
+
+
+def _items(data):
+    """Return the (key, array) pairs for an array, or `dict` of arrays
+
+    Returns `None` if ``data`` is neither.
+    """
+    if isinstance(data, numpy.ndarray):
+        return [(None, data)]
+    if isinstance(data, dict) and all(
+            isinstance(arr, numpy.ndarray) for arr in data.values()):
+        return list(data.items())
+    return None
+
+
+def describe(data):
+    """Describe some data for transport through a shared buffer
+
+    Parameters
+    ----------
+    data : `~gwpy.data.Series`, `dict` of `~gwpy.data.Series`
+        the data to describe
+
+    Returns
+    -------
+    description : `list` of `tuple`
+        one ``(key, template, shape, dtype)`` tuple for each array, where
+        ``template`` is an empty slice of the array carrying all of its
+        metadata, or `None` if the data cannot be transported via a
+        shared buffer
+    """
+    items = _items(data)
+    if items is None:
+        return None
+    return [(key, arr[:0], arr.shape, arr.dtype.str) for key, arr in items]
+
+
+def plan(description):
+    """Lay out a shared buffer to hold a set of arrays
+
+    Parameters
+    ----------
+    description : `list`
+        ``(key, template, shape, dtype)`` for each output array, in the
+        same format as returned by `describe`
+
+    Returns
+    -------
+    nbytes : `int`
+        the total size of buffer required
+    layout : `~collections.OrderedDict`
+        ``(key, (offset, shape, dtype, template))`` for each array, giving
+        the byte offset of the start of that array in the buffer
+    """
+    layout = OrderedDict()
+    nbytes = 0
+    for key, template, shape, dtype in description:
+        shape = tuple(int(x) for x in shape)
+        size = int(numpy.prod(shape)) * numpy.dtype(dtype).itemsize
+        layout[key] = (nbytes, shape, numpy.dtype(dtype).str, template)
+        nbytes += -(-size // ALIGNMENT) * ALIGNMENT
+    return nbytes, layout
+
+
+def _free_space(directory):
+    """Return the number of bytes available in a directory, or `None`
+    """
+    try:
+        stat = os.statvfs(directory)
+    except (AttributeError, OSError):  # not POSIX, or doesn't exist
+        return None
+    return stat.f_bavail * stat.f_frsize
+
+
+def allocate(nbytes):
+    """Create a new shared buffer
+
+    Parameters
+    ----------
+    nbytes : `int`
+        size of buffer required
+
+    Returns
+    -------
+    path : `str`
+        the path of the file backing the buffer, pass this to `write` in
+        each worker process
+    buffer : `numpy.memmap`
+        the buffer, as an array of bytes
+
+    Notes
+    -----
+    The file is created sparse, so writing into a buffer on a filesystem
+    without enough space would crash the process (with ``SIGBUS``) rather
+    than raise an exception. If `SHM_DIR` doesn't have room for the
+    buffer, it is created in the default temporary directory instead.
+    """
+    directory = SHM_DIR
+    if directory is not None and (_free_space(directory) or 0) < nbytes:
+        directory = tempfile.gettempdir()
+    fd, path = tempfile.mkstemp(prefix='gwpy-shm-', dir=directory)
+    try:
+        os.ftruncate(fd, max(nbytes, 1))
+    finally:
+        os.close(fd)
+    return path, numpy.memmap(path, dtype=numpy.uint8, mode='r+',
+                              shape=(max(nbytes, 1),))
+
+
+def _view(buffer_, layout, key):
+    offset, shape, dtype = layout[key][:3]
+    return numpy.ndarray(shape, dtype=dtype, buffer=buffer_, offset=offset)
+
+
+def write(data, path, layout, index):
+    """Write data into a shared buffer
+
+    Parameters
+    ----------
+    data : `~gwpy.data.Series`, `dict` of `~gwpy.data.Series`
+        the data to write
+    path : `str`
+        the path of the shared buffer, as returned by `allocate`
+    layout : `~collections.OrderedDict`
+        the layout of the buffer, as returned by `plan`
+    index : `dict`
+        the ``(key, index)`` position along the first axis of each output
+        array at which to write the matching array in ``data``
+
+    Raises
+    ------
+    ValueError
+        if any array in ``data`` doesn't fit in its output array
+    """
+    buffer_ = numpy.memmap(path, dtype=numpy.uint8, mode='r+')
+    try:
+        for key, arr in _items(data):
+            target = _view(buffer_, layout, key)
+            idx = index[key]
+            if idx < 0 or idx + arr.shape[0] > target.shape[0]:
+                raise ValueError("Cannot write %d samples at index %d of "
+                                 "shared array %r with %d samples"
+                                 % (arr.shape[0], idx, key, target.shape[0]))
+            target[idx:idx+arr.shape[0]] = arr.view(numpy.ndarray)
+        buffer_.flush()
+    finally:
+        del buffer_
+
+
+def release(path):
+    """Remove the file backing a shared buffer
+
+    Existing views of the buffer remain valid.
+    """
+    if os.path.isfile(path):
+        os.remove(path)
+
+
+def assemble(buffer_, layout):
+    """Build the output arrays from a filled shared buffer
+
+    Parameters
+    ----------
+    buffer_ : `numpy.memmap`
+        the buffer returned by `allocate`
+    layout : `~collections.OrderedDict`
+        the layout returned by `plan`
+
+    Returns
+    -------
+    arrays : `~collections.OrderedDict`
+        ``(key, array)`` pairs, each array is a view of the buffer with
+        the type and metadata of the template for that key
+    """
+    out = OrderedDict()
+    for key in layout:
+        template = layout[key][3]
+        arr = _view(buffer_, layout, key).view(type(template))
+        arr.__dict__ = template.copy_metadata()
+        arr.__dict__.pop('_xindex', None)
+        out[key] = arr
+    return out
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Parallel execution of GWpy tasks
+
+All GWpy methods that accept an ``nproc`` keyword argument (e.g.
+`TimeSeries.read`, `TimeSeries.spectrogram`) distribute their work through
+an executor from this module:
+
+- ``'process'`` : a persistent pool of worker processes (default)
+- ``'thread'`` : a persistent pool of worker threads, best when the
+  work releases the GIL (e.g. FFTs, most I/O)
+- ``'serial'`` : run everything in the calling process
+
+Pools are created the first time they are needed and then re-used by
+subsequent calls with the same ``nproc``, so repeated calls don't pay the
+cost of starting new processes. Work is split into several small tasks
+per worker, and idle workers take the next task, so uneven tasks don't
+leave workers waiting.
+
+The default executor can be set with the ``GWPY_PARALLEL`` environment
+variable, or with `set_executor`, or temporarily changed using the
+`executor` context manager::
+
+    >>> from gwpy import parallel
+    >>> with parallel.executor('thread'):
+    ...     specgram = data.spectrogram(20, 4, 2, nproc=8)
+
+Alternatively, an `Executor` instance can be given as the ``nproc``
+argument of any of these methods.
+"""
+
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+from .executor import (Executor, SerialExecutor, ThreadExecutor,
+                       ProcessExecutor, register_executor, set_executor,
+                       get_executor, executor, shutdown, chunks, map)
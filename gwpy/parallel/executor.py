@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Executors for parallel tasks
+"""
+
+from __future__ import division
+
+import atexit
+import os
+import pickle
+import warnings
+from contextlib import contextmanager
+from math import ceil
+from multiprocessing import (Process, Queue as ProcessQueue, cpu_count)
+from multiprocessing.pool import (Pool, ThreadPool)
+from threading import (Lock, local)
+
+from ..utils.compat import OrderedDict
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+__all__ = ['Executor', 'SerialExecutor', 'ThreadExecutor', 'ProcessExecutor',
+           'register_executor', 'set_executor', 'get_executor', 'executor',
+           'shutdown', 'chunks', 'map']
+
+EXECUTORS = OrderedDict()
+DEFAULT_EXECUTOR_ENV = 'GWPY_PARALLEL'
+
+#: number of tasks to create per worker when splitting work
+TASKS_PER_WORKER = 4
+
+# the default executor name, a thread-local override, and the pool cache
+_DEFAULT = {}
+_LOCAL = local()
+_POOLS = {}
+_POOLS_LOCK = Lock()
+
+
+class Executor(object):
+    """Base class for parallel executors
+
+    Parameters
+    ----------
+    nworkers : `int`, optional, default: ``1``
+        number of workers
+    """
+    name = None
+
+    def __init__(self, nworkers=1):
+        self.nworkers = max(int(nworkers), 1)
+
+    def __repr__(self):
+        return '<%s(nworkers=%d)>' % (type(self).__name__, self.nworkers)
+
+    def map(self, func, tasks):
+        """Apply a function to each of a list of tasks
+
+        Parameters
+        ----------
+        func : `callable`
+            method to call with each task as its only argument
+        tasks : `iterable`
+            the tasks to execute
+
+        Returns
+        -------
+        results : `list`
+            the result of each task, in the same order as ``tasks``
+
+        Raises
+        ------
+        Exception
+            the first exception raised by any task is re-raised in the
+            calling process
+        """
+        raise NotImplementedError("%s does not implement map"
+                                  % type(self).__name__)
+
+    def shutdown(self):
+        """Release any resources (e.g. worker processes) held
+        """
+        pass
+
+
+class SerialExecutor(Executor):
+    """Execute tasks one at a time in the calling process
+    """
+    name = 'serial'
+
+    def map(self, func, tasks):
+        return [func(task) for task in tasks]
+
+
+class _PoolExecutor(Executor):
+    """Base class for executors that use a persistent `multiprocessing` pool
+    """
+    _pool_class = None
+
+    def __init__(self, nworkers=1):
+        super(_PoolExecutor, self).__init__(nworkers=nworkers)
+        self._pool = None
+        self._pid = None
+
+    @property
+    def pool(self):
+        """The pool of workers, created when first needed
+        """
+        # don't use a pool inherited from a parent process
+        if self._pool is None or self._pid != os.getpid():
+            self._pool = self._pool_class(self.nworkers)
+            self._pid = os.getpid()
+        return self._pool
+
+    def map(self, func, tasks):
+        tasks = list(tasks)
+        if len(tasks) <= 1 or self.nworkers == 1:
+            return SerialExecutor().map(func, tasks)
+        # chunksize=1 means each idle worker takes the next task
+        return self.pool.map(func, tasks, chunksize=1)
+
+    def shutdown(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.terminate()
+            self._pool.join()
+        self._pool = None
+
+
+class ThreadExecutor(_PoolExecutor):
+    """Execute tasks using a persistent pool of threads
+
+    This is best used for tasks that spend most of their time outside of
+    the Python interpreter lock, e.g. FFTs or file I/O.
+    """
+    name = 'thread'
+    _pool_class = ThreadPool
+
+
+class ProcessExecutor(_PoolExecutor):
+    """Execute tasks using a persistent pool of processes
+
+    The function and tasks are pickled to send them to the workers. If the
+    function cannot be pickled (e.g. a closure), the tasks are instead
+    executed by new processes forked for this call only.
+    """
+    name = 'process'
+    _pool_class = Pool
+
+    def map(self, func, tasks):
+        tasks = list(tasks)
+        if len(tasks) <= 1 or self.nworkers == 1:
+            return SerialExecutor().map(func, tasks)
+        try:
+            pickle.dumps(func, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return _fork_map(func, tasks, self.nworkers)
+        return super(ProcessExecutor, self).map(func, tasks)
+
+
+def _fork_map(func, tasks, nproc):
+    """Map a function over some tasks using newly-forked processes
+
+    The tasks are inherited by the workers when they are forked, rather
+    than pickled, so this works for any function; each worker takes the
+    next task from a shared queue when idle.
+    """
+    def _run(inq, outq):
+        while True:
+            i = inq.get()
+            if i is None:
+                break
+            try:
+                outq.put((i, func(tasks[i])))
+            except Exception as e:
+                outq.put((i, e))
+
+    nproc = min(nproc, len(tasks))
+    inq = ProcessQueue()
+    outq = ProcessQueue()
+    for i in range(len(tasks)):
+        inq.put(i)
+    processlist = []
+    for i in range(nproc):
+        inq.put(None)
+        process = Process(target=_run, args=(inq, outq))
+        process.daemon = True
+        processlist.append(process)
+        process.start()
+
+    # get data
+    results = [None] * len(tasks)
+    error = None
+    for i in range(len(tasks)):
+        i, result = outq.get()
+        if isinstance(result, Exception) and error is None:
+            error = result
+        results[i] = result
+
+    # and block
+    for process in processlist:
+        process.join()
+    if error is not None:
+        raise error
+    return results
+
+
+# -- registry -----------------------------------------------------------------
+
+def register_executor(executor, name=None, force=False):
+    """Register a new `Executor`
+
+    Parameters
+    ----------
+    executor : `type`
+        sub-class of `Executor` to register
+    name : `str`, optional
+        name of the executor, defaults to ``executor.name``
+    force : `bool`, optional, default: `False`
+        override an existing registration with the same name
+    """
+    if name is None:
+        name = executor.name
+    if name in EXECUTORS and not force:
+        raise KeyError("'%s' already registered, use force=True to override."
+                       % name)
+    EXECUTORS[name] = executor
+
+
+for _executor in (ProcessExecutor, ThreadExecutor, SerialExecutor):
+    register_executor(_executor)
+
+
+def set_executor(name):
+    """Set the default type of executor for this process
+
+    Parameters
+    ----------
+    name : `str`
+        name of the registered executor to use, e.g. ``'thread'``
+    """
+    if name not in EXECUTORS:
+        raise ValueError("No executor registered with name %r, available "
+                         "executors are: %s"
+                         % (name, ', '.join(EXECUTORS.keys())))
+    _DEFAULT['name'] = name
+
+
+def _default_name():
+    try:
+        return _LOCAL.stack[-1]
+    except (AttributeError, IndexError):
+        pass
+    try:
+        return _DEFAULT['name']
+    except KeyError:
+        name = os.getenv(DEFAULT_EXECUTOR_ENV, 'process')
+        try:
+            set_executor(name)
+        except ValueError as e:
+            warnings.warn("Cannot use executor %r set by %s, using "
+                          "'process' instead: %s"
+                          % (name, DEFAULT_EXECUTOR_ENV, str(e)))
+            set_executor('process')
+        return _DEFAULT['name']
+
+
+def get_executor(nproc=1, name=None):
+    """Return an executor with the given number of workers
+
+    Executors are cached, so that repeated calls with the same arguments
+    re-use the same pool of workers.
+
+    Parameters
+    ----------
+    nproc : `int`, `Executor`, optional, default: ``1``
+        number of workers, or an `Executor` to return as is
+    name : `str`, optional
+        name of the executor type to use, defaults to that set by the
+        innermost active `executor` context in this thread, otherwise
+        `set_executor`, otherwise the ``GWPY_PARALLEL`` environment
+        variable, otherwise ``'process'``
+
+    Returns
+    -------
+    executor : `Executor`
+        the executor to use
+    """
+    if isinstance(nproc, Executor):
+        return nproc
+    nproc = int(nproc or 1)
+    if nproc <= 1:
+        return SerialExecutor()
+    if nproc > cpu_count():
+        warnings.warn("Using %d processes on a %d-core machine is "
+                      "unrecommended...but not forbidden."
+                      % (nproc, cpu_count()))
+    if name is None:
+        name = _default_name()
+    key = (name, nproc)
+    with _POOLS_LOCK:
+        try:
+            return _POOLS[key]
+        except KeyError:
+            try:
+                _POOLS[key] = new = EXECUTORS[name](nproc)
+            except KeyError:
+                raise ValueError("No executor registered with name %r" % name)
+            return new
+
+
+@contextmanager
+def executor(name):
+    """Context manager to temporarily use a different type of executor
+
+    The executor is only changed for the current thread.
+
+    Parameters
+    ----------
+    name : `str`
+        name of the registered executor to use
+
+    Examples
+    --------
+    >>> from gwpy import parallel
+    >>> with parallel.executor('serial'):
+    ...     data = TimeSeries.read(cache, 'X1:TEST', nproc=4)
+    """
+    if name not in EXECUTORS:
+        raise ValueError("No executor registered with name %r" % name)
+    try:
+        stack = _LOCAL.stack
+    except AttributeError:
+        stack = _LOCAL.stack = []
+    stack.append(name)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+
+@atexit.register
+def shutdown():
+    """Shut down all cached executors, stopping their workers
+    """
+    with _POOLS_LOCK:
+        while _POOLS:
+            _POOLS.popitem()[1].shutdown()
+
+
+# -- utilities ----------------------------------------------------------------
+
+def chunks(n, nworkers, minsize=1):
+    """Split ``n`` items into chunks for parallel processing
+
+    Several chunks are created per worker, so that the work can be
+    balanced dynamically between workers. For a single worker, all items
+    are returned as one chunk.
+
+    Parameters
+    ----------
+    n : `int`
+        number of items
+    nworkers : `int`, `Executor`
+        number of workers, or the executor that will process the chunks
+    minsize : `int`, optional, default: ``1``
+        minimum number of items per chunk
+
+    Returns
+    -------
+    chunks : `list` of `slice`
+        the slice of items in each chunk
+    """
+    if isinstance(nworkers, Executor):
+        nworkers = nworkers.nworkers
+    if nworkers <= 1:
+        return n and [slice(0, n)] or []
+    nchunk = nworkers * TASKS_PER_WORKER
+    size = max(int(ceil(n / nchunk)), minsize, 1)
+    return [slice(i, min(i + size, n)) for i in range(0, n, size)]
+
+
+def map(func, tasks, nproc=1):
+    """Apply a function to each of a list of tasks, in parallel
+
+    Parameters
+    ----------
+    func : `callable`
+        method to call with each task as its only argument
+    tasks : `iterable`
+        the tasks to execute
+    nproc : `int`, `Executor`, optional, default: ``1``
+        number of workers to use, or the `Executor` to use
+
+    Returns
+    -------
+    results : `list`
+        the result of each task, in the same order as ``tasks``
+
+    See Also
+    --------
+    get_executor
+        for details of how the executor is chosen
+    """
+    return get_executor(nproc).map(func, tasks)
@@ -22,14 +22,14 @@ time-frequency coherence spectrogram from a pair of time-series.
 
 from __future__ import division
 
-from multiprocessing import (Process, Queue as ProcessQueue)
-from math import ceil
+from functools import partial
 
 from numpy import zeros
 
 from astropy import units
 
-from .. import version
+from .. import (version, parallel)
+from ..spectrum.batch import coherence_spectrogram
 from .core import (Spectrogram, SpectrogramList)
 
 __author__ = "Duncan Macleod <duncan.macleod@ligo.org>"
@@ -43,8 +43,10 @@ def _from_timeseries(ts1, ts2, stride, fftlength=None, overlap=None,
     :class:`~gwpy.spectrogram.core.Spectrogram` from a pair of
     :class:`~gwpy.timeseries.TimeSeries`.
 
-    For each `stride`, a PSD :class:`~gwpy.spectrum.core.Spectrum`
-    is generated, with all resulting spectra stacked in time and returned.
+    The segment FFTs for all strides are calculated in a single
+    vectorised pass, with each column equivalent to calling
+    :meth:`TimeSeries.coherence <gwpy.timeseries.TimeSeries.coherence>`
+    on the relevant stride.
     """
     # check sampling rates
     if ts1.sample_rate.to('Hertz') != ts2.sample_rate.to('Hertz'):
@@ -66,6 +68,8 @@ def _from_timeseries(ts1, ts2, stride, fftlength=None, overlap=None,
     df = 1 / fftlength
 
     stride = int(stride * sampling)
+    nfft = int(fftlength * sampling)
+    noverlap = int(overlap * sampling)
 
     # get size of spectrogram
     nsteps = int(ts1.size // stride)
@@ -78,18 +82,11 @@ def _from_timeseries(ts1, ts2, stride, fftlength=None, overlap=None,
     if not nsteps:
         return out
 
-    # stride through TimeSeries, recording PSDs as columns of spectrogram
-    for step in range(nsteps):
-        # find step TimeSeries
-        idx = stride * step
-        idx_end = idx + stride
-        stepseries1 = ts1[idx:idx_end]
-        stepseries2 = ts2[idx:idx_end]
-        stepcoh = stepseries1.coherence(stepseries2, fftlength=fftlength,
-                                        overlap=overlap, window=window,
-                                        **kwargs)
-        out.value[step] = stepcoh.value
-
+    # calculate coherence for all strides at once
+    size = nsteps * stride
+    out.value[:] = coherence_spectrogram(ts1.value[:size], ts2.value[:size],
+                                         stride, nfft, noverlap=noverlap,
+                                         window=window, **kwargs)
     return out
 
 
@@ -109,9 +106,9 @@ def from_timeseries(ts1, ts2, stride, fftlength=None, overlap=None,
         number of seconds of overlap between FFTs, defaults to no overlap
     window : `timeseries.window.Window`, optional, default: `None`
         window function to apply to timeseries prior to FFT.
-    nproc : `int`, default: ``1``
-        maximum number of independent frame reading processes, default
-        is set to single-process file reading.
+    nproc : `int`, `~gwpy.parallel.Executor`, default: ``1``
+        maximum number of parallel workers, or the executor to use,
+        default is set to single-process calculation.
 
     Returns
     -------
@@ -127,52 +124,33 @@ def from_timeseries(ts1, ts2, stride, fftlength=None, overlap=None,
 
     # get size of spectrogram
     nsteps = int(ts1.size // (stride * ts1.sample_rate.value))
-    nproc = min(nsteps, nproc)
+    if not isinstance(nproc, parallel.Executor):
+        nproc = min(nsteps, nproc)
 
     # single-process return
-    if nsteps == 0 or nproc == 1:
+    if nsteps == 0 or parallel.get_executor(nproc).nworkers == 1:
         return _from_timeseries(ts1, ts2, stride, fftlength=fftlength,
                                 overlap=overlap, window=window, **kwargs)
 
-    # wrap spectrogram generator
-    def _specgram(q, ts, ts2):
-        try:
-            q.put(_from_timeseries(ts, ts2, stride, fftlength=fftlength,
-                                   overlap=overlap, window=window,
-                                   **kwargs))
-        except Exception as e:
-            q.put(e)
-
-    # otherwise build process list
-    stepperproc = int(ceil(nsteps / nproc))
-    nsamp = [stepperproc * ts.sample_rate.value * stride for ts in (ts1, ts2)]
-
-    queue = ProcessQueue(nproc)
-    processlist = []
-    for i in range(nproc):
-        process = Process(target=_specgram,
-                          args=(queue, ts1[i * nsamp[0]:(i + 1) * nsamp[0]],
-                                ts2[i * nsamp[1]:(i + 1) * nsamp[1]]))
-        process.daemon = True
-        processlist.append(process)
-        process.start()
-        if ((i + 1) * nsamp[0]) >= ts1.size:
-            break
-
-    # get data
-    data = []
-    for process in processlist:
-        result = queue.get()
-        if isinstance(result, Exception):
-            raise result
-        else:
-            data.append(result)
-
-    # and block
-    for process in processlist:
-        process.join()
+    # split the strides into chunks, and process them in parallel
+    executor = parallel.get_executor(nproc)
+    nsamp = [ts.sample_rate.value * stride for ts in (ts1, ts2)]
+    tasks = [(ts1[int(chunk.start * nsamp[0]):int(chunk.stop * nsamp[0])],
+              ts2[int(chunk.start * nsamp[1]):int(chunk.stop * nsamp[1])])
+             for chunk in parallel.chunks(nsteps, executor)]
+    data = executor.map(partial(_coherence_chunk, stride=stride,
+                                fftlength=fftlength, overlap=overlap,
+                                window=window, **kwargs), tasks)
 
     # format and return
     out = SpectrogramList(*data)
     out.sort(key=lambda spec: spec.epoch.gps)
     return out.join()
+
+
+def _coherence_chunk(chunk, **kwargs):
+    """Calculate the coherence `Spectrogram` for one chunk of data
+
+    This is the worker function for parallel `from_timeseries` calls.
+    """
+    return _from_timeseries(chunk[0], chunk[1], **kwargs)
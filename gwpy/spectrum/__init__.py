@@ -26,6 +26,8 @@ __version__ = version.version
 # import objects
 from .core import *
 from .hist import *
+from .cache import *
+from .running import *
 
 # import unified I/O
 from .io import *
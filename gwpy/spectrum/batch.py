@@ -0,0 +1,642 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Batched Fourier transforms of overlapping data segments
+
+The methods in this module operate on plain `numpy.ndarray` data, and
+are used internally by the `~gwpy.timeseries.TimeSeries` spectral
+methods to transform all segments of a series in one go, rather than
+slicing and transforming each segment in a Python loop.
+"""
+
+from __future__ import division
+
+import numpy
+from numpy.lib.stride_tricks import as_strided
+
+from scipy import signal
+
+from .cache import get_window
+from ..fft import rfft
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+__all__ = []
+
+
+def num_segments(size, nfft, noverlap=0):
+    """Return the number of complete segments that fit in a data array
+
+    Parameters
+    ----------
+    size : `int`
+        number of samples in the data array
+    nfft : `int`
+        number of samples in a single segment
+    noverlap : `int`, optional, default: ``0``
+        number of samples of overlap between neighbouring segments
+
+    Returns
+    -------
+    nseg : `int`
+        the number of segments
+    """
+    if size < nfft:
+        return 0
+    return 1 + (size - nfft) // (nfft - noverlap)
+
+
+def strided_segments(data, nfft, noverlap=0):
+    """Return a 2-D view of the overlapping segments of an array
+
+    No data are copied, each row of the output is a view of the relevant
+    slice of the input, so the output must not be written to.
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        1-D input data array
+    nfft : `int`
+        number of samples in a single segment
+    noverlap : `int`, optional, default: ``0``
+        number of samples of overlap between neighbouring segments
+
+    Returns
+    -------
+    segments : `numpy.ndarray`
+        2-D array of shape ``(nseg, nfft)``
+    """
+    data = numpy.asarray(data)
+    if data.ndim != 1:
+        raise ValueError("Cannot segment %d-dimensional data" % data.ndim)
+    nstride = nfft - noverlap
+    if nstride < 1:
+        raise ValueError("noverlap must be less than nfft")
+    nseg = num_segments(data.size, nfft, noverlap)
+    step = data.strides[0]
+    return as_strided(data, shape=(nseg, nfft),
+                      strides=(nstride * step, step))
+
+
+def strided_columns(data, nsamp, nfft, noverlap=0):
+    """Return a view of the overlapping segments in each stride of an array
+
+    For N-D input, each row (along the last axis) is segmented separately.
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        input data array, segmented along the last axis
+    nsamp : `int`
+        number of samples in a single stride (column)
+    nfft : `int`
+        number of samples in a single segment
+    noverlap : `int`, optional, default: ``0``
+        number of samples of overlap between neighbouring segments
+
+    Returns
+    -------
+    segments : `numpy.ndarray`
+        array of shape ``data.shape[:-1] + (ncol, nseg, nfft)``, as a
+        read-only view of the input
+    """
+    data = numpy.asarray(data)
+    if data.ndim < 1:
+        raise ValueError("Cannot segment %d-dimensional data" % data.ndim)
+    nstride = nfft - noverlap
+    if nstride < 1:
+        raise ValueError("noverlap must be less than nfft")
+    ncol = data.shape[-1] // nsamp
+    nseg = num_segments(nsamp, nfft, noverlap)
+    step = data.strides[-1]
+    return as_strided(data, shape=data.shape[:-1] + (ncol, nseg, nfft),
+                      strides=data.strides[:-1] + (nsamp * step,
+                                                   nstride * step, step))
+
+
+def column_ffts(data, nsamp, nfft, noverlap=0, window=None, detrend=None,
+                pad_to=None):
+    """Calculate the FFT of each overlapping segment in each stride of an
+    array
+
+    The output can be passed as ``xfft`` to :func:`coherence_spectrogram`
+    or :func:`csd_spectrogram` to reuse the transform of a target array
+    against several sets of other arrays.
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        1-D input data array
+    nsamp : `int`
+        number of samples in a single stride (column)
+    nfft : `int`
+        number of samples in a single segment
+    noverlap : `int`, optional, default: ``0``
+        number of samples of overlap between neighbouring segments
+    window : `numpy.ndarray`, optional
+        window array to apply to each segment before the FFT
+    detrend : `str`, `callable`, optional
+        type of detrending to apply to each segment, default is to not
+        detrend
+    pad_to : `int`, optional
+        number of points to which each segment is zero-padded before
+        the FFT, defaults to ``nfft``
+
+    Returns
+    -------
+    ffts : `numpy.ndarray`
+        3-D complex array of shape ``(ncol, nseg, pad_to // 2 + 1)``, the
+        un-normalised DFT of each segment
+    """
+    segments = strided_columns(data, nsamp, nfft, noverlap=noverlap)
+    return _rfft_block(segments, pad_to or nfft, window=window,
+                       detrend=detrend)
+
+
+def format_window(window, nfft, dtype=None):
+    """Return a window array of the correct length
+
+    Parameters
+    ----------
+    window : `str`, `tuple`, `numpy.ndarray`
+        name of the window function to use, or an array of length
+        ``nfft`` to use as the window, `None` is interpreted as
+        ``'boxcar'``
+    nfft : `int`
+        length of the window
+    dtype : `numpy.dtype`, optional
+        numeric type for the window
+
+    Returns
+    -------
+    window : `numpy.ndarray`
+        the window array, named windows are returned from the
+        shared cache so are read-only
+
+    Raises
+    ------
+    ValueError
+        if the input window array is not 1-D, or is the wrong size
+    """
+    if window is None:
+        window = 'boxcar'
+    if dtype is None:
+        dtype = numpy.float64
+    if isinstance(window, (str, tuple)):
+        return get_window(window, nfft, dtype=dtype)
+    win = numpy.asarray(window)
+    if win.ndim != 1:
+        raise ValueError('window must be 1-D')
+    elif win.shape[0] != nfft:
+        raise ValueError('Window is the wrong size.')
+    return win.astype(dtype, copy=False)
+
+
+def fft_segments(data, nfft, noverlap=0, window=None, detrend=None):
+    """Calculate the one-sided DFT of each overlapping segment of an array
+
+    All segments are detrended and windowed as a single 2-D block, and
+    transformed with a single call to :func:`gwpy.fft.rfft`.
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        1-D input data array
+    nfft : `int`
+        number of samples in a single segment
+    noverlap : `int`, optional, default: ``0``
+        number of samples of overlap between neighbouring segments
+    window : `numpy.ndarray`, optional
+        window array to apply to each segment before the FFT
+    detrend : `str`, optional
+        type of detrending to apply to each segment, see
+        :func:`scipy.signal.detrend` for options, default is to not
+        detrend
+
+    Returns
+    -------
+    ffts : `numpy.ndarray`
+        2-D complex array of shape ``(nseg, nfft // 2 + 1)``, the
+        un-normalised DFT of each segment
+    """
+    segments = strided_segments(data, nfft, noverlap=noverlap)
+    return _rfft_block(segments, nfft, window=window, detrend=detrend)
+
+
+def _rfft_block(segments, nfft, window=None, detrend=None):
+    """Detrend, window, and FFT a block of segments along the last axis
+
+    ``detrend`` can also be a function, which is applied to each segment
+    in turn, as for :mod:`matplotlib.mlab`.
+    """
+    if detrend == 'constant':
+        segments = segments - segments.mean(axis=-1, keepdims=True)
+    elif callable(detrend):
+        segments = numpy.apply_along_axis(detrend, -1, segments)
+    elif detrend:
+        segments = signal.detrend(segments, axis=-1, type=detrend)
+    if window is not None:
+        segments = segments * window
+    return rfft(segments, n=nfft, axis=-1)
+
+
+# maximum number of samples to transform in a single block when
+# averaging over strides, to keep memory usage bounded for long series
+BLOCK_SIZE = 2 ** 22
+
+
+def median_bias(n):
+    """Return the bias of the median of ``n`` chi-squared(2) variates
+
+    The median of a set of periodograms is a biased estimator of the
+    mean, this factor is used to correct for that bias.
+
+    Parameters
+    ----------
+    n : `int`
+        number of averages
+
+    Returns
+    -------
+    bias : `float`
+        the ratio of the median to the mean
+    """
+    ii_2 = 2 * numpy.arange(1., (n - 1) // 2 + 1)
+    return 1 + numpy.sum(1. / (ii_2 + 1) - 1. / ii_2)
+
+
+def welch_spectrogram(data, nsamp, nfft, noverlap=0, window=None,
+                      sample_rate=1, detrend='constant', scaling='density',
+                      average='mean', other=None):
+    """Calculate an average power spectrum for each stride of an array
+
+    The segments of every stride are transformed as a batch from a single
+    strided view of the input data, and then averaged into columns.
+    Each column is equivalent to calling :func:`scipy.signal.welch`
+    (or :func:`scipy.signal.csd` if ``other`` is given) on the relevant
+    stride.
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        1-D input data array
+    nsamp : `int`
+        number of samples in a single stride (column)
+    nfft : `int`
+        number of samples in a single FFT segment
+    noverlap : `int`, optional, default: ``0``
+        number of samples of overlap between neighbouring segments
+    window : `numpy.ndarray`, optional
+        window array to apply to each segment, defaults to ``'boxcar'``
+    sample_rate : `float`, optional, default: ``1``
+        sampling frequency of the input data
+    detrend : `str`, optional, default: ``'constant'``
+        type of detrending to apply to each segment
+    scaling : `str`, optional, default: ``'density'``
+        one of ``'density'`` for a PSD or ``'spectrum'`` for a power
+        spectrum
+    average : `str`, optional, default: ``'mean'``
+        method by which to average segments, either ``'mean'`` or
+        ``'median'``
+    other : `numpy.ndarray`, optional
+        second 1-D input data array, of the same size as ``data``, with
+        which to calculate the cross-spectral density
+
+    Returns
+    -------
+    spectrogram : `numpy.ndarray`
+        2-D array of shape ``(nstride, nfft // 2 + 1)``, complex-valued
+        if ``other`` is given
+    """
+    data = numpy.asarray(data)
+    win = format_window(window, nfft)
+    scale = _scale_factor(win, sample_rate, scaling)
+    if average not in ('mean', 'median'):
+        raise ValueError("Unknown average method: %r" % average)
+
+    # build 3-D view of (stride, segment, sample)
+    ncol = data.size // nsamp
+    nseg = num_segments(nsamp, nfft, noverlap)
+    nfreq = nfft // 2 + 1
+    segments = strided_columns(data, nsamp, nfft, noverlap)
+    if other is None:
+        out = numpy.empty((ncol, nfreq))
+    else:
+        osegments = strided_columns(numpy.asarray(other), nsamp, nfft,
+                                    noverlap)
+        out = numpy.empty((ncol, nfreq), dtype=complex)
+    if average == 'median':
+        scale /= median_bias(nseg)
+
+    # loop over blocks of columns to limit memory usage
+    ncolblock = max(1, BLOCK_SIZE // max(nseg * nfft, 1))
+    for i in range(0, ncol, ncolblock):
+        xfft = _rfft_block(segments[i:i+ncolblock], nfft, window=win,
+                           detrend=detrend)
+        if other is None:
+            power = xfft.real ** 2 + xfft.imag ** 2
+        else:
+            yfft = _rfft_block(osegments[i:i+ncolblock], nfft, window=win,
+                               detrend=detrend)
+            power = numpy.empty(xfft.shape, dtype=complex)
+            power.real = xfft.real * yfft.real + xfft.imag * yfft.imag
+            power.imag = xfft.real * yfft.imag - xfft.imag * yfft.real
+        out[i:i+ncolblock] = _average(power, average, axis=1)
+    out *= scale
+    return _one_sided(out, nfft)
+
+
+def periodograms(data, nfft, noverlap=0, window=None, sample_rate=1,
+                 detrend='constant', scaling='density'):
+    """Calculate the periodogram of each overlapping segment of an array
+
+    Each row of the output is equivalent to calling
+    :func:`scipy.signal.periodogram` on the relevant segment.
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        1-D input data array
+    nfft : `int`
+        number of samples in a single FFT segment
+    noverlap : `int`, optional, default: ``0``
+        number of samples of overlap between neighbouring segments
+    window : `numpy.ndarray`, optional
+        window array to apply to each segment, defaults to ``'boxcar'``
+    sample_rate : `float`, optional, default: ``1``
+        sampling frequency of the input data
+    detrend : `str`, optional, default: ``'constant'``
+        type of detrending to apply to each segment
+    scaling : `str`, optional, default: ``'density'``
+        one of ``'density'`` for a PSD or ``'spectrum'`` for a power
+        spectrum
+
+    Returns
+    -------
+    periodograms : `numpy.ndarray`
+        2-D array of shape ``(nseg, nfft // 2 + 1)``
+    """
+    win = format_window(window, nfft)
+    ffts = fft_segments(data, nfft, noverlap=noverlap, window=win,
+                        detrend=detrend)
+    out = ffts.real ** 2 + ffts.imag ** 2
+    out *= _scale_factor(win, sample_rate, scaling)
+    return _one_sided(out, nfft)
+
+
+# map of matplotlib.mlab detrend names to scipy.signal.detrend types
+MLAB_DETRENDS = {
+    'mean': 'constant',
+    'none': None,
+    'default': None,
+}
+
+
+def coherence_spectrogram(data, others, nsamp, nfft, noverlap=0,
+                          window=None, detrend=None, pad_to=None, xfft=None):
+    """Calculate the coherence of one array with others, for each stride
+
+    The segment FFTs of ``data`` are calculated once for each block of
+    strides, and reused for the auto- and cross-spectra with every array
+    in ``others``, whose segments are transformed together in a single
+    batch for each block. Each column is equivalent to calling
+    :func:`matplotlib.mlab.cohere` on the relevant stride.
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        1-D target data array
+    others : `numpy.ndarray`
+        1-D array, or 2-D array of shape ``(nchan, size)``, of other data
+        with which to calculate the coherence, each of the same size as
+        ``data``
+    nsamp : `int`
+        number of samples in a single stride (column)
+    nfft : `int`
+        number of samples in a single FFT segment
+    noverlap : `int`, optional, default: ``0``
+        number of samples of overlap between neighbouring segments
+    window : `str`, `numpy.ndarray`, optional
+        window to apply to each segment, defaults to a symmetric Hann
+        window, as used by :func:`matplotlib.mlab.cohere`
+    detrend : `str`, `callable`, optional
+        type of detrending to apply to each segment, either a type
+        accepted by :func:`scipy.signal.detrend`, one of the
+        :mod:`matplotlib.mlab` names ``'mean'`` or ``'none'``, or a
+        function to apply to each segment (e.g.
+        :func:`matplotlib.mlab.detrend_linear`); default is to not detrend
+    pad_to : `int`, optional
+        number of points to which each segment is zero-padded before
+        the FFT, defaults to ``nfft``, as for :func:`matplotlib.mlab.cohere`
+    xfft : `numpy.ndarray`, optional
+        the segment FFTs of ``data``, as returned by :func:`column_ffts`
+        with the same parameters, to use instead of recalculating them
+
+    Returns
+    -------
+    coherence : `numpy.ndarray`
+        array of shape ``(ncol, pad_to // 2 + 1)`` if ``others`` is 1-D,
+        otherwise ``(nchan, ncol, pad_to // 2 + 1)``
+    """
+    window, detrend = coherence_defaults(nfft, window, detrend)
+    data = numpy.asarray(data)
+    others, single = _format_others(data, others)
+    out = numpy.empty((others.shape[0], data.size // nsamp,
+                       (pad_to or nfft) // 2 + 1))
+    for rows, cols, pxx, pyy, pxy in _cross_spectra(
+            data, others, nsamp, nfft, noverlap, window, detrend,
+            pad_to=pad_to, xfft=xfft):
+        out[rows, cols] = (pxy.real ** 2 + pxy.imag ** 2) / (pxx * pyy)
+    if single:
+        return out[0]
+    return out
+
+
+def csd_spectrogram(data, others, nsamp, nfft, noverlap=0, window=None,
+                    sample_rate=1, detrend='constant', scaling='density',
+                    xfft=None):
+    """Calculate the cross-spectral density of one array with others,
+    for each stride
+
+    The segment FFTs of ``data`` are calculated once for each block of
+    strides, and reused for the cross-spectrum with every array in
+    ``others``, whose segments are transformed together in a single
+    batch for each block. Each column is equivalent to calling
+    :func:`scipy.signal.csd` on the relevant stride.
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        1-D target data array
+    others : `numpy.ndarray`
+        1-D array, or 2-D array of shape ``(nchan, size)``, of other data
+        with which to calculate the CSD, each of the same size as ``data``
+    nsamp : `int`
+        number of samples in a single stride (column)
+    nfft : `int`
+        number of samples in a single FFT segment
+    noverlap : `int`, optional, default: ``0``
+        number of samples of overlap between neighbouring segments
+    window : `numpy.ndarray`, optional
+        window array to apply to each segment, defaults to ``'boxcar'``
+    sample_rate : `float`, optional, default: ``1``
+        sampling frequency of the input data
+    detrend : `str`, optional, default: ``'constant'``
+        type of detrending to apply to each segment
+    scaling : `str`, optional, default: ``'density'``
+        one of ``'density'`` for a CSD or ``'spectrum'`` for a
+        cross-power spectrum
+    xfft : `numpy.ndarray`, optional
+        the segment FFTs of ``data``, as returned by :func:`column_ffts`
+        with the same parameters, to use instead of recalculating them
+
+    Returns
+    -------
+    csd : `numpy.ndarray`
+        complex array of shape ``(ncol, nfft // 2 + 1)`` if ``others``
+        is 1-D, otherwise ``(nchan, ncol, nfft // 2 + 1)``
+    """
+    win = format_window(window, nfft)
+    data = numpy.asarray(data)
+    others, single = _format_others(data, others)
+    out = numpy.empty((others.shape[0], data.size // nsamp, nfft // 2 + 1),
+                      dtype=complex)
+    for rows, cols, _, _, pxy in _cross_spectra(
+            data, others, nsamp, nfft, noverlap, win, detrend, xfft=xfft):
+        out[rows, cols] = pxy
+    out *= _scale_factor(win, sample_rate, scaling)
+    _one_sided(out, nfft)
+    if single:
+        return out[0]
+    return out
+
+
+def coherence_defaults(nfft, window=None, detrend=None):
+    """Return the window array and detrend type used by
+    :func:`coherence_spectrogram`
+
+    Parameters
+    ----------
+    nfft : `int`
+        number of samples in a single FFT segment
+    window : `str`, `numpy.ndarray`, optional
+        window to apply to each segment, defaults to a symmetric Hann
+        window
+    detrend : `str`, `callable`, optional
+        type of detrending, :mod:`matplotlib.mlab` names are converted
+        to their :func:`scipy.signal.detrend` equivalent
+
+    Returns
+    -------
+    window : `numpy.ndarray`
+        the window array
+    detrend : `str`, `None`
+        the detrend type
+    """
+    if window is None:
+        window = numpy.hanning(nfft)
+    return format_window(window, nfft), MLAB_DETRENDS.get(detrend, detrend)
+
+
+def _format_others(data, others):
+    """Format the 'other' input(s) to a cross-spectral method as 2-D
+    """
+    others = numpy.asarray(others)
+    single = others.ndim == 1
+    others = numpy.atleast_2d(others)
+    if others.shape[1] != numpy.shape(data)[0]:
+        raise ValueError("Cannot calculate cross-spectra between arrays "
+                         "of different sizes")
+    return others, single
+
+
+def _cross_spectra(data, others, nsamp, nfft, noverlap, window, detrend,
+                   pad_to=None, xfft=None):
+    """Yield the segment-averaged auto- and cross-spectra of ``data``
+    with each row of ``others``
+
+    Each segment is zero-padded to ``pad_to`` points before the FFT, if
+    given. The output is un-normalised, and two-sided. This method yields
+    ``(rows, cols, pxx, pyy, pxy)`` tuples, where ``rows`` is a `slice`
+    of row indices in ``others``, and ``cols`` is a `slice` of stride
+    indices; ``pxx`` is indexed ``(col, freq)``, while ``pyy`` and
+    ``pxy`` are indexed ``(row, col, freq)``.
+    """
+    data = numpy.asarray(data)
+    win = format_window(window, nfft)
+    segments = strided_columns(data, nsamp, nfft, noverlap)
+    osegments = strided_columns(others, nsamp, nfft, noverlap)
+    nrow = others.shape[0]
+    ncol, nseg = segments.shape[:2]
+    npad = pad_to or nfft
+    if xfft is not None and xfft.shape != (ncol, nseg, npad // 2 + 1):
+        raise ValueError("Target FFT has shape %s, expected %s"
+                         % (xfft.shape, (ncol, nseg, npad // 2 + 1)))
+
+    # loop over blocks of rows and columns to limit memory usage
+    nrowblock = min(nrow, max(1, BLOCK_SIZE // max(nseg * nfft, 1)))
+    ncolblock = max(1, BLOCK_SIZE // max(nrowblock * nseg * nfft, 1))
+    for i in range(0, ncol, ncolblock):
+        cols = slice(i, i + ncolblock)
+        if xfft is None:
+            xblock = _rfft_block(segments[cols], npad, window=win,
+                                 detrend=detrend)
+        else:
+            xblock = xfft[cols]
+        pxx = (xblock.real ** 2 + xblock.imag ** 2).mean(axis=1)
+        xconj = xblock.conj()
+        for j in range(0, nrow, nrowblock):
+            rows = slice(j, j + nrowblock)
+            # transform all rows in this block together
+            yfft = _rfft_block(osegments[rows, cols], npad, window=win,
+                               detrend=detrend)
+            pyy = (yfft.real ** 2 + yfft.imag ** 2).mean(axis=2)
+            pxy = (xconj * yfft).mean(axis=2)
+            yield rows, cols, pxx, pyy, pxy
+
+
+def _scale_factor(window, sample_rate, scaling):
+    """Return the normalisation factor for a windowed power spectrum
+    """
+    if scaling == 'density':
+        return 1. / (sample_rate * (window * window).sum())
+    elif scaling == 'spectrum':
+        return 1. / window.sum() ** 2
+    raise ValueError("Unknown scaling: %r" % scaling)
+
+
+def _one_sided(power, nfft):
+    """Convert a two-sided power spectrum (along axis -1) to one-sided
+    """
+    if nfft % 2:
+        power[..., 1:] *= 2
+    else:
+        power[..., 1:-1] *= 2
+    return power
+
+
+def _average(array, method, axis=0):
+    """Average an array along the given axis using the given method
+    """
+    if method == 'mean':
+        return array.mean(axis=axis)
+    elif numpy.iscomplexobj(array):
+        return (numpy.median(array.real, axis=axis) +
+                1j * numpy.median(array.imag, axis=axis))
+    return numpy.median(array, axis=axis)
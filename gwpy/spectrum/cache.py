@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Process-wide caches of FFT windows and plans
+
+All spectral methods in GWpy request their time-domain windows and FFT
+plans through this module, so that repeated calculations with the same
+parameters (e.g. the same 4-second Hann-windowed PSD over many channels)
+only generate each window or plan once.
+
+The size of each cache is bounded; the least-recently-used entry is
+discarded when a new entry is added to a full cache.
+"""
+
+import numpy
+from scipy import signal
+
+from ..utils.lru import (LRUCache, window_key as _window_key)
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+__all__ = ['clear_cache', 'cache_info']
+
+
+WINDOW_CACHE = LRUCache(maxsize=32)
+FFTPLAN_CACHE = LRUCache(maxsize=32)
+
+
+def _generate_window(window, length, dtype):
+    win = signal.get_window(window, length).astype(dtype)
+    win.flags.writeable = False
+    return win
+
+
+def get_window(window, length, dtype=numpy.float64):
+    """Return a (cached) time-domain window array
+
+    Parameters
+    ----------
+    window : `str`, `tuple`
+        window specification, see :func:`scipy.signal.get_window`
+    length : `int`
+        number of samples in the window
+    dtype : `numpy.dtype`, optional
+        numeric type of window, default `numpy.float64`
+
+    Returns
+    -------
+    window : `numpy.ndarray`
+        the window array, this is shared between callers so is read-only
+    """
+    dtype = numpy.dtype(dtype)
+    key = (_window_key(window), int(length), dtype.str)
+    return WINDOW_CACHE.get(key, _generate_window, window, int(length), dtype)
+
+
+def get_lal_window(window, length, dtype, factory):
+    """Return a (cached) LAL window
+
+    Parameters
+    ----------
+    window : `str`, `tuple`
+        window specification
+    length : `int`
+        number of samples in the window
+    dtype : `numpy.dtype`
+        numeric type of window
+    factory : `callable`
+        method to call (with no arguments) to create the window
+        if not already cached
+
+    Returns
+    -------
+    window : :lal:`REAL8Window`
+        the window, of the relevant type
+    """
+    key = (('lal', _window_key(window)), int(length), numpy.dtype(dtype).str)
+    return WINDOW_CACHE.get(key, factory)
+
+
+def get_fft_plan(length, dtype, backend, factory):
+    """Return a (cached) FFT plan
+
+    Parameters
+    ----------
+    length : `int`
+        number of samples to plan for in each FFT
+    dtype : `numpy.dtype`
+        numeric type of the data to transform
+    backend : `str`
+        name of the FFT library for which this plan was generated
+    factory : `callable`
+        method to call (with no arguments) to create the plan if not
+        already cached
+
+    Returns
+    -------
+    plan : `object`
+        the plan, in whatever format was returned by the ``factory``
+    """
+    key = (int(length), numpy.dtype(dtype).str, backend)
+    return FFTPLAN_CACHE.get(key, factory)
+
+
+def clear_cache():
+    """Clear all cached FFT windows and plans
+    """
+    WINDOW_CACHE.clear()
+    FFTPLAN_CACHE.clear()
+
+
+def cache_info():
+    """Return the hit/miss statistics of the window and FFT plan caches
+
+    Returns
+    -------
+    info : `dict`
+        `dict` with ``'window'`` and ``'fftplan'`` keys, each holding the
+        `~LRUCache.info` of that cache
+    """
+    return {'window': WINDOW_CACHE.info(), 'fftplan': FFTPLAN_CACHE.info()}
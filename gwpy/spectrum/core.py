@@ -22,7 +22,6 @@
 import warnings
 from copy import deepcopy
 
-from numpy import fft as npfft
 from scipy import signal
 
 from astropy import units
@@ -33,6 +32,7 @@ from ..utils import with_import
 from ..utils.docstring import interpolate_docstring
 
 
+from ..fft import irfft
 from .. import version
 __version__ = version.version
 __author__ = "Duncan Macleod <duncan.macleod@ligo.org"
@@ -162,7 +162,7 @@ class Spectrum(Series):
         # The DC component does not have the factor of two applied
         # so we account for it here
         dift[0] *= 2
-        dift = npfft.irfft(self.value * nout / 2)
+        dift = irfft(self.value * nout / 2)
         new = TimeSeries(dift, epoch=self.epoch, channel=self.channel,
                        unit=self.unit * units.Hertz, dx=1/self.dx/nout)
         return new
@@ -27,14 +27,12 @@ import numpy
 from .core import Spectrum
 from .registry import register_method
 from .utils import scale_timeseries_units
+from .cache import (get_fft_plan, get_lal_window)
 from ..utils import with_import
 from .. import version
 __author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
 __version__ = version.version
 
-# cache windows internally
-LAL_WINDOWS = {}
-LAL_FFTPLANS = {}
 LAL_FFTPLAN_LEVEL = 1
 
 
@@ -63,14 +61,11 @@ def generate_lal_fft_plan(length, level=None,
     from ..utils.lal import LAL_TYPE_STR_FROM_NUMPY
     from lal import lal
     laltype = LAL_TYPE_STR_FROM_NUMPY[dtype.type]
-    try:
-        plan = LAL_FFTPLANS[(length, laltype)]
-    except KeyError:
-        create = getattr(lal, 'CreateForward%sFFTPlan' % laltype)
-        if level is None:
-            level = LAL_FFTPLAN_LEVEL
-        plan = LAL_FFTPLANS[(length, laltype)] = create(length, level)
-    return plan
+    create = getattr(lal, 'CreateForward%sFFTPlan' % laltype)
+    if level is None:
+        level = LAL_FFTPLAN_LEVEL
+    return get_fft_plan(length, dtype, 'lal',
+                        lambda: create(length, level))
 
 
 def generate_lal_window(length, type_=('kaiser', 24),
@@ -97,22 +92,16 @@ def generate_lal_window(length, type_=('kaiser', 24),
     from ..utils.lal import LAL_TYPE_STR_FROM_NUMPY
     from lal import lal
     laltype = LAL_TYPE_STR_FROM_NUMPY[dtype.type]
-    wtype = isinstance(type_, (list, tuple)) and type_[0] or str(type_)
-    try:
-        window = LAL_WINDOWS[(length, wtype.lower(), laltype)]
-    except KeyError:
-        if isinstance(type_, (list, tuple)):
-            try:
-                args = type_[1:]
-            except IndexError:
-                args = []
-        else:
-            args = []
-        wtype = wtype.islower() and wtype.title() or wtype
-        create = getattr(lal, 'Create%s%sWindow' % (wtype, laltype))
-        window = LAL_WINDOWS[(length, wtype.lower(), laltype)] = create(
-            length, *args)
-    return window
+    if isinstance(type_, (list, tuple)):
+        wtype = type_[0]
+        args = type_[1:]
+    else:
+        wtype = str(type_)
+        args = []
+    lalwtype = wtype.islower() and wtype.title() or wtype
+    create = getattr(lal, 'Create%s%sWindow' % (lalwtype, laltype))
+    key = (wtype.lower(),) + tuple(args)
+    return get_lal_window(key, length, dtype, lambda: create(length, *args))
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Online estimation of the power spectral density of a data stream
+"""
+
+from __future__ import division
+
+import numpy
+
+from astropy import units
+
+from .core import Spectrum
+from .utils import scale_timeseries_units
+from .batch import (periodograms, median_bias)
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+__all__ = ['RunningPSD']
+
+
+class RunningPSD(object):
+    """Incrementally-updated power spectral density estimate
+
+    New data are given to :meth:`~RunningPSD.update` in contiguous
+    `~gwpy.timeseries.TimeSeries` chunks; each complete FFT segment is
+    transformed as it becomes available, and folded into three running
+    estimates of the PSD:
+
+    - ``'mean'`` : the Welch average of all segments since the last
+      :meth:`~RunningPSD.reset`
+    - ``'ema'`` : the exponential moving average of all segments
+    - ``'median'`` : the (bias-corrected) median of the last
+      ``nsegments`` segments
+
+    Only the last ``nsegments`` periodograms, and fewer than ``fftlength``
+    seconds of raw data, are stored at any time.
+
+    Parameters
+    ----------
+    fftlength : `float`
+        number of seconds in single FFT
+    overlap : `float`, optional
+        number of seconds of overlap between FFTs, defaults to half
+        of ``fftlength``
+    window : `str`, `numpy.ndarray`, optional, default: ``'hanning'``
+        window function to apply to each segment
+    nsegments : `int`, optional, default: ``32``
+        number of recent segments over which to take the running median
+    alpha : `float`, optional
+        weight of each new segment in the exponential moving average,
+        defaults to ``2 / (nsegments + 1)``
+    detrend : `str`, optional, default: ``'constant'``
+        type of detrending to apply to each segment
+    scaling : `str`, optional, default: ``'density'``
+        one of ``'density'`` for a PSD or ``'spectrum'`` for a power
+        spectrum
+
+    Examples
+    --------
+    >>> from gwpy.spectrum import RunningPSD
+    >>> running = RunningPSD(4, 2, nsegments=64)
+    >>> for chunk in stream:
+    ...     running.update(chunk)
+    ...     psd = running.psd('median')
+    """
+    def __init__(self, fftlength, overlap=None, window='hanning',
+                 nsegments=32, alpha=None, detrend='constant',
+                 scaling='density'):
+        if isinstance(fftlength, units.Quantity):
+            fftlength = fftlength.to('s').value
+        if overlap is None:
+            overlap = fftlength / 2.
+        elif isinstance(overlap, units.Quantity):
+            overlap = overlap.to('s').value
+        if overlap >= fftlength:
+            raise ValueError("overlap must be less than fftlength")
+        if nsegments < 1:
+            raise ValueError("nsegments must be a positive integer")
+        if alpha is None:
+            alpha = 2. / (nsegments + 1)
+        elif not 0 < alpha <= 1:
+            raise ValueError("alpha must be in the interval (0, 1]")
+        self.fftlength = float(fftlength)
+        self.overlap = float(overlap)
+        self.window = window
+        self.nsegments = int(nsegments)
+        self.alpha = float(alpha)
+        self.detrend = detrend
+        self.scaling = scaling
+        self.reset()
+
+    def reset(self):
+        """Discard all data and estimates accumulated so far
+        """
+        self.count = 0
+        self.sample_rate = None
+        self.unit = None
+        self.channel = None
+        self.name = None
+        self.epoch = None
+        self._buffer = None
+        self._next = None
+        self._sum = None
+        self._ema = None
+        self._recent = None
+
+    @property
+    def nfft(self):
+        """Number of samples in a single FFT segment
+        """
+        return int(self.fftlength * self.sample_rate)
+
+    @property
+    def noverlap(self):
+        """Number of samples of overlap between segments
+        """
+        return int(self.overlap * self.sample_rate)
+
+    def update(self, timeseries):
+        """Add new data to the running estimates
+
+        Parameters
+        ----------
+        timeseries : `~gwpy.timeseries.TimeSeries`
+            the next chunk of data, which must directly follow the
+            previous chunk, and have the same sampling rate
+
+        Returns
+        -------
+        nseg : `int`
+            the number of new segments added to the estimates
+
+        Raises
+        ------
+        ValueError
+            if the input is not contiguous with the previous chunk, or has
+            a different sampling rate
+        """
+        rate = timeseries.sample_rate.to('Hz').value
+        if self.sample_rate is None:
+            self.sample_rate = rate
+            self.unit = timeseries.unit
+            self.channel = timeseries.channel
+            self.name = timeseries.name
+            self.epoch = timeseries.epoch
+            self._buffer = numpy.zeros(0)
+        elif rate != self.sample_rate:
+            raise ValueError("Cannot update RunningPSD at %s Hz with data "
+                             "sampled at %s Hz" % (self.sample_rate, rate))
+        elif not numpy.isclose(timeseries.x0.value, self._next,
+                               rtol=0, atol=.5 / rate):
+            raise ValueError("Cannot update RunningPSD with data starting at "
+                             "%s, expected %s" % (timeseries.x0.value,
+                                                  self._next))
+        self._next = timeseries.x0.value + timeseries.size / rate
+
+        # calculate periodograms of all new complete segments
+        data = numpy.concatenate((self._buffer, timeseries.value))
+        psds = periodograms(data, self.nfft, noverlap=self.noverlap,
+                            window=self.window, sample_rate=self.sample_rate,
+                            detrend=self.detrend, scaling=self.scaling)
+        nseg = psds.shape[0]
+        nstride = self.nfft - self.noverlap
+        self._buffer = data[nseg * nstride:].copy()
+        if nseg:
+            self._add(psds)
+        return nseg
+
+    def _add(self, psds):
+        """Fold a 2-D array of new periodograms into the estimates
+        """
+        nseg = psds.shape[0]
+        if self.count == 0:
+            self._sum = numpy.zeros(psds.shape[1])
+            self._recent = numpy.zeros((self.nsegments, psds.shape[1]))
+            self._ema = psds[0].copy()
+            new = psds[1:]
+        else:
+            new = psds
+        # running sum
+        self._sum += psds.sum(axis=0)
+        # exponential moving average, ema_n = (1-a)*ema_(n-1) + a*p_n,
+        # unrolled over all new segments at once
+        decay = 1. - self.alpha
+        weights = self.alpha * decay ** numpy.arange(new.shape[0])[::-1]
+        self._ema *= decay ** new.shape[0]
+        self._ema += weights.dot(new)
+        # ring buffer of recent segments for the median
+        idx = numpy.arange(self.count, self.count + nseg) % self.nsegments
+        keep = slice(-self.nsegments, None)
+        self._recent[idx[keep]] = psds[keep]
+        self.count += nseg
+
+    def psd(self, method='mean'):
+        """Return the current estimate of the PSD
+
+        Parameters
+        ----------
+        method : `str`, optional, default: ``'mean'``
+            which estimate to return, one of ``'mean'``, ``'ema'``,
+            or ``'median'``
+
+        Returns
+        -------
+        psd : `~gwpy.spectrum.Spectrum`
+            the current PSD estimate
+
+        Raises
+        ------
+        ValueError
+            if no complete segments have been added yet, or ``method``
+            is not recognised
+        """
+        if not self.count:
+            raise ValueError("RunningPSD has not received a complete "
+                             "segment of data yet")
+        if method == 'mean':
+            data = self._sum / self.count
+        elif method == 'ema':
+            data = self._ema.copy()
+        elif method == 'median':
+            n = min(self.count, self.nsegments)
+            data = numpy.median(self._recent[:n], axis=0) / median_bias(n)
+        else:
+            raise ValueError("Unknown RunningPSD method %r, please give one "
+                             "of 'mean', 'ema', or 'median'" % method)
+        return Spectrum(data, unit=scale_timeseries_units(self.unit,
+                                                          self.scaling),
+                        name=self.name, channel=self.channel,
+                        epoch=self.epoch, f0=0, df=1 / self.fftlength,
+                        copy=False)
+
+    def asd(self, method='mean'):
+        """Return the current estimate of the ASD
+
+        See :meth:`RunningPSD.psd` for details
+        """
+        return self.psd(method=method) ** (1/2.)
@@ -19,7 +19,10 @@
 """`Spectrum` calculation methods using the SciPy module.
 """
 
+from __future__ import division
+
 import numpy
+from numpy import fft as npfft
 
 from astropy import units
 
@@ -27,20 +30,57 @@ from .core import Spectrum
 from .registry import register_method
 from ..utils import import_method_dependency
 from .utils import scale_timeseries_units
+from .cache import get_window
+from .batch import welch_spectrogram
 from .. import version
 __author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
 __version__ = version.version
 
 
+# keyword arguments supported by the batched Welch engine, anything else
+# is passed directly to scipy.signal
+BATCH_KWARGS = set(['window', 'detrend', 'scaling', 'average'])
+
+
+def _format_window(kwargs, segmentlength):
+    """Replace a named window in ``kwargs`` with the cached window array
+    """
+    window = kwargs.setdefault('window', 'hanning')
+    if isinstance(window, (str, tuple)):
+        kwargs['window'] = get_window(window, segmentlength)
+
+
+def _welch(timeseries, segmentlength, noverlap=None, other=None, **kwargs):
+    """Calculate the average PSD (or CSD with ``other``) of the given data
+
+    Where possible the calculation is done by
+    `gwpy.spectrum.batch.welch_spectrogram`, so that the transforms are
+    dispatched through `gwpy.fft`, otherwise `scipy.signal` is used.
+    """
+    _format_window(kwargs, segmentlength)
+    fs = timeseries.sample_rate.decompose().value
+    if noverlap is None:
+        noverlap = segmentlength // 2
+    if (set(kwargs) <= BATCH_KWARGS and segmentlength <= timeseries.size and
+            (other is None or other.size == timeseries.size)):
+        out = welch_spectrogram(
+            timeseries.value, timeseries.size, segmentlength,
+            noverlap=noverlap, sample_rate=fs,
+            other=None if other is None else other.value, **kwargs)[0]
+        return npfft.rfftfreq(segmentlength, d=1/fs), out
+    signal = import_method_dependency('scipy.signal', stacklevel=2)
+    if other is None:
+        return signal.welch(timeseries.value, noverlap=noverlap, fs=fs,
+                            nperseg=segmentlength, **kwargs)
+    return signal.csd(timeseries.value, other.value, noverlap=noverlap,
+                      fs=fs, nperseg=segmentlength, **kwargs)
+
+
 def welch(timeseries, segmentlength, noverlap=None, **kwargs):
     """Calculate the PSD using the scipy Welch method.
     """
-    # get module
-    signal = import_method_dependency('scipy.signal')
     # calculate PSD
-    f, psd_ = signal.welch(timeseries.value, noverlap=noverlap,
-                           fs=timeseries.sample_rate.decompose().value,
-                           nperseg=segmentlength, **kwargs)
+    f, psd_ = _welch(timeseries, segmentlength, noverlap=noverlap, **kwargs)
     # generate Spectrum and return
     unit = scale_timeseries_units(timeseries.unit,
                                   kwargs.get('scaling', 'density'))
@@ -85,13 +125,9 @@ register_method(rayleigh)
 def csd(timeseries, othertimeseries, segmentlength, noverlap=None, **kwargs):
     """Calculate the CSD using scipy's csd method (which uses Welch's method)
     """
-    # get module
-    signal = import_method_dependency('scipy.signal')
     # calculate CSD
-    f, csd_ = signal.csd(timeseries.value, othertimeseries.value,
-                         noverlap=noverlap,
-                         fs=timeseries.sample_rate.decompose().value,
-                         nperseg=segmentlength, **kwargs)
+    f, csd_ = _welch(timeseries, segmentlength, noverlap=noverlap,
+                     other=othertimeseries, **kwargs)
     # generate Spectrum and return
     unit = scale_timeseries_units(timeseries.unit,
                                   kwargs.get('scaling', 'density'))
@@ -126,15 +126,15 @@ def table_from_root(f, columns=OMICRON_COLUMNS, filt=None, nproc=1):
     filt : `function`, optional
         function by which to filt events. The callable must accept as
         input a `SnglBurst` event and return `True`/`False`.
-    nproc : `int`, optional, default: 1
+    nproc : `int`, `~gwpy.parallel.Executor`, optional, default: 1
         number of parallel processes with which to distribute file I/O,
         default: serial process
     """
     # allow multiprocessing
     if nproc != 1:
-        from .cache import read_cache
-        return read_cache(f, lsctables.SnglBurstTable.tableName,
-                          columns=columns, nproc=nproc, format='omicron')
+        from ...io.cache import read_cache
+        return read_cache(f, lsctables.SnglBurstTable, nproc, None,
+                          columns=columns, filt=filt, format='omicron')
 
     # format list of files
     if isinstance(f, CacheEntry):
@@ -285,6 +285,44 @@ class SeriesTestCase(CommonTests, unittest.TestCase):
         ts3 = ts1.append(ts2, inplace=False, resize=False)
         self.assertEqual(ts3.x0, ts1.x0 + ts1.dx * ts2.size)
 
+    def test_append_growable(self):
+        """Test `Series.append` with growable storage
+        """
+        ts1 = self.create(name='test')
+        ts2 = ts1.reserve(ts1.size * 4)
+        self.assertEqual(ts2.capacity, ts1.size * 4)
+        self.assertEqual(ts1.capacity, ts1.size)
+        self.assertArraysEqual(ts2, ts1)
+        # append within capacity
+        new = [self.create(x0=ts1.xspan[1] + i * abs(ts1.xspan)) for
+               i in range(8)]
+        ts3 = ts2.append(new[0])
+        self.assertEqual(ts3.capacity, ts1.size * 4)
+        self.assertEqual(ts2.size, ts1.size)
+        self.assertEqual(ts3.size, ts1.size * 2)
+        self.assertEqual(ts3.name, 'test')
+        self.assertTrue(numpy.may_share_memory(ts2.value, ts3.value))
+        # grow past capacity
+        for ts in new[1:]:
+            ts3 = ts3.append(ts)
+        self.assertEqual(ts3.size, ts1.size * 9)
+        self.assertEqual(ts3.capacity, ts1.size * 16)
+        self.assertEqual(ts3.xspan, (ts1.xspan[0], new[-1].xspan[1]))
+        nptest.assert_array_equal(
+            ts3.value, numpy.concatenate([ts1.value] * 9))
+        # appending to an old view doesn't overwrite newer data
+        ts4 = ts2.append(new[0] * 2)
+        nptest.assert_array_equal(ts3.value[ts1.size:ts1.size*2],
+                                  new[0].value)
+        nptest.assert_array_equal(ts4.value[ts1.size:], new[0].value * 2)
+        # shrink
+        ts5 = ts3.shrink_to_fit()
+        self.assertEqual(ts5.capacity, ts5.size)
+        self.assertArraysEqual(ts5, ts3)
+        self.assertIs(ts5.shrink_to_fit(), ts5)
+        # copies aren't growable
+        self.assertEqual(ts3.copy().capacity, ts3.size)
+
     def test_prepend(self):
         """Test the `Series.prepend` method
         """
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit test for the gwpy.cache module
+"""
+
+import shutil
+import tempfile
+
+from compat import unittest
+
+import numpy
+from numpy import testing as nptest
+
+from gwpy import version
+from gwpy import cache as gwcache
+from gwpy.segments import (Segment, SegmentList)
+from gwpy.timeseries import (TimeSeries, TimeSeriesDict)
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+CHANNELS = ['X1:TEST-CHANNEL_1', 'X1:TEST-CHANNEL_2']
+SAMPLE_RATE = 16
+
+
+class DataCacheTestCase(unittest.TestCase):
+    """`TestCase` for the `gwpy.cache.DataCache` class
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='gwpy_test_cache_')
+        self.cache = gwcache.DataCache(self.directory)
+        self.requests = []
+
+    def tearDown(self):
+        gwcache.disable()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    @staticmethod
+    def create(channel, start, end):
+        """Create deterministic data for a channel
+        """
+        times = numpy.arange(start, end, 1. / SAMPLE_RATE)
+        return TimeSeries(times * ord(channel[-1]), epoch=start,
+                          sample_rate=SAMPLE_RATE, name=channel,
+                          channel=channel)
+
+    def retrieve(self, channels, start, end):
+        self.requests.append((list(channels), Segment(start, end)))
+        return TimeSeriesDict((c, self.create(c, start, end))
+                              for c in channels)
+
+    def get(self, start, end, channels=CHANNELS, **kwargs):
+        return self.cache.get(TimeSeriesDict, channels, start, end,
+                              self.retrieve, **kwargs)
+
+    def assertData(self, data, start, end):
+        for channel in data:
+            self.assertEqual(data[channel].span, (start, end))
+            nptest.assert_array_equal(
+                data[channel].value, self.create(channel, start, end).value)
+
+    def test_miss_then_hit(self):
+        data = self.get(0, 10)
+        self.assertData(data, 0, 10)
+        self.assertListEqual(self.requests, [(CHANNELS, Segment(0, 10))])
+        self.assertDictEqual(self.cache.stats,
+                             {'hits': 0, 'partial': 0, 'misses': 2})
+        # same request again, and a sub-interval, are served from disk
+        self.assertData(self.get(0, 10), 0, 10)
+        self.assertData(self.get(2, 5), 2, 5)
+        self.assertEqual(len(self.requests), 1)
+        self.assertDictEqual(self.cache.stats,
+                             {'hits': 4, 'partial': 0, 'misses': 2})
+        self.assertListEqual(self.cache.coverage(CHANNELS[0]),
+                             SegmentList([Segment(0, 10)]))
+
+    def test_partial(self):
+        self.get(5, 10)
+        self.requests = []
+        data = self.get(0, 15)
+        self.assertData(data, 0, 15)
+        # only the missing parts are retrieved, for all channels at once
+        self.assertListEqual(self.requests, [(CHANNELS, Segment(0, 5)),
+                                             (CHANNELS, Segment(10, 15))])
+        self.assertEqual(self.cache.stats['partial'], 2)
+        # channels with different coverage are requested separately
+        self.requests = []
+        self.get(15, 20, channels=CHANNELS[:1])
+        self.get(10, 20)
+        self.assertListEqual(self.requests, [
+            (CHANNELS[:1], Segment(15, 20)),
+            (CHANNELS[1:], Segment(15, 20)),
+        ])
+
+    def test_pad(self):
+        self.assertData(self.get(0, 10, pad=0.), 0, 10)
+        self.assertEqual(self.cache.size, 0)
+        self.assertListEqual(self.cache.coverage(CHANNELS[0]), [])
+
+    def test_evict(self):
+        self.get(0, 10)
+        size = self.cache.size
+        self.assertGreater(size, 0)
+        # shrink the cache so that only one chunk fits
+        self.cache.maxsize = size * 3 // 4
+        self.get(20, 30, channels=CHANNELS[:1])
+        self.assertLessEqual(self.cache.size, self.cache.maxsize)
+        # the oldest data have been removed first
+        self.assertListEqual(self.cache.coverage(CHANNELS[0]),
+                             SegmentList([Segment(20, 30)]))
+        self.assertListEqual(self.cache.coverage(CHANNELS[1]), [])
+
+    def test_shared(self):
+        self.get(0, 10)
+        # a second cache object for the same directory sees the same data
+        other = gwcache.DataCache(self.directory)
+        self.assertListEqual(other.coverage(CHANNELS[1]),
+                             SegmentList([Segment(0, 10)]))
+        self.assertEqual(other.size, self.cache.size)
+        other.clear()
+        self.assertEqual(self.cache.size, 0)
+        self.assertListEqual(self.cache.coverage(CHANNELS[0]), [])
+
+    def test_with_cache(self):
+        calls = []
+
+        @gwcache.with_cache
+        def retrieve(cls, channels, start, end, pad=None):
+            calls.append(Segment(start, end))
+            return self.retrieve(channels, start, end)
+
+        # no cache by default
+        retrieve(TimeSeriesDict, CHANNELS, 0, 10)
+        retrieve(TimeSeriesDict, CHANNELS, 0, 10)
+        self.assertEqual(len(calls), 2)
+        # explicit cache
+        calls[:] = []
+        retrieve(TimeSeriesDict, CHANNELS, 0, 10, cache=self.directory)
+        retrieve(TimeSeriesDict, CHANNELS, 0, 10, cache=self.directory)
+        self.assertEqual(len(calls), 1)
+        # default cache, and disabled for one call
+        calls[:] = []
+        gwcache.enable(self.directory)
+        self.assertIsInstance(gwcache.get_default(), gwcache.DataCache)
+        data = retrieve(TimeSeriesDict, CHANNELS, 0, 10)
+        self.assertData(data, 0, 10)
+        retrieve(TimeSeriesDict, CHANNELS, 0, 10, cache=False)
+        self.assertEqual(len(calls), 1)
+        gwcache.disable()
+        self.assertIsNone(gwcache.get_default())
+
+    def test_with_cache_arguments(self):
+        calls = []
+
+        @gwcache.with_cache
+        def retrieve(cls, channels, start, end, dtype=None, pad=None,
+                     verbose=False):
+            calls.append(dtype)
+            data = self.retrieve(channels, start, end)
+            if dtype is not None:
+                data = cls((c, ts.astype(dtype)) for c, ts in data.items())
+            return data
+
+        retrieve(TimeSeriesDict, CHANNELS, 0, 10, cache=self.directory)
+        # different dtype is stored separately
+        data = retrieve(TimeSeriesDict, CHANNELS, 0, 10, dtype='float32',
+                        cache=self.directory)
+        self.assertEqual(data[CHANNELS[0]].dtype, numpy.dtype('float32'))
+        data = retrieve(TimeSeriesDict, CHANNELS, 0, 10, cache=self.directory)
+        self.assertEqual(data[CHANNELS[0]].dtype, numpy.dtype('float64'))
+        self.assertListEqual(calls, [None, 'float32'])
+        # arguments that don't affect the data share the same entry
+        retrieve(TimeSeriesDict, CHANNELS, 0, 10, dtype='float32',
+                 verbose=True, cache=self.directory)
+        self.assertEqual(len(calls), 2)
+
+    def test_request_tag(self):
+        tag = gwcache.request_tag('fetch', host='nds.ligo.caltech.edu')
+        self.assertTrue(tag.startswith('fetch-'))
+        self.assertEqual(tag, gwcache.request_tag(
+            'fetch', host='nds.ligo.caltech.edu', verbose=True))
+        self.assertNotEqual(tag, gwcache.request_tag(
+            'find', host='nds.ligo.caltech.edu'))
+        self.assertNotEqual(tag, gwcache.request_tag(
+            'fetch', host='nds.ligo.caltech.edu', dtype='float32'))
+        self.assertRaises(TypeError, gwcache.request_tag, 'fetch',
+                          connection=object())
+
+
+if __name__ == '__main__':
+    unittest.main()
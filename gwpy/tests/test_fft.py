@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit test for fft module
+"""
+
+from compat import unittest
+
+import numpy
+from numpy import testing as nptest
+
+from gwpy import (version, fft)
+from gwpy.fft.registry import BACKENDS
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+
+class DummyBackend(fft.FFTBackend):
+    name = 'test-dummy'
+
+    def __init__(self, scale=1):
+        self.scale = scale
+
+    def rfft(self, a, n=None, axis=-1):
+        return numpy.fft.rfft(a, n=n, axis=axis) * self.scale
+
+
+# -----------------------------------------------------------------------------
+
+class FFTBackendTestCase(unittest.TestCase):
+    """`~unittest.TestCase` for the `gwpy.fft` module
+    """
+    def setUp(self):
+        self.data = numpy.random.normal(size=(4, 256))
+        fft.register_backend(DummyBackend, force=True)
+
+    def tearDown(self):
+        BACKENDS.pop(DummyBackend.name, None)
+        fft.set_backend('numpy')
+
+    def test_numpy(self):
+        fft.set_backend('numpy')
+        self.assertEqual(fft.get_backend().name, 'numpy')
+        nptest.assert_array_equal(fft.rfft(self.data, axis=-1),
+                                  numpy.fft.rfft(self.data, axis=-1))
+        nptest.assert_allclose(fft.irfft(fft.rfft(self.data)), self.data)
+        nptest.assert_array_equal(fft.fft(self.data, n=512),
+                                  numpy.fft.fft(self.data, n=512))
+
+    def test_register_backend(self):
+        self.assertRaises(KeyError, fft.register_backend, DummyBackend)
+        self.assertRaises(ValueError, fft.set_backend, 'does-not-exist')
+
+    def test_backend_context(self):
+        fft.set_backend('numpy')
+        with fft.backend('test-dummy', scale=2) as backend:
+            self.assertIs(fft.get_backend(), backend)
+            nptest.assert_allclose(fft.rfft(self.data),
+                                   numpy.fft.rfft(self.data) * 2)
+            self.assertRaises(NotImplementedError, fft.ifft, self.data)
+        self.assertEqual(fft.get_backend().name, 'numpy')
+
+    def test_scipy(self):
+        try:
+            backend = fft.set_backend('scipy', workers=2)
+        except ImportError as e:
+            self.skipTest(str(e))
+        self.assertEqual(backend.workers, 2)
+        nptest.assert_allclose(fft.rfft(self.data),
+                               numpy.fft.rfft(self.data))
+
+    def test_pyfftw(self):
+        try:
+            fft.set_backend('pyfftw')
+        except ImportError as e:
+            self.skipTest(str(e))
+        nptest.assert_allclose(fft.rfft(self.data),
+                               numpy.fft.rfft(self.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,18 +19,137 @@
 """Unit test for `io` module
 """
 
+import json
 import os
+import shutil
+import sys
 import tempfile
+import threading
+import time
+import types
+
+from six.moves.BaseHTTPServer import (BaseHTTPRequestHandler, HTTPServer)
+
+import numpy
+from numpy import testing as nptest
 
 from compat import unittest
 
 from gwpy import version
 from gwpy.io.cache import (Cache, CacheEntry, cache_segments)
+from gwpy.io import shm
+from gwpy.io.datafind import DatafindSession
+from gwpy.io.hdf5 import hyperslab
+from gwpy.io.gwf_index import GWFIndex
 from gwpy.segments import (Segment, SegmentList)
+from gwpy.timeseries import (TimeSeries, TimeSeriesDict)
 
 __author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
 __version__ = version.version
 
+TEST_GWF_FILE = os.path.join(os.path.split(__file__)[0], 'data',
+                             'HLV-GW100916-968654552-1.gwf')
+
+DATAFIND_PREFIX = '/LDR/services/data/v1/gwf/'
+DATAFIND_GPS = 1000000000
+
+
+class DummyIndex(GWFIndex):
+    """`GWFIndex` that doesn't need a real GWF file
+    """
+    nparse = 0
+
+    def parse(self, path):
+        DummyIndex.nparse += 1
+        return ([0, 1], [1, 1], [('X1:TEST-ADC', 'adc', [10, 20]),
+                                 ('X1:TEST-PROC', 'proc', None)])
+
+
+class FakeNDS2Channel(object):
+    """Stand-in for `nds2.channel`
+    """
+    (DATA_TYPE_INT16, DATA_TYPE_INT32, DATA_TYPE_INT64, DATA_TYPE_FLOAT32,
+     DATA_TYPE_FLOAT64, DATA_TYPE_COMPLEX32) = [2 ** i for i in range(6)]
+    channel_type = 1
+    data_type = DATA_TYPE_FLOAT64
+    signal_units = 'm'
+
+    def __init__(self, name, sample_rate):
+        self.name = name
+        self.sample_rate = sample_rate
+
+    @staticmethod
+    def channel_type_to_string(ctype):
+        return 'raw'
+
+
+class FakeNDS2Buffer(object):
+    """Stand-in for `nds2.buffer`, holding one second of data
+
+    The value of each sample is its index from GPS 0
+    """
+    def __init__(self, name, gps, sample_rate=16):
+        self.channel = FakeNDS2Channel(name, sample_rate)
+        self.gps_seconds = gps
+        self.gps_nanoseconds = 0
+        self.data = numpy.arange(gps * sample_rate, (gps + 1) * sample_rate,
+                                 dtype='float64')
+        self.length = self.data.size
+
+
+class FakeNDS2Connection(object):
+    """Stand-in for `nds2.connection` that doesn't need a server
+    """
+    nconnect = 0
+    gaps = []
+
+    def __init__(self, host, port=None):
+        FakeNDS2Connection.nconnect += 1
+        self.host = host
+        self.port = port
+        self.closed = False
+        self.iterating = False
+
+    def iterate(self, start, end, names):
+        for gps in range(start, end):
+            if gps not in self.gaps:
+                yield [FakeNDS2Buffer(name, gps) for name in names]
+
+    def get_host(self):
+        return self.host
+
+    def get_port(self):
+        return self.port
+
+    def has_next(self):
+        if self.closed:
+            raise RuntimeError("Connection closed")
+        return self.iterating
+
+    def find_channels(self, *args):
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+def import_nds():
+    """Import `gwpy.io.nds`, using a fake `nds2` module if required
+    """
+    try:
+        import nds2
+    except ImportError:
+        nds2 = types.ModuleType('nds2')
+        nds2.channel = type('channel', (object,), dict(
+            ('CHANNEL_TYPE_%s' % t, 2 ** i) for i, t in enumerate(
+                ('RAW', 'ONLINE', 'RDS', 'STREND', 'MTREND', 'STATIC',
+                 'TEST_POINT'))))
+        nds2.channel_channel_type_to_string = str
+        nds2.connection = FakeNDS2Connection
+        sys.modules['nds2'] = nds2
+    from gwpy.io import nds
+    return nds
+
 
 class IoTests(unittest.TestCase):
 
@@ -158,6 +277,470 @@ class IoTests(unittest.TestCase):
         finally:
             self.destroy_cache(cache)
 
+    def test_hyperslab(self):
+        self.assertEqual(hyperslab(100, 10, .5), slice(0, 100))
+        self.assertEqual(hyperslab(100, 10, .5, start=20, end=30),
+                         slice(20, 40))
+        self.assertEqual(hyperslab(100, 10, .5, start=20.7), slice(21, 100))
+        self.assertEqual(hyperslab(100, 10, .5, start=0, end=100),
+                         slice(0, 100))
+        self.assertEqual(hyperslab(100, 10, .5, start=100), slice(100, 100))
+        self.assertEqual(hyperslab(100, 10, .5, end=0), slice(0, 0))
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    """`~unittest.TestCase` for `gwpy.io.nds.ConnectionPool`
+    """
+    def setUp(self):
+        self.nds = import_nds()
+        FakeNDS2Connection.nconnect = 0
+
+    def create(self, **kwargs):
+        kwargs.setdefault('connect', FakeNDS2Connection)
+        return self.nds.ConnectionPool(**kwargs)
+
+    def test_reuse(self):
+        pool = self.create()
+        with pool.connection('test', 1) as conn:
+            self.assertEqual(len(pool), 0)
+        self.assertEqual(len(pool), 1)
+        with pool.connection('test', 1) as conn2:
+            self.assertIs(conn2, conn)
+        # different servers get different connections
+        with pool.connection('test', 2) as conn3:
+            self.assertIsNot(conn3, conn)
+        self.assertEqual(FakeNDS2Connection.nconnect, 2)
+        self.assertEqual(len(pool), 2)
+        pool.clear()
+        self.assertEqual(len(pool), 0)
+        self.assertTrue(conn.closed)
+
+    def test_maxsize(self):
+        pool = self.create(maxsize=2)
+        conns = [pool.get('test') for i in range(3)]
+        for conn in conns:
+            pool.put(conn, 'test')
+        self.assertEqual(len(pool), 2)
+        self.assertTrue(conns[2].closed)
+        self.assertFalse(conns[0].closed)
+
+    def test_timeout(self):
+        pool = self.create(timeout=0)
+        with pool.connection('test') as conn:
+            pass
+        time.sleep(.01)
+        self.assertIsNot(pool.get('test'), conn)
+        self.assertTrue(conn.closed)
+
+    def test_health_check(self):
+        pool = self.create()
+        conn = pool.get('test')
+        conn.iterating = True
+        pool.put(conn, 'test')
+        self.assertIsNot(pool.get('test'), conn)
+        self.assertTrue(conn.closed)
+        # connections are closed after an error
+        try:
+            with pool.connection('test') as conn:
+                raise ValueError("test")
+        except ValueError:
+            pass
+        self.assertTrue(conn.closed)
+        self.assertEqual(len(pool), 0)
+
+    def test_call_stale(self):
+        pool = self.create()
+        conn = pool.get('test')
+        pool.put(conn, 'test')
+
+        def find(connection):
+            if connection.closed or connection is conn:
+                raise RuntimeError("Connection closed by server")
+            return connection
+
+        # a re-used connection that fails is replaced once
+        new = pool.call(find, 'test')
+        self.assertIsNot(new, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(FakeNDS2Connection.nconnect, 2)
+        self.assertEqual(len(pool), 1)
+        # a new connection that fails is not retried
+        pool.clear()
+        self.assertRaises(RuntimeError, pool.call,
+                          lambda c: find(conn), 'test')
+        self.assertEqual(FakeNDS2Connection.nconnect, 3)
+        self.assertEqual(len(pool), 0)
+
+    def test_call_data_error(self):
+        pool = self.create()
+        pool.put(pool.get('test'), 'test')
+
+        def fetch(connection):
+            raise RuntimeError("Requested data were not found.")
+
+        # a re-used connection that fails for any other reason is not retried
+        self.assertRaises(RuntimeError, pool.call, fetch, 'test')
+        self.assertEqual(FakeNDS2Connection.nconnect, 1)
+        self.assertEqual(len(pool), 0)
+
+    def test_query_nds2(self):
+        from gwpy.detector import ChannelList
+        pool = self.nds.CONNECTION_POOL
+        self.nds.CONNECTION_POOL = self.create()
+        try:
+            for i in range(3):
+                self.assertListEqual(
+                    ChannelList.query_nds2(['X1:TEST'], host='test'), [])
+            self.assertEqual(FakeNDS2Connection.nconnect, 1)
+        finally:
+            self.nds.CONNECTION_POOL.clear()
+            self.nds.CONNECTION_POOL = pool
+
+
+class FetchTests(unittest.TestCase):
+    """`~unittest.TestCase` for `TimeSeriesDict.fetch` from a fake server
+    """
+    def setUp(self):
+        self.nds = import_nds()
+        self.pool = self.nds.CONNECTION_POOL
+        self.nds.CONNECTION_POOL = self.nds.ConnectionPool(
+            connect=FakeNDS2Connection)
+
+    def tearDown(self):
+        self.nds.CONNECTION_POOL.clear()
+        self.nds.CONNECTION_POOL = self.pool
+        FakeNDS2Connection.gaps = []
+
+    def test_fetch(self):
+        data = TimeSeriesDict.fetch(['X1:A', 'X1:B'], 0, 4, host='test',
+                                    port=1)
+        self.assertListEqual(list(data.keys()), ['X1:A', 'X1:B'])
+        for ts in data.values():
+            self.assertEqual(ts.span, (0, 4))
+            nptest.assert_array_equal(ts.value, numpy.arange(64))
+        # check the request is cropped to non-integer times
+        ts = TimeSeries.fetch('X1:A', 0.5, 3.5, host='test', port=1)
+        self.assertEqual(ts.span, (0.5, 3.5))
+        nptest.assert_array_equal(ts.value, numpy.arange(8, 56))
+        # the same connection was used for all requests
+        self.assertEqual(len(self.nds.CONNECTION_POOL), 1)
+
+    def test_fetch_gap(self):
+        FakeNDS2Connection.gaps = [2]
+        self.assertRaises(ValueError, TimeSeriesDict.fetch, ['X1:A'], 0, 4,
+                          host='test', port=1)
+
+
+class PlannedFetchDict(TimeSeriesDict):
+    """`TimeSeriesDict` whose `fetch` uses a fake table of server contents
+    """
+    SERVERS = {
+        ('a', 1): ['X1:A', 'X1:B', 'X1:C'],
+        ('b', 1): ['X1:B', 'X1:D'],
+    }
+    requests = []
+
+    @classmethod
+    def fetch(cls, channels, start, end, host=None, port=None, **kwargs):
+        cls.requests.append((tuple(channels), host))
+        if not set(channels).issubset(cls.SERVERS[(host, port)]):
+            raise RuntimeError("Channels not found")
+        return cls((c, TimeSeries([ord(host)], epoch=start, name=c))
+                   for c in channels)
+
+
+class FetchPlannerTests(unittest.TestCase):
+    """`~unittest.TestCase` for `TimeSeriesDict._fetch_concurrent`
+    """
+    HOSTS = [('a', 1), ('b', 1)]
+
+    def setUp(self):
+        import_nds()
+        PlannedFetchDict.requests = []
+
+    def test_single_request(self):
+        data = PlannedFetchDict._fetch_concurrent(['X1:A', 'X1:C'], 0, 1,
+                                                  self.HOSTS)
+        self.assertListEqual(list(data.keys()), ['X1:A', 'X1:C'])
+        self.assertListEqual(PlannedFetchDict.requests,
+                             [(('X1:A', 'X1:C'), 'a')])
+
+    def test_fallback(self):
+        channels = ['X1:A', 'X1:B', 'X1:C', 'X1:D']
+        for concurrency in (1, 4):
+            PlannedFetchDict.requests = []
+            data = PlannedFetchDict._fetch_concurrent(
+                channels, 0, 1, self.HOSTS, concurrency=concurrency)
+            self.assertListEqual(list(data.keys()), channels)
+            # each channel comes from the first server that has it
+            for c in ('X1:A', 'X1:B', 'X1:C'):
+                self.assertEqual(data[c].value[0], ord('a'))
+            self.assertEqual(data['X1:D'].value[0], ord('b'))
+            self.assertIn((('X1:D',), 'b'), PlannedFetchDict.requests)
+            self.assertNotIn((('X1:B',), 'b'), PlannedFetchDict.requests)
+
+    def test_missing(self):
+        self.assertRaises(RuntimeError, PlannedFetchDict._fetch_concurrent,
+                          ['X1:A', 'X1:E'], 0, 1, self.HOSTS)
+        self.assertRaises(RuntimeError, PlannedFetchDict._fetch_concurrent,
+                          ['X1:A'], 0, 1, [])
+
+
+class GWFIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        DummyIndex.nparse = 0
+        _, self.frame = tempfile.mkstemp(suffix='.gwf')
+        _, self.database = tempfile.mkstemp(suffix='.sqlite')
+
+    def tearDown(self):
+        for f in (self.frame, self.database):
+            if os.path.isfile(f):
+                os.remove(f)
+
+    def test_get(self):
+        index = DummyIndex(':memory:')
+        info = index.get(self.frame)
+        self.assertEqual(info.path, os.path.abspath(self.frame))
+        self.assertListEqual(info.epochs, [0, 1])
+        self.assertListEqual(info.durations, [1, 1])
+        self.assertListEqual(list(info.channels),
+                             ['X1:TEST-ADC', 'X1:TEST-PROC'])
+        self.assertListEqual(info.channels['X1:TEST-ADC'].offsets, [10, 20])
+        self.assertIsNone(info.channels['X1:TEST-PROC'].offsets)
+        self.assertEqual(index.num_channels(self.frame), 2)
+        self.assertEqual(index.channel_type('X1:TEST-PROC', self.frame),
+                         'proc')
+        self.assertFalse(index.channel_type('X1:TEST-MISSING', self.frame))
+        self.assertListEqual(index.segments(self.frame),
+                             [Segment(0, 1), Segment(1, 2)])
+        # check the TOC was only parsed once
+        self.assertEqual(DummyIndex.nparse, 1)
+
+    def test_update_channel(self):
+        index = DummyIndex(':memory:')
+        index.update_channel(self.frame, 'X1:TEST-ADC', sample_rate=16)
+        index.get(self.frame)
+        index.update_channel(self.frame, 'X1:TEST-ADC', sample_rate=16)
+        index.update_channel(self.frame, 'X1:TEST-ADC', dtype='float32')
+        channel = index.get(self.frame).channels['X1:TEST-ADC']
+        self.assertEqual(channel.sample_rate, 16)
+        self.assertEqual(channel.dtype, 'float32')
+
+    def test_persistence(self):
+        DummyIndex(self.database).get(self.frame)
+        # check a new index reads from the same database
+        index = DummyIndex(self.database)
+        self.assertEqual(index.num_channels(self.frame), 2)
+        self.assertEqual(DummyIndex.nparse, 1)
+        # check that modifying the file triggers a re-parse
+        mtime = os.stat(self.frame).st_mtime + 10
+        os.utime(self.frame, (time.time(), mtime))
+        index.get(self.frame)
+        self.assertEqual(DummyIndex.nparse, 2)
+        # check clear
+        index.clear()
+        index.get(self.frame)
+        self.assertEqual(DummyIndex.nparse, 3)
+
+    def test_gwf(self):
+        index = GWFIndex(':memory:')
+        try:
+            info = index.get(TEST_GWF_FILE)
+        except ImportError as e:
+            self.skipTest(str(e))
+        self.assertListEqual(info.epochs, [968654552])
+        self.assertListEqual(info.durations, [1])
+        self.assertEqual(index.channel_type('L1:LDAS-STRAIN', TEST_GWF_FILE),
+                         'proc')
+
+
+class DatafindIndex(GWFIndex):
+    """`GWFIndex` for the (empty) frames served by `FakeDatafindHandler`
+    """
+    nparse = 0
+
+    def parse(self, path):
+        DatafindIndex.nparse += 1
+        channels = [('X1:TEST-A', 'proc', None)]
+        if 'X1_B' in os.path.basename(path):
+            channels.append(('X1:TEST-B', 'proc', None))
+        return [DATAFIND_GPS], [10], channels
+
+
+class FakeDatafindHandler(BaseHTTPRequestHandler):
+    """Stand-in for a datafind server, recording each request
+    """
+    frames = {}
+    requests = []
+
+    def do_GET(self):
+        FakeDatafindHandler.requests.append(self.path)
+        path = self.path.split('?')[0]
+        parts = path[len(DATAFIND_PREFIX):-len('.json')].split('/')
+        if len(parts) == 1:  # find_types
+            out = sorted(self.frames)
+        else:  # find_latest, or find_frame_urls
+            out = self.frames.get(parts[1], [])
+        body = json.dumps(out).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class DatafindSessionTests(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            from glue.datafind import GWDataFindHTTPConnection
+        except ImportError as e:
+            self.skipTest(str(e))
+        DatafindIndex.nparse = 0
+        FakeDatafindHandler.requests = []
+        FakeDatafindHandler.frames = {}
+        self.tmpdir = tempfile.mkdtemp(prefix='gwpy_test_datafind_')
+        for ft in ('X1_A', 'X1_B'):
+            path = os.path.join(self.tmpdir, 'X-%s-%d-10.gwf'
+                                % (ft, DATAFIND_GPS))
+            with open(path, 'wb') as f:
+                f.write(b'\0' * 4096)
+            FakeDatafindHandler.frames[ft] = ['file://localhost%s' % path]
+        self.server = HTTPServer(('localhost', 0), FakeDatafindHandler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        connection = GWDataFindHTTPConnection(
+            host='localhost', port=self.server.server_port)
+        self.session = DatafindSession(connection=connection,
+                                       index=DatafindIndex(':memory:'))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    @property
+    def nrequests(self):
+        return len(FakeDatafindHandler.requests)
+
+    def test_find_frame_urls(self):
+        end = DATAFIND_GPS + 10
+        cache = self.session.find_frame_urls('X', 'X1_A', DATAFIND_GPS, end)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache[0].segment, Segment(DATAFIND_GPS, end))
+        # repeat queries are memoized, regardless of on_gaps
+        self.session.find_frame_urls('X', 'X1_A', DATAFIND_GPS, end,
+                                     on_gaps='error')
+        self.assertEqual(self.nrequests, 1)
+        self.assertRaises(RuntimeError, self.session.find_frame_urls,
+                          'X', 'X1_A', DATAFIND_GPS, end + 10,
+                          on_gaps='error')
+        self.assertEqual(self.nrequests, 2)
+        # clear, or ttl=0, queries the server again
+        self.session.clear()
+        self.session.find_frame_urls('X', 'X1_A', DATAFIND_GPS, end)
+        self.assertEqual(self.nrequests, 3)
+        self.session.ttl = 0
+        self.session.find_frame_urls('X', 'X1_A', DATAFIND_GPS, end)
+        self.session.find_frame_urls('X', 'X1_A', DATAFIND_GPS, end)
+        self.assertEqual(self.nrequests, 5)
+
+    def test_find_frametypes(self):
+        channels = ['X1:TEST-A', 'X1:TEST-B']
+        types = self.session.find_frametypes(channels, gpstime=DATAFIND_GPS)
+        self.assertListEqual(list(types.items()), [('X1:TEST-A', 'X1_A'),
+                                                   ('X1:TEST-B', 'X1_B')])
+        # one query for the types, one per type, and one TOC scan per type
+        self.assertEqual(self.nrequests, 3)
+        self.assertEqual(DatafindIndex.nparse, 2)
+        types = self.session.find_frametypes(channels, gpstime=DATAFIND_GPS,
+                                             return_all=True)
+        self.assertListEqual(types['X1:TEST-A'], ['X1_A', 'X1_B'])
+        self.assertListEqual(types['X1:TEST-B'], ['X1_B'])
+        self.assertEqual(self.nrequests, 3)
+        self.assertRaises(ValueError, self.session.find_frametypes,
+                          ['X1:TEST-C'], gpstime=DATAFIND_GPS)
+
+    def test_find_best_frametypes(self):
+        channels = ['X1:TEST-A', 'X1:TEST-B']
+        best = self.session.find_best_frametypes(channels, DATAFIND_GPS,
+                                                 DATAFIND_GPS + 10)
+        self.assertListEqual(list(best.items()), [('X1:TEST-A', 'X1_A'),
+                                                  ('X1:TEST-B', 'X1_B')])
+        nrequests = self.nrequests
+        self.session.find_best_frametypes(channels, DATAFIND_GPS,
+                                          DATAFIND_GPS + 10)
+        self.assertEqual(self.nrequests, nrequests)
+
+
+class SharedMemoryTests(unittest.TestCase):
+
+    def test_round_trip(self):
+        data = numpy.random.random(300)
+        pieces = []
+        for i in range(3):
+            tsd = TimeSeriesDict()
+            tsd['a'] = TimeSeries(data[i*100:(i+1)*100], epoch=i*100,
+                                  name='a', unit='m')
+            tsd['b'] = TimeSeries(data[i*100:(i+1)*100].astype('float32'),
+                                  epoch=i*100)
+            pieces.append(tsd)
+        description = [(key, template, (300,), dtype) for
+                       (key, template, shape, dtype) in
+                       shm.describe(pieces[0])]
+        nbytes, layout = shm.plan(description)
+        self.assertEqual(list(layout), ['a', 'b'])
+        self.assertEqual(nbytes % shm.ALIGNMENT, 0)
+        self.assertEqual(layout['b'][0] % shm.ALIGNMENT, 0)
+        path, buffer_ = shm.allocate(nbytes)
+        try:
+            # write out of order, as parallel workers would
+            for i in (2, 0, 1):
+                shm.write(pieces[i], path, layout,
+                          {'a': i * 100, 'b': i * 100})
+            self.assertRaises(ValueError, shm.write, pieces[0], path,
+                              layout, {'a': 250, 'b': 0})
+        finally:
+            shm.release(path)
+        self.assertFalse(os.path.exists(path))
+        out = shm.assemble(buffer_, layout)
+        nptest.assert_array_equal(out['a'].value, data)
+        nptest.assert_array_equal(out['b'].value, data.astype('float32'))
+        self.assertIsInstance(out['a'], TimeSeries)
+        self.assertEqual(out['a'].x0.value, 0)
+        self.assertEqual(out['a'].name, 'a')
+        self.assertEqual(out['a'].unit, pieces[0]['a'].unit)
+        self.assertEqual(out['b'].dtype, numpy.dtype('float32'))
+
+    def test_describe(self):
+        a = TimeSeries(numpy.zeros(10, dtype='float32'))
+        description = shm.describe(a)
+        self.assertEqual(len(description), 1)
+        key, template, shape, dtype = description[0]
+        self.assertIsNone(key)
+        self.assertEqual(template.size, 0)
+        self.assertEqual(shape, (10,))
+        self.assertEqual(numpy.dtype(dtype), numpy.dtype('float32'))
+        self.assertIsNone(shm.describe([1, 2, 3]))
+
+    def test_allocate_no_space(self):
+        # buffers too big for SHM_DIR are created in the temp directory
+        _free_space = shm._free_space
+        shm._free_space = lambda directory: 0
+        try:
+            path, buffer_ = shm.allocate(1024)
+        finally:
+            shm._free_space = _free_space
+        try:
+            self.assertEqual(os.path.dirname(path), tempfile.gettempdir())
+            self.assertEqual(buffer_.size, 1024)
+        finally:
+            shm.release(path)
 
 if __name__ == '__main__':
     unittest.main()
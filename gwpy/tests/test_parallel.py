@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit test for parallel module
+"""
+
+import warnings
+
+from compat import unittest
+
+from gwpy import (version, parallel)
+from gwpy.parallel.executor import TASKS_PER_WORKER
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+
+def _square(x):
+    return x ** 2
+
+
+def _fail(x):
+    if x == 3:
+        raise ValueError("Task %d failed" % x)
+    return x
+
+
+# -----------------------------------------------------------------------------
+
+class ParallelTestCase(unittest.TestCase):
+    """`~unittest.TestCase` for the `gwpy.parallel` module
+    """
+    TASKS = list(range(20))
+
+    def setUp(self):
+        warnings.simplefilter('ignore', UserWarning)
+
+    def tearDown(self):
+        parallel.shutdown()
+        warnings.resetwarnings()
+
+    def _test_executor(self, name):
+        executor = parallel.get_executor(2, name=name)
+        self.assertEqual(executor.nworkers, 2)
+        self.assertEqual(executor.map(_square, self.TASKS),
+                         [x ** 2 for x in self.TASKS])
+        self.assertRaises(ValueError, executor.map, _fail, self.TASKS)
+        # the same pool is used again
+        self.assertIs(parallel.get_executor(2, name=name), executor)
+        self.assertEqual(executor.map(_square, self.TASKS[:5]),
+                         [0, 1, 4, 9, 16])
+
+    def test_serial(self):
+        executor = parallel.get_executor(1)
+        self.assertIsInstance(executor, parallel.SerialExecutor)
+        self.assertEqual(executor.map(_square, self.TASKS),
+                         [x ** 2 for x in self.TASKS])
+        self.assertRaises(ValueError, executor.map, _fail, self.TASKS)
+
+    def test_thread(self):
+        self._test_executor('thread')
+
+    def test_process(self):
+        self._test_executor('process')
+        # closures can't be pickled, but should still work
+        offset = 10
+        self.assertEqual(
+            parallel.get_executor(2, name='process').map(
+                lambda x: x + offset, self.TASKS),
+            [x + offset for x in self.TASKS])
+
+    def test_get_executor(self):
+        executor = parallel.ThreadExecutor(3)
+        self.assertIs(parallel.get_executor(executor), executor)
+        self.assertIs(parallel.get_executor(executor, name='serial'),
+                      executor)
+        self.assertRaises(ValueError, parallel.get_executor, 2,
+                          name='does-not-exist')
+        self.assertEqual(parallel.map(_square, [1, 2, 3], nproc=executor),
+                         [1, 4, 9])
+
+    def test_executor_context(self):
+        with parallel.executor('thread'):
+            self.assertIsInstance(parallel.get_executor(2),
+                                  parallel.ThreadExecutor)
+            with parallel.executor('serial'):
+                self.assertIsInstance(parallel.get_executor(2),
+                                      parallel.SerialExecutor)
+            self.assertIsInstance(parallel.get_executor(2),
+                                  parallel.ThreadExecutor)
+        self.assertRaises(ValueError, parallel.set_executor, 'does-not-exist')
+        self.assertRaises(KeyError, parallel.register_executor,
+                          parallel.ThreadExecutor)
+
+    def test_chunks(self):
+        chunks = parallel.chunks(100, 5)
+        self.assertEqual(len(chunks), 5 * TASKS_PER_WORKER)
+        self.assertEqual(chunks[0], slice(0, 5))
+        self.assertEqual(chunks[-1], slice(95, 100))
+        self.assertEqual(parallel.chunks(10, 4), [slice(i, i + 1) for
+                                                  i in range(10)])
+        self.assertEqual(parallel.chunks(10, 4, minsize=4),
+                         [slice(0, 4), slice(4, 8), slice(8, 10)])
+        self.assertEqual(parallel.chunks(10, 1), [slice(0, 10)])
+        self.assertEqual(parallel.chunks(10, parallel.SerialExecutor()),
+                         [slice(0, 10)])
+        self.assertEqual(parallel.chunks(0, 4), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
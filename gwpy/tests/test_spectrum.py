@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit test for spectrum module
+"""
+
+from compat import unittest
+
+import numpy
+from numpy import testing as nptest
+
+from scipy import signal
+
+from gwpy import version
+from gwpy.timeseries import TimeSeries
+from gwpy.spectrum import (Spectrum, RunningPSD, clear_cache, cache_info)
+from gwpy.spectrum.cache import (LRUCache, get_window)
+from gwpy.spectrum.batch import (periodograms, median_bias, column_ffts,
+                                 coherence_spectrogram)
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+
+# -----------------------------------------------------------------------------
+
+class SpectrumCacheTestCase(unittest.TestCase):
+    """`~unittest.TestCase` for the `gwpy.spectrum.cache` module
+    """
+    def setUp(self):
+        clear_cache()
+
+    def test_lru_cache(self):
+        cache = LRUCache(maxsize=2)
+        self.assertEqual(cache.get('a', lambda: 1), 1)
+        self.assertEqual(cache.get('b', lambda: 2), 2)
+        self.assertEqual(cache.get('a', lambda: 3), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        # adding a third entry should drop 'b' (least-recently used)
+        cache.get('c', lambda: 4)
+        self.assertEqual(len(cache), 2)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        cache.clear()
+        self.assertEqual(cache.info(), {'hits': 0, 'misses': 0, 'size': 0,
+                                        'maxsize': 2})
+
+    def test_get_window(self):
+        win = get_window('hanning', 128)
+        nptest.assert_array_equal(win, signal.get_window('hanning', 128))
+        self.assertFalse(win.flags.writeable)
+        self.assertIs(get_window('hanning', 128), win)
+        self.assertIsNot(get_window('hanning', 256), win)
+        self.assertEqual(get_window(('kaiser', 8), 64, numpy.float32).dtype,
+                         numpy.float32)
+        info = cache_info()['window']
+        self.assertEqual((info['hits'], info['misses']), (1, 3))
+        clear_cache()
+        self.assertEqual(cache_info()['window']['size'], 0)
+
+
+
+class BatchTestCase(unittest.TestCase):
+    """`~unittest.TestCase` for the `gwpy.spectrum.batch` module
+    """
+    def test_coherence_spectrogram(self):
+        data = numpy.random.normal(size=4096)
+        others = data + numpy.random.normal(size=(3, 4096))
+        coh = coherence_spectrogram(data, others, 1024, 256, noverlap=128)
+        self.assertEqual(coh.shape, (3, 4, 129))
+        for i, other in enumerate(others):
+            nptest.assert_array_equal(
+                coh[i],
+                coherence_spectrogram(data, other, 1024, 256, noverlap=128))
+            ref = signal.coherence(data[:1024], other[:1024], nperseg=256,
+                                   noverlap=128, window=numpy.hanning(256),
+                                   detrend=False)[1]
+            nptest.assert_allclose(coh[i, 0], ref)
+        self.assertRaises(ValueError, coherence_spectrogram, data,
+                          others[:, :100], 1024, 256)
+        # reuse the target FFT
+        xfft = column_ffts(data, 1024, 256, noverlap=128,
+                           window=numpy.hanning(256))
+        nptest.assert_allclose(
+            coherence_spectrogram(data, others, 1024, 256, noverlap=128,
+                                  xfft=xfft), coh)
+        self.assertRaises(ValueError, coherence_spectrogram, data, others,
+                          1024, 256, noverlap=128, xfft=xfft[:, :2])
+
+
+class RunningPSDTestCase(unittest.TestCase):
+    """`~unittest.TestCase` for the `gwpy.spectrum.RunningPSD` class
+    """
+    def setUp(self):
+        self.data = TimeSeries(numpy.random.normal(size=4096),
+                               sample_rate=256, epoch=100, unit='m')
+        self.periodograms = periodograms(
+            self.data.value, 256, noverlap=128, window='hanning',
+            sample_rate=256)
+
+    def _running(self, **kwargs):
+        running = RunningPSD(1, .5, **kwargs)
+        nseg = 0
+        for i in range(0, self.data.size, 100):
+            nseg += running.update(self.data[i:i+100])
+        self.assertEqual(nseg, self.periodograms.shape[0])
+        self.assertEqual(running.count, nseg)
+        return running
+
+    def test_mean(self):
+        running = self._running()
+        psd = running.psd()
+        self.assertIsInstance(psd, Spectrum)
+        self.assertEqual(psd.df, 1 * psd.df.unit)
+        self.assertEqual(psd.unit, self.data.psd(1, .5).unit)
+        nptest.assert_allclose(psd.value, self.data.psd(1, .5).value)
+        nptest.assert_allclose(running.asd().value, psd.value ** .5)
+
+    def test_ema(self):
+        running = self._running(alpha=.1)
+        ema = self.periodograms[0]
+        for psd in self.periodograms[1:]:
+            ema = .9 * ema + .1 * psd
+        nptest.assert_allclose(running.psd('ema').value, ema)
+
+    def test_median(self):
+        running = self._running(nsegments=8)
+        median = (numpy.median(self.periodograms[-8:], axis=0) /
+                  median_bias(8))
+        nptest.assert_allclose(running.psd('median').value, median)
+        self.assertRaises(ValueError, running.psd, 'blah')
+
+    def test_update_errors(self):
+        running = RunningPSD(1, .5)
+        self.assertRaises(ValueError, running.psd)
+        running.update(self.data[:100])
+        self.assertRaises(ValueError, running.update, self.data[200:300])
+        self.assertRaises(ValueError, running.update,
+                          TimeSeries(numpy.zeros(10), sample_rate=128,
+                                     epoch=self.data.times[100].value))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -40,9 +40,12 @@ from gwpy.time import Time
 
 from gwpy import version
 from gwpy.timeseries import (TimeSeries, StateVector, TimeSeriesDict,
-                             StateVectorDict)
+                             StateVectorDict, TimeSeriesList, StateVectorList,
+                             RingTimeSeries, RingTimeSeriesDict, Whitener)
+from gwpy.timeseries.resample import design_filter
+from gwpy.timeseries.iterate import (chunk_segments, iter_chunks)
 from gwpy.spectrum import Spectrum
-from gwpy.spectrogram import Spectrogram
+from gwpy.spectrogram import (Spectrogram, SpectrogramList)
 from gwpy.io.cache import Cache
 
 from test_array import SeriesTestCase
@@ -156,6 +159,69 @@ class TimeSeriesTestMixin(object):
     def test_frame_read_framecpp(self):
         return self._test_frame_read_format('framecpp')
 
+    def test_frame_read_framecpp_multiple(self):
+        data = numpy.random.random(1024).astype('float32')
+        ts = self.TEST_CLASS(data, sample_rate=256, epoch=1000000000,
+                             name='X1:TEST', channel='X1:TEST')
+        tmpdir = tempfile.mkdtemp()
+        files = [os.path.join(tmpdir, 'X-TEST-%d-1.gwf' % t) for
+                 t in range(1000000000, 1000000004)]
+        try:
+            for i, fp in enumerate(files):
+                try:
+                    ts[i*256:(i+1)*256].write(fp, format='framecpp')
+                except ImportError as e:
+                    self.skipTest(str(e))
+            # read all files into a single array
+            ts2 = self.TEST_CLASS.read(files, 'X1:TEST', format='framecpp')
+            self.assertArraysEqual(ts, ts2, 'x0', 'dx')
+            self.assertTrue(ts2.flags.owndata)
+            # read across a file boundary
+            ts2 = self.TEST_CLASS.read(files, 'X1:TEST', start=1000000001.5,
+                                       end=1000000003, format='framecpp')
+            self.assertArraysEqual(ts.crop(1000000001.5, 1000000003), ts2,
+                                   'x0', 'dx')
+            # check that discontiguous files are rejected
+            self.assertRaises(ValueError, self.TEST_CLASS.read,
+                              files[::2], 'X1:TEST', format='framecpp')
+        finally:
+            for fp in files:
+                if os.path.isfile(fp):
+                    os.remove(fp)
+            os.rmdir(tmpdir)
+
+    def test_iter_read(self):
+        data = numpy.random.random(2048).astype('float32')
+        ts = self.TEST_CLASS(data, sample_rate=256, epoch=1000000000,
+                             name='X1:TEST', channel='X1:TEST')
+        tmpdir = tempfile.mkdtemp()
+        files = [os.path.join(tmpdir, 'X-TEST-%d-2.gwf' % t) for
+                 t in range(1000000000, 1000000008, 2)]
+        try:
+            for i, fp in enumerate(files):
+                try:
+                    ts[i*512:(i+1)*512].write(fp, format='framecpp')
+                except ImportError as e:
+                    self.skipTest(str(e))
+            for prefetch in (False, True):
+                chunks = list(self.TEST_CLASS.iter_read(
+                    files, 'X1:TEST', 1000000000, 1000000008, 3, overlap=.5,
+                    prefetch=prefetch, format='framecpp'))
+                self.assertEqual(len(chunks), 3)
+                self.assertEqual([c.span for c in chunks],
+                                 [(1000000000, 1000000003.5),
+                                  (1000000002.5, 1000000006.5),
+                                  (1000000005.5, 1000000008)])
+                for chunk in chunks:
+                    self.assertIsInstance(chunk, self.TEST_CLASS)
+                    self.assertArraysEqual(ts.crop(*chunk.span), chunk,
+                                           'x0', 'dx')
+        finally:
+            for fp in files:
+                if os.path.isfile(fp):
+                    os.remove(fp)
+            os.rmdir(tmpdir)
+
     def frame_write(self, format=None):
         try:
             ts = self.TEST_CLASS.read(TEST_GWF_FILE, self.channel)
@@ -229,6 +295,26 @@ class TimeSeriesTestMixin(object):
             if os.path.isfile(fp):
                 os.remove(fp)
 
+    def test_hdf5_read_span(self):
+        ts = self.create(sample_rate=16, epoch=1000000000, name='test')
+        hdfout = self.tmpfile % 'hdf'
+        try:
+            try:
+                ts.write(hdfout, format='hdf5')
+            except ImportError as e:
+                self.skipTest(str(e))
+            ts2 = self.TEST_CLASS.read(hdfout, start=1000000001.5,
+                                       end=1000000004)
+            self.assertArraysEqual(ts.crop(1000000001.5, 1000000004), ts2,
+                                   'x0', 'dx', 'name')
+            ts2 = self.TEST_CLASS.read(hdfout, start=1000000005)
+            self.assertArraysEqual(ts.crop(1000000005), ts2, 'x0', 'dx')
+            ts2 = self.TEST_CLASS.read(hdfout, end=1000000002)
+            self.assertArraysEqual(ts.crop(end=1000000002), ts2, 'x0', 'dx')
+        finally:
+            if os.path.isfile(hdfout):
+                os.remove(hdfout)
+
     def test_resample(self):
         """Test the `TimeSeries.resample` method
         """
@@ -279,6 +365,94 @@ class TimeSeriesTestCase(TimeSeriesTestMixin, SeriesTestCase):
     def _read(self):
         return self.TEST_CLASS.read(TEST_HDF_FILE, self.channel)
 
+    def test_losc_read_span(self):
+        try:
+            import h5py
+        except ImportError as e:
+            self.skipTest(str(e))
+        ts = self.TEST_CLASS(numpy.random.random(4096), sample_rate=256,
+                             epoch=1000000000, unit='strain')
+        tmpdir = tempfile.mkdtemp()
+        files = []
+        try:
+            for i in range(4):
+                seg = ts[i*1024:(i+1)*1024]
+                fp = os.path.join(tmpdir, 'X-X1_LOSC_256_V1-%d-4.hdf5'
+                                  % seg.span[0])
+                with h5py.File(fp, 'w') as h5f:
+                    dset = h5f.create_dataset('strain/Strain',
+                                              data=seg.value)
+                    dset.attrs['Xstart'] = seg.span[0]
+                    dset.attrs['Xspacing'] = seg.dx.value
+                    dset.attrs['Xunits'] = 'second'
+                    dset.attrs['Yunits'] = 'strain'
+                files.append(fp)
+            ts2 = self.TEST_CLASS.read(files, 'Strain', format='losc',
+                                       start=1000000005, end=1000000010.5)
+            self.assertEqual(ts2.span, (1000000005, 1000000010.5))
+            nptest.assert_array_equal(
+                ts2.value, ts.crop(1000000005, 1000000010.5).value)
+            # files outside of the span are not read at all
+            os.remove(files[0])
+            ts2 = self.TEST_CLASS.read(files[1:], 'Strain', format='losc',
+                                       start=1000000005, end=1000000006)
+            self.assertEqual(ts2.size, 256)
+            self.assertRaises(ValueError, self.TEST_CLASS.read, files[1:],
+                              'Strain', format='losc', start=1000000016,
+                              end=1000000020)
+        finally:
+            for fp in files:
+                if os.path.isfile(fp):
+                    os.remove(fp)
+            os.rmdir(tmpdir)
+
+    def test_hdf5_archive(self):
+        try:
+            import h5py
+        except ImportError as e:
+            self.skipTest(str(e))
+        ts = self.TEST_CLASS(numpy.random.random(4096), sample_rate=256,
+                             epoch=1000000000, unit='m', name='X1:TEST',
+                             channel='X1:TEST')
+        fp = self.tmpfile % 'h5'
+        try:
+            # write in pieces, with a gap
+            for i in (0, 1, 3):
+                ts[i*1024:(i+1)*1024].write(fp, format='hdf5-archive',
+                                            chunks=256)
+            with h5py.File(fp, 'r') as h5f:
+                self.assertEqual(h5f['X1:TEST/data'].shape, (3072,))
+                nptest.assert_array_equal(
+                    h5f['X1:TEST/segments'][()],
+                    [[1000000000, 1000000008, 0],
+                     [1000000012, 1000000016, 2048]])
+            # read contiguous data
+            ts2 = self.TEST_CLASS.read(fp, 'X1:TEST', format='hdf5-archive',
+                                       start=1000000002, end=1000000007.5)
+            self.assertArraysEqual(ts.crop(1000000002, 1000000007.5), ts2,
+                                   'x0', 'dx', 'unit', 'name')
+            # read across the gap
+            self.assertRaises(ValueError, self.TEST_CLASS.read, fp,
+                              'X1:TEST', format='hdf5-archive')
+            ts2 = self.TEST_CLASS.read(fp, 'X1:TEST', format='hdf5-archive',
+                                       start=1000000007, pad=0)
+            self.assertEqual(ts2.span, (1000000007, 1000000016))
+            nptest.assert_array_equal(ts2.value[256:1280], 0)
+            nptest.assert_array_equal(ts2.value[1280:], ts.value[-1024:])
+            # check errors on append
+            self.assertRaises(ValueError, ts[:1024].write, fp,
+                              format='hdf5-archive')
+            self.assertRaises(ValueError, ts.resample(128).write, fp,
+                              format='hdf5-archive')
+            # check dict I/O
+            tsd = TimeSeriesDict.read(fp, format='hdf5-archive',
+                                      start=1000000012)
+            self.assertListEqual(list(tsd.keys()), ['X1:TEST'])
+            nptest.assert_array_equal(tsd['X1:TEST'].value, ts.value[-1024:])
+        finally:
+            if os.path.isfile(fp):
+                os.remove(fp)
+
     def test_fft(self):
         ts = self._read()
         fs = ts.fft()
@@ -304,6 +478,25 @@ class TimeSeriesTestCase(TimeSeriesTestMixin, SeriesTestCase):
         self.assertEqual(fs.df, 2 * units.Hertz)
         # test overlap
         fs = ts.average_fft(fftlength=0.4, overlap=0.2)
+        # test against single-segment FFTs
+        fs = ts.average_fft(fftlength=0.5, overlap=0.25, window='hanning')
+        nfft = int(0.5 * ts.sample_rate.value)
+        win = signal.get_window('hanning', nfft)
+        ffts = [(ts[i:i+nfft].detrend() * win).fft().value for
+                i in range(0, ts.size - nfft + 1, nfft // 2)]
+        nptest.assert_array_almost_equal(
+            fs.value, numpy.mean(ffts, axis=0) / win.mean())
+
+    def test_fftgram(self):
+        ts = self._read()
+        fg = ts.fftgram(0.25)
+        self.assertIsInstance(fg, Spectrogram)
+        self.assertEqual(fg.shape, (4, 0.25 * ts.sample_rate.value // 2 + 1))
+        self.assertEqual(fg.dt, 0.25 * units.second)
+        self.assertEqual(fg.df, 4 * units.Hertz)
+        nfft = fg.shape[1] * 2 - 2
+        nptest.assert_array_almost_equal(fg.value[1],
+                                         ts[nfft:2*nfft].fft().value)
 
     def test_psd(self):
         ts = self._read()
@@ -372,7 +565,7 @@ class TimeSeriesTestCase(TimeSeriesTestMixin, SeriesTestCase):
         self.assertEqual(sg.span, ts.span)
         # check the same result as PSD
         psd = ts.psd()
-        nptest.assert_array_equal(sg.data[0], psd.data)
+        nptest.assert_allclose(sg.value[0], psd.value, rtol=1e-10)
         # test fftlength
         sg = ts.spectrogram(1, fftlength=0.5)
         self.assertEqual(sg.shape, (1, 0.5 * ts.size//2+1))
@@ -383,11 +576,17 @@ class TimeSeriesTestCase(TimeSeriesTestMixin, SeriesTestCase):
         self.assertEqual(sg.shape, (2, 0.2 * ts.size//2 + 1))
         self.assertEqual(sg.df, 5 * units.Hertz)
         self.assertEqual(sg.dt, 0.5 * units.second)
+        # check batched strides match PSD of each stride
+        for i, col in enumerate(sg.value):
+            psd = ts[i*8192:(i+1)*8192].psd(fftlength=0.2, overlap=0.1)
+            nptest.assert_allclose(col, psd.value, rtol=1e-10)
         # test multiprocessing
         sg2 = ts.spectrogram(0.5, fftlength=0.2, overlap=0.1, nproc=2)
         self.assertArraysEqual(sg, sg2)
         # test methods
-        ts.spectrogram(0.5, fftlength=0.2, method='bartlett')
+        sg = ts.spectrogram(0.5, fftlength=0.2, method='bartlett')
+        psd = ts[:8192].psd(fftlength=0.2, method='bartlett')
+        nptest.assert_allclose(sg.value[0], psd.value, rtol=1e-10)
 
     def test_spectrogram2(self):
         ts = self._read()
@@ -403,7 +602,7 @@ class TimeSeriesTestCase(TimeSeriesTestMixin, SeriesTestCase):
         self.assertEqual(sg.span, ts.span)
         # test the same result as spectrogam
         sg1 = ts.spectrogram(1)
-        nptest.assert_array_equal(sg.data, sg1.data)
+        nptest.assert_allclose(sg.value, sg1.value, rtol=1e-10)
         # test fftlength
         sg = ts.spectrogram2(0.5)
         self.assertEqual(sg.shape, (2, 0.5 * ts.size//2+1))
@@ -432,11 +631,98 @@ class TimeSeriesTestCase(TimeSeriesTestMixin, SeriesTestCase):
         tmax = whitened.times[whitened.argmax()]
         self.assertAlmostEqual(tmax.value, -glitchtime)
 
+    def test_resample_rational(self):
+        ts = self.random
+        new = ts.resample(12288)
+        self.assertEqual(new.sample_rate, 12288 * units.Hertz)
+        self.assertEqual(new.size, ts.size * 3 // 4)
+        filt = signal.firwin(81, 1/4., window='hamming')
+        nptest.assert_allclose(
+            new.value, signal.resample_poly(ts.value, 3, 4, window=filt))
+        # check chunked resampling gives the same answer
+        nptest.assert_allclose(ts.resample(12288, chunksize=10000).value,
+                               new.value)
+        nptest.assert_allclose(ts.resample(4096, chunksize=10000).value,
+                               ts.resample(4096).value)
+        # check filter design is cached
+        self.assertIs(design_filter(3, 4), design_filter(3, 4))
+        self.assertRaises(ValueError, ts.resample, numpy.pi)
+
+    def test_whitener(self):
+        ts = self._read()
+        asd = ts.asd(0.5, 0.25)
+        whitener = Whitener(asd, ts.sample_rate, 0.5, 0.25)
+        whitened = whitener.whiten(ts)
+        self.assertIsInstance(whitened, TimeSeries)
+        self.assertEqual(whitened.size, ts.size)
+        # compare against whitening each segment in turn
+        nfft = int(0.5 * ts.sample_rate.value)
+        nstride = nfft // 2
+        win = signal.get_window('hanning', nfft)
+        ref = numpy.zeros(ts.size)
+        for i in range(0, ts.size - nfft + 1, nstride):
+            seg = ts[i:i+nfft].detrend() * win
+            ref[i:i+nfft] += numpy.fft.irfft(seg.fft().value / asd.value)
+        nptest.assert_allclose(whitened.value, ref, rtol=1e-5,
+                               atol=1e-5 * abs(ref).max())
+        # feed irregular chunks and check the stream matches
+        chunks = [whitener.feed(ts[i:i+3000]) for
+                  i in range(0, ts.size, 3000)]
+        chunks.append(whitener.flush())
+        nptest.assert_allclose(
+            numpy.concatenate([c.value for c in chunks]), whitened.value)
+        self.assertEqual(chunks[-1].epoch.gps,
+                         ts.epoch.gps + 3 * nstride / ts.sample_rate.value)
+        # check ASD size is validated
+        self.assertRaises(ValueError, Whitener, asd, ts.sample_rate, 1)
+
     def test_detrend(self):
         self.assertNotAlmostEqual(self.random.mean(), 0.0)
         detrended = self.random.detrend()
         self.assertAlmostEqual(detrended.mean(), 0.0)
 
+    def test_coherence(self):
+        ts = self._read()
+        other = ts + numpy.random.normal(scale=ts.value.std(), size=ts.size)
+        coh = ts.coherence(other, fftlength=0.25, overlap=0.125)
+        self.assertIsInstance(coh, Spectrum)
+        self.assertEqual(coh.df, 4 * units.Hertz)
+        self.assertEqual(coh.unit, units.Unit('coherence'))
+        nfft = int(0.25 * ts.sample_rate.value)
+        ref = signal.coherence(ts.value, other.value,
+                               fs=ts.sample_rate.value,
+                               window=numpy.hanning(nfft), nperseg=nfft,
+                               noverlap=nfft // 2, detrend=False)[1]
+        nptest.assert_allclose(coh.value, ref, rtol=1e-4)
+        # check zero-padding and callable detrend, as for mlab.cohere
+        coh = ts.coherence(other, fftlength=0.25, overlap=0.125,
+                           pad_to=4 * nfft, detrend=signal.detrend)
+        self.assertEqual(coh.df, 1 * units.Hertz)
+        ref = signal.coherence(ts.value, other.value,
+                               fs=ts.sample_rate.value,
+                               window=numpy.hanning(nfft), nperseg=nfft,
+                               noverlap=nfft // 2, nfft=4 * nfft,
+                               detrend='linear')[1]
+        nptest.assert_allclose(coh.value, ref, rtol=1e-4)
+        # check deprecated mlab keywords
+        with pytest.warns(DeprecationWarning):
+            ts.coherence(other, fftlength=0.25, sides='onesided')
+        self.assertRaises(TypeError, ts.coherence, other, blah=1)
+
+    def test_coherence_spectrogram(self):
+        ts = self._read()
+        other = ts + numpy.random.normal(scale=ts.value.std(), size=ts.size)
+        sg = ts.coherence_spectrogram(other, 0.25, fftlength=0.0625,
+                                      overlap=0.03125)
+        self.assertIsInstance(sg, Spectrogram)
+        self.assertEqual(sg.shape, (4, 0.0625 * ts.sample_rate.value // 2 + 1))
+        nsamp = int(0.25 * ts.sample_rate.value)
+        for i in range(sg.shape[0]):
+            coh = ts[i*nsamp:(i+1)*nsamp].coherence(
+                other[i*nsamp:(i+1)*nsamp], fftlength=0.0625,
+                overlap=0.03125)
+            nptest.assert_allclose(sg.value[i], coh.value)
+
     def test_csd_spectrogram(self):
         ts = self._read()
         # test defaults
@@ -508,6 +794,279 @@ class StateVectorTestCase(TimeSeriesTestMixin, SeriesTestCase):
         self.assertEqual(ts.dx, units.Quantity(1.0, 's'))
         self.assertListEqual(list(ts.bits), LOSC_DQ_BITS)
 
+    def test_boolean(self):
+        sv = self.create()
+        b = sv.boolean
+        self.assertEqual(b.shape, (sv.size, 32))
+        for j in (0, 5, 16, 31):
+            nptest.assert_array_equal(b.value[:, j], sv.value >> j & 1)
+
+    def test_get_bit_series(self):
+        sv = self.create(bits=['a', None, 'c'])
+        bitseries = sv.get_bit_series()
+        self.assertListEqual(list(bitseries.keys()), ['a', 'c'])
+        nptest.assert_array_equal(bitseries['c'].value,
+                                  (sv.value >> 2 & 1).astype(bool))
+        # check segments against a simple loop over samples
+        flags = sv.to_dqflags()
+        self.assertListEqual(list(flags.keys()), ['a', 'c'])
+        active = []
+        for i, on in enumerate(bitseries['a'].value):
+            if on and active and active[-1][1] == i:
+                active[-1][1] = i + 1
+            elif on:
+                active.append([i, i + 1])
+        self.assertListEqual([tuple(seg) for seg in flags['a'].active],
+                             [tuple(seg) for seg in active])
+
+    def test_resample(self):
+        sv = self.create(sample_rate=4)
+        new = sv.resample(1)
+        self.assertEqual(new.sample_rate, ONE_HZ)
+        self.assertEqual(new.size, sv.size // 4)
+        old = sv.value.reshape((new.size, 4))
+        nptest.assert_array_equal(
+            new.value, old[:, 0] & old[:, 1] & old[:, 2] & old[:, 3])
+        self.assertRaises(ValueError, sv.resample, 3)
+
+
+# -- TimeSeriesList tests ------------------------------------------------------
+
+class TimeSeriesListTestCase(unittest.TestCase):
+    TEST_CLASS = TimeSeriesList
+    ENTRY_CLASS = TimeSeries
+    DTYPE = 'float64'
+
+    def create(self, n=10, size=16, gaps=()):
+        data = numpy.arange(n * size).astype(self.DTYPE)
+        out = self.TEST_CLASS()
+        epoch = 0
+        for i in range(n):
+            epoch += i in gaps
+            out.append(self.ENTRY_CLASS(data[i*size:(i+1)*size],
+                                        epoch=epoch, sample_rate=size))
+            epoch += 1
+        # shuffle to check sorting
+        out.reverse()
+        return data, out
+
+    def test_join(self):
+        data, tsl = self.create(n=2000)
+        ts = tsl.join()
+        self.assertIsInstance(ts, self.ENTRY_CLASS)
+        nptest.assert_array_equal(ts.value, data)
+        self.assertEqual(ts.x0.value, 0)
+        self.assertEqual(ts.span, (0, 2000))
+        # the inputs are unchanged
+        self.assertEqual(tsl[0].size, 16)
+        # empty list
+        self.assertEqual(self.TEST_CLASS().join().size, 0)
+
+    def test_join_gaps(self):
+        data, tsl = self.create(n=4, gaps=(2,))
+        self.assertRaises(ValueError, tsl.join)
+        # pad
+        ts = tsl.join(gap='pad', pad=7)
+        self.assertEqual(ts.span, (0, 5))
+        nptest.assert_array_equal(ts.value[:32], data[:32])
+        nptest.assert_array_equal(ts.value[32:48], 7)
+        nptest.assert_array_equal(ts.value[48:], data[32:])
+        # ignore
+        ts = tsl.join(gap='ignore')
+        self.assertEqual(ts.span, (0, 4))
+        nptest.assert_array_equal(ts.value, data)
+        # overlap
+        tsl.append(tsl[0].copy())
+        self.assertRaises(ValueError, tsl.join, gap='pad')
+
+    def test_coalesce(self):
+        data, tsl = self.create(n=1000, gaps=(10, 500))
+        tsl.coalesce()
+        self.assertEqual(len(tsl), 3)
+        self.assertListEqual([ts.span for ts in tsl],
+                             [(0, 10), (11, 501), (502, 1002)])
+        nptest.assert_array_equal(tsl[1].value, data[160:8000])
+
+
+class StateVectorListTestCase(TimeSeriesListTestCase):
+    TEST_CLASS = StateVectorList
+    ENTRY_CLASS = StateVector
+    DTYPE = 'uint32'
+
+
+class SpectrogramListTestCase(unittest.TestCase):
+
+    def test_join(self):
+        data = numpy.random.random((100, 5))
+        specl = SpectrogramList(*[
+            Spectrogram(data[i:i+10], epoch=i, dt=1, f0=0, df=1) for
+            i in range(90, -1, -10)])
+        spec = specl.join()
+        self.assertIsInstance(spec, Spectrogram)
+        nptest.assert_array_equal(spec.value, data)
+        self.assertEqual(spec.x0.value, 0)
+        self.assertEqual(spec.df.value, 1)
+        del specl[5]
+        self.assertRaises(ValueError, specl.join)
+        spec = specl.join(gap='pad', pad=0)
+        self.assertEqual(spec.shape, (100, 5))
+        nptest.assert_array_equal(spec.value[50:60], 0)
+        nptest.assert_array_equal(spec.value[60:], data[60:])
+
+
+# -- RingTimeSeries tests ------------------------------------------------------
+
+class RingTimeSeriesTestCase(unittest.TestCase):
+    TEST_CLASS = RingTimeSeries
+
+    def create(self, n, epoch=0, size=16):
+        return TimeSeries(numpy.arange(n * size, (n + 1) * size,
+                                       dtype='float64'),
+                          epoch=epoch, sample_rate=size, name='test',
+                          unit='m')
+
+    def test_update(self):
+        ring = self.TEST_CLASS(4)
+        self.assertIsNone(ring.span)
+        ring.update(self.create(0))
+        self.assertEqual(ring.sample_rate, 16 * units.Hz)
+        self.assertEqual(ring.capacity, 64)
+        self.assertEqual(ring.name, 'test')
+        self.assertEqual(len(ring), 16)
+        self.assertEqual(ring.span, (0, 1))
+        for i in range(1, 6):
+            ring.update(self.create(i, epoch=i))
+        self.assertEqual(len(ring), 64)
+        self.assertEqual(ring.span, (2, 6))
+        self.assertTrue(ring.is_wrapped)
+        ts = ring.to_timeseries()
+        self.assertIsInstance(ts, TimeSeries)
+        nptest.assert_array_equal(ts.value, numpy.arange(32, 96))
+        self.assertEqual(ts.span, (2, 6))
+        self.assertEqual(ts.unit, units.m)
+        # check errors
+        self.assertRaises(ValueError, ring.update, self.create(0, epoch=8))
+        self.assertRaises(ValueError, ring.update, self.create(0, epoch=6,
+                                                              size=32))
+
+    def test_views(self):
+        ring = self.TEST_CLASS(4)
+        for i in range(4):
+            ring.update(self.create(i, epoch=i))
+        self.assertFalse(ring.is_wrapped)
+        ts = ring.to_timeseries()
+        self.assertTrue(numpy.may_share_memory(ts.value, ring._data))
+        ts2 = ring.to_timeseries(copy=True)
+        self.assertFalse(numpy.may_share_memory(ts2.value, ring._data))
+        # an update larger than the buffer keeps just the newest data
+        big = TimeSeries(numpy.arange(100.), sample_rate=16, epoch=4,
+                         unit='m')
+        ring.update(big)
+        self.assertEqual(ring.head, 0)
+        nptest.assert_array_equal(ring.value, big.value[-64:])
+        self.assertEqual(ring.span[1], big.span[1])
+
+    def test_gap(self):
+        ring = self.TEST_CLASS(4)
+        ring.update(self.create(0))
+        ring.update(self.create(1, epoch=2), gap='pad', pad=-1)
+        self.assertEqual(ring.span, (0, 3))
+        nptest.assert_array_equal(ring.value[16:32], -1)
+        nptest.assert_array_equal(ring.value[32:], numpy.arange(16, 32))
+        ring.clear()
+        self.assertEqual(len(ring), 0)
+        ring.update(self.create(0, epoch=10))
+        self.assertEqual(ring.span, (10, 11))
+
+    def test_psd(self):
+        ring = self.TEST_CLASS(4)
+        for i in range(6):
+            ring.update(TimeSeries(numpy.random.normal(size=16),
+                                   sample_rate=16, epoch=i))
+        ts = ring.to_timeseries(copy=True)
+        nptest.assert_array_equal(ring.psd(1).value, ts.psd(1).value)
+        nptest.assert_array_equal(ring.spectrogram(2).value,
+                                  ts.spectrogram(2).value)
+
+    def test_dict(self):
+        rings = RingTimeSeriesDict(2)
+        for i in range(4):
+            tsd = TimeSeriesDict()
+            tsd['a'] = self.create(i, epoch=i)
+            tsd['b'] = self.create(i, epoch=i, size=32)
+            rings.update(tsd)
+        self.assertListEqual(list(rings.keys()), ['a', 'b'])
+        self.assertIsInstance(rings['a'], RingTimeSeries)
+        tsd = rings.to_timeseriesdict()
+        self.assertIsInstance(tsd, TimeSeriesDict)
+        self.assertEqual(tsd['a'].span, (2, 4))
+        self.assertEqual(tsd['b'].size, 64)
+
+
+# -- chunked iteration tests ---------------------------------------------------
+
+class IterChunksTestCase(unittest.TestCase):
+    """`~unittest.TestCase` for `gwpy.timeseries.iterate`
+    """
+    def test_chunk_segments(self):
+        self.assertListEqual(chunk_segments(0, 10, 4),
+                             [(0, 4), (4, 8), (8, 10)])
+        self.assertListEqual(chunk_segments(0, 10, 4, overlap=1),
+                             [(0, 5), (3, 9), (7, 10)])
+        self.assertListEqual(chunk_segments(0, 0, 4), [])
+        self.assertRaises(ValueError, chunk_segments, 0, 10, 0)
+        self.assertRaises(ValueError, chunk_segments, 0, 10, 4, overlap=-1)
+
+    def test_iter_chunks(self):
+        segments = chunk_segments(0, 10, 2)
+        for prefetch in (False, True):
+            calls = []
+
+            def _read(segment):
+                calls.append(segment)
+                return segment[0]
+
+            chunks = iter_chunks(_read, segments, prefetch=prefetch)
+            self.assertEqual(next(chunks), 0)
+            self.assertListEqual(list(chunks), [2, 4, 6, 8])
+            self.assertListEqual(calls, segments)
+
+    def test_iter_chunks_error(self):
+        def _read(segment):
+            if segment[0] == 4:
+                raise ValueError("Failed to read %s" % str(segment))
+            return segment[0]
+
+        for prefetch in (False, True):
+            chunks = iter_chunks(_read, chunk_segments(0, 10, 2),
+                                 prefetch=prefetch)
+            self.assertEqual(next(chunks), 0)
+            self.assertEqual(next(chunks), 2)
+            self.assertRaises(ValueError, next, chunks)
+
+    def test_iter_chunks_close_streams(self):
+        from gwpy.timeseries.io.gwf import framecpp
+
+        class FakeStream(object):
+            closed = False
+
+            def Close(self):
+                self.closed = True
+
+        for prefetch in (False, True):
+            streams = []
+
+            def _read(segment):
+                stream = FakeStream()
+                streams.append(stream)
+                framecpp._STREAMS.streams = {segment: stream}
+                return segment[0]
+
+            list(iter_chunks(_read, chunk_segments(0, 4, 2),
+                             prefetch=prefetch))
+            # the stream held open by the reading thread is closed
+            self.assertTrue(streams[-1].closed)
+
 
 # -- TimeSeriesDict tests ------------------------------------------------------
 
@@ -532,6 +1091,69 @@ class TimeSeriesDictTestCase(unittest.TestCase):
                 tsd2 = self.TEST_CLASS.read(f.name, tsd.keys())
             self.assertDictEqual(tsd, tsd2)
 
+    def test_resample(self):
+        tsd = TimeSeriesDict()
+        for name in ('a', 'b'):
+            tsd[name] = TimeSeries(numpy.random.normal(size=4096),
+                                   sample_rate=1024, name=name)
+        tsd['c'] = TimeSeries(numpy.random.normal(size=8192),
+                              sample_rate=2048, name='c')
+        ref = dict((key, ts.resample(256)) for key, ts in tsd.items())
+        tsd.resample(256)
+        for key, ts in tsd.items():
+            self.assertEqual(ts.sample_rate, 256 * units.Hertz)
+            self.assertEqual(ts.name, key)
+            nptest.assert_allclose(ts.value, ref[key].value)
+
+    def _coherence_dict(self):
+        target = TimeSeries(numpy.random.normal(size=4096), sample_rate=1024,
+                            name='target')
+        tsd = TimeSeriesDict()
+        tsd['target'] = target
+        tsd['a'] = target + numpy.random.normal(size=4096)
+        tsd['b'] = TimeSeries(numpy.random.normal(size=2048),
+                              sample_rate=512)
+        tsd['c'] = TimeSeries(numpy.random.normal(size=8192),
+                              sample_rate=2048)
+        return tsd
+
+    def test_coherence(self):
+        tsd = self._coherence_dict()
+        target = tsd['target']
+        coh = tsd.coherence('target', 0.5, 0.25)
+        self.assertListEqual(list(coh.keys()), ['a', 'b', 'c'])
+        for key, spec in coh.items():
+            self.assertIsInstance(spec, Spectrum)
+            nptest.assert_allclose(
+                spec.value, target.coherence(tsd[key], 0.5, 0.25).value)
+        self.assertEqual(coh['b'].size, 129)
+        # test array output
+        arr = tsd.coherence(target, 0.5, 0.25, asarray=True)
+        self.assertEqual(arr.shape, (3, 257))
+        nptest.assert_array_equal(arr[0], coh['a'].value)
+        self.assertTrue(numpy.isnan(arr[1, 129:]).all())
+        # test multi-process
+        coh2 = tsd.coherence('target', 0.5, 0.25, nproc=2)
+        for key in coh:
+            nptest.assert_array_equal(coh2[key].value, coh[key].value)
+
+    def test_csd(self):
+        tsd = self._coherence_dict()
+        csd = tsd.csd('target', 0.5, 0.25)
+        self.assertListEqual(list(csd.keys()), ['a', 'b', 'c'])
+        nptest.assert_allclose(
+            csd['a'].value, tsd['target'].csd(tsd['a'], 0.5, 0.25).value)
+        self.assertEqual(csd['b'].size, 129)
+
+    def test_coherence_span(self):
+        tsd = self._coherence_dict()
+        # same duration, different epoch
+        tsd['b'].x0 = 1
+        self.assertRaises(ValueError, tsd.coherence, 'target', 0.5, 0.25)
+        tsd['b'].x0 = 0
+        tsd['c'] = tsd['c'][:-4]
+        self.assertRaises(ValueError, tsd.csd, 'target', 0.5, 0.25)
+
 
 class StateVectorDictTestCase(TimeSeriesDictTestCase):
     TEST_CLASS = StateVectorDict
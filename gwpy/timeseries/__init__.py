@@ -27,4 +27,6 @@ __version__ = version.version
 from .core import *
 from .timeseries import *
 from .statevector import *
+from .whiten import *
+from .ring import *
 from .io import *
@@ -42,6 +42,7 @@ else:
                             nds2.channel.CHANNEL_TYPE_STATIC)
 
 from .. import version
+from ..cache import with_cache
 from ..data import (Array2D, Series)
 from ..detector import (Channel, ChannelList)
 from ..io import (reader, writer, datafind)
@@ -49,12 +50,17 @@ from ..time import (Time, to_gps)
 from ..utils import (gprint, with_import)
 from ..utils.docstring import interpolate_docstring
 from ..utils.compat import OrderedDict
+from .iterate import (chunk_segments, iter_chunks, parse_source,
+                      sieve_source)
 
 __author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
 __version__ = version.version
 
 __all__ = ['TimeSeriesBase', 'ArrayTimeSeries', 'TimeSeriesBaseDict']
 
+#: tolerance (in x-axis units) when checking whether two series are contiguous
+CONTIGUITY_TOLERANCE = 1/2.**18
+
 _UFUNC_STRING = {'less': '<',
                  'less_equal': '<=',
                  'equal': '==',
@@ -254,7 +260,7 @@ class TimeSeriesBase(Series):
     @with_import('nds2')
     def fetch(cls, channel, start, end, host=None, port=None, verbose=False,
               connection=None, verify=False, pad=None,
-              type=NDS2_FETCH_TYPE_MASK, dtype=None):
+              type=NDS2_FETCH_TYPE_MASK, dtype=None, cache=None):
         """Fetch data from NDS into a `TimeSeries`.
 
         Parameters
@@ -262,11 +268,14 @@ class TimeSeriesBase(Series):
         %(timeseries-fetch1)s
 
         %(timeseries-fetch2)s
+
+        cache : `~gwpy.cache.DataCache`, `str`, `bool`, optional
+            local cache of data to use, see `TimeSeriesDict.fetch`
         """
         return cls.DictClass.fetch(
             [channel], start, end, host=host, port=port,
             verbose=verbose, connection=connection, verify=verify,
-            pad=pad, type=type, dtype=dtype)[str(channel)]
+            pad=pad, type=type, dtype=dtype, cache=cache)[str(channel)]
 
     @classmethod
     @interpolate_docstring
@@ -343,6 +352,102 @@ class TimeSeriesBase(Series):
             [channel], start, end, pad=pad, dtype=dtype, verbose=verbose,
             **kwargs)[str(channel)]
 
+    @classmethod
+    @interpolate_docstring
+    def iter_read(cls, source, channel, start, end, stride, overlap=0,
+                  prefetch=True, **kwargs):
+        """Read data for a channel in consecutive chunks
+
+        This method returns a generator, so that only one chunk of data
+        (plus the next, if prefetching) is held in memory at any time.
+
+        Parameters
+        ----------
+        %(timeseries-read1)s
+
+        stride : `float`
+            duration (seconds) of each chunk
+
+        overlap : `float`, optional, default: ``0``
+            duration (seconds) by which to pad each chunk at both ends,
+            e.g. to allow for filter or FFT edge effects; the padding is
+            restricted to the ``[start, end)`` interval
+
+        prefetch : `bool`, optional, default: `True`
+            read the next chunk in a background thread while the current
+            chunk is being processed
+
+        **kwargs
+            other keyword arguments to pass to `~TimeSeries.read`
+
+        Yields
+        ------
+        data : `TimeSeries`
+            the data for each chunk, the un-padded span of chunk ``i`` is
+            ``[start + i * stride, start + (i + 1) * stride)``
+
+        Notes
+        -----
+        The source is parsed only once, and each chunk is read only from
+        those files that overlap it. Reading GWF files with frameCPP
+        re-uses the open file handle, and the table of contents, from one
+        chunk to the next.
+
+        Examples
+        --------
+        >>> for data in TimeSeries.iter_read(cache, 'X1:TEST', start, end,
+        ...                                  3600, overlap=8):
+        ...     asd = data.asd(8, 4)
+        """
+        start = float(to_gps(start))
+        end = float(to_gps(end))
+        source = parse_source(source)
+
+        def _read(segment):
+            return cls.read(sieve_source(source, segment), channel,
+                            start=segment[0], end=segment[1], **kwargs)
+
+        return iter_chunks(_read, chunk_segments(start, end, stride, overlap),
+                           prefetch=prefetch)
+
+    @classmethod
+    @interpolate_docstring
+    def iter_get(cls, channel, start, end, stride, overlap=0, prefetch=True,
+                 **kwargs):
+        """Get data for a channel from frames or NDS in consecutive chunks
+
+        Parameters
+        ----------
+        %(timeseries-fetch1)s
+
+        stride : `float`
+            duration (seconds) of each chunk
+
+        overlap : `float`, optional, default: ``0``
+            duration (seconds) by which to pad each chunk at both ends
+
+        prefetch : `bool`, optional, default: `True`
+            get the next chunk in a background thread while the current
+            chunk is being processed
+
+        **kwargs
+            other keyword arguments to pass to `TimeSeriesDict.iter_get`
+
+        Yields
+        ------
+        data : `TimeSeries`
+            the data for each chunk
+
+        See Also
+        --------
+        TimeSeriesDict.iter_get
+            for details of how the data are found
+        """
+        key = str(channel)
+        return (data[key] for data in cls.DictClass.iter_get(
+            [channel], start, end, stride, overlap=overlap,
+            prefetch=prefetch, **kwargs))
+
     # -------------------------------------------
     # Utilities
 
@@ -494,9 +599,12 @@ class ArrayTimeSeries(TimeSeriesBase, Array2D):
             unit = unit or channel.unit
             sample_rate = sample_rate or channel.sample_rate
         # generate TimeSeries
-        new = Array2D.__new__(cls, data, name=name, unit=unit, epoch=epoch,
-                              channel=channel, sample_rate=sample_rate,
-                              times=times, **kwargs)
+        new = Array2D.__new__(cls, data, name=name, unit=unit,
+                              channel=channel, xindex=times, **kwargs)
+        if epoch is not None:
+            new.epoch = epoch
+        if sample_rate is not None:
+            new.sample_rate = sample_rate
         return new
 
 
@@ -598,7 +706,7 @@ class TimeSeriesBaseDict(OrderedDict):
     def append(self, other, copy=True, **kwargs):
         for key, ts in other.iteritems():
             if key in self:
-                self[key].append(ts, **kwargs)
+                self[key] = self[key].append(ts, **kwargs)
             elif copy:
                 self[key] = ts.copy()
             else:
@@ -608,7 +716,7 @@ class TimeSeriesBaseDict(OrderedDict):
     def prepend(self, other, **kwargs):
         for key, ts in other.iteritems():
             if key in self:
-                self[key].prepend(ts, **kwargs)
+                self[key] = self[key].prepend(ts, **kwargs)
             else:
                 self[key] = ts
         return self
@@ -656,10 +764,12 @@ class TimeSeriesBaseDict(OrderedDict):
         return self
 
     @classmethod
+    @with_cache
     @with_import('nds2')
     def fetch(cls, channels, start, end, host=None, port=None,
               verify=False, verbose=False, connection=None,
-              pad=None, type=NDS2_FETCH_TYPE_MASK, dtype=None):
+              pad=None, type=NDS2_FETCH_TYPE_MASK, dtype=None,
+              concurrency=None):
         """Fetch data from NDS for a number of channels.
 
         Parameters
@@ -685,12 +795,30 @@ class TimeSeriesBaseDict(OrderedDict):
         dtype : `numpy.dtype`, `str`, `type`, or `dict`
             numeric data type for returned data, e.g. `numpy.float`, or
             `dict` of (`channel`, `dtype`) pairs
+        concurrency : `int`, optional
+            maximum number of simultaneous requests to make when no
+            ``host`` is given, defaults to
+            `gwpy.io.nds.FETCH_CONCURRENCY`
+        cache : `~gwpy.cache.DataCache`, `str`, `bool`, optional
+            local cache of data to use, either a `~gwpy.cache.DataCache`,
+            or the path of a cache directory, by default the cache set by
+            :func:`gwpy.cache.enable` is used, if any, give `False` to
+            not use a cache
 
         Returns
         -------
         data : :class:`~gwpy.timeseries.TimeSeriesBaseDict`
             a new `TimeSeriesBaseDict` of (`str`, `TimeSeries`) pairs fetched
             from NDS.
+
+        Notes
+        -----
+        If no ``host`` or ``connection`` is given, all channels are first
+        requested from the preferred server for the given channels and
+        times. If that fails, the channels are split into batches that are
+        requested concurrently, with any channel that still fails moving
+        on to the next server in the list given by
+        `~gwpy.io.nds.host_resolution_order`.
         """
         from ..segments import (Segment, SegmentList)
         from ..io import nds as ndsio
@@ -721,9 +849,16 @@ class TimeSeriesBaseDict(OrderedDict):
         if host is not None and port is not None and connection is None:
             if verbose:
                 gprint("Connecting to %s:%s..." % (host, port), end=' ')
-            connection = ndsio.auth_connect(host, port)
-            if verbose:
-                gprint("Connected.")
+
+            def _fetch(connection):
+                if verbose:
+                    gprint("Connected.")
+                return cls.fetch(channels, start, end, verbose=verbose,
+                                 connection=connection, type=type,
+                                 verify=verify, dtype=dtype, pad=pad,
+                                 cache=False)
+
+            return ndsio.CONNECTION_POOL.call(_fetch, host, port)
         elif connection is not None and verbose:
             gprint("Received connection to %s:%d."
                    % (connection.get_host(), connection.get_port()))
@@ -735,57 +870,36 @@ class TimeSeriesBaseDict(OrderedDict):
             else:
                 ifo = None
             hostlist = ndsio.host_resolution_order(ifo, epoch=start)
-            for host, port in hostlist:
-                try:
-                    return cls.fetch(channels, start, end, host=host,
-                                     port=port, verbose=verbose, type=type,
-                                     verify=verify, dtype=dtype, pad=pad)
-                except (RuntimeError, ValueError) as e:
-                    if verbose:
-                        gprint('Something went wrong:', file=sys.stderr)
-                        # if error and user supplied their own server, raise
-                        warnings.warn(str(e), ndsio.NDSWarning)
-
-            # if we got this far, we can't get all of the channels in one go
-            if len(channels) > 1:
-                return cls(
-                    (c, cls.EntryClass.fetch(c, start, end, verbose=verbose,
-                                             type=type, verify=verify,
-                                             dtype=dtype.get(c), pad=pad))
-                    for c in channels)
-            e = "Cannot find all relevant data on any known server."
-            if not verbose:
-                e += (" Try again using the verbose=True keyword argument to "
-                      "see detailed failures.")
-            raise RuntimeError(e)
+            return cls._fetch_concurrent(
+                channels, start, end, hostlist, concurrency=concurrency,
+                verbose=verbose, type=type, verify=verify, dtype=dtype,
+                pad=pad)
 
         # at this point we must have an open connection, so we can proceed
         # normally
 
-        # verify channels
+        # verify channels (this may run in several threads at once, so
+        # warnings are suppressed by query_nds2, not with a global filter)
         if verify:
             if verbose:
                 gprint("Checking channels against the NDS database...",
                        end=' ')
-            else:
-                warnings.filterwarnings('ignore', category=ndsio.NDSWarning,
-                                        append=False)
             try:
                 qchannels = ChannelList.query_nds2(channels,
                                                    connection=connection,
-                                                   type=type, unique=True)
+                                                   type=type, unique=True,
+                                                   warn=verbose)
             except ValueError as e:
                 try:
                     channels2 = ['%s*' % c for c in map(str, channels)]
                     qchannels = ChannelList.query_nds2(channels2,
                                                        connection=connection,
-                                                       type=type, unique=True)
+                                                       type=type, unique=True,
+                                                       warn=verbose)
                 except ValueError:
                     raise e
             if verbose:
                 gprint("Complete.")
-            else:
-                warnings.filters.pop(0)
         else:
             qchannels = ChannelList(map(Channel, channels))
 
@@ -829,7 +943,12 @@ class TimeSeriesBaseDict(OrderedDict):
                 gprint('Found %d viable segments of data with %.2f%% coverage'
                        % (len(qsegs), abs(qsegs) / abs(allsegs) * 100))
 
-        out = cls()
+        # preallocate one array per channel for the full request, and copy
+        # each buffer into place: ``fill[c]`` records the index of the first
+        # sample read (or 0 if padding) and the index after the last
+        span0, span1 = map(float, allsegs[0])
+        arrays = OrderedDict()
+        fill = {}
         for (istart, iend) in qsegs:
             istart = int(istart)
             iend = int(iend)
@@ -844,10 +963,30 @@ class TimeSeriesBaseDict(OrderedDict):
             i = 0
             for buffers in data:
                 for buffer_, c in zip(buffers, channels):
-                    ts = cls.EntryClass.from_nds2_buffer(
-                        buffer_, dtype=dtype.get(c))
-                    out.append({c: ts}, pad=pad,
-                               gap=pad is None and 'raise' or 'pad')
+                    if c not in arrays:
+                        ts = cls.EntryClass.from_nds2_buffer(
+                            buffer_, dtype=dtype.get(c))
+                        arrays[c] = _allocate_like(ts, span0, span1)
+                    arr = arrays[c]
+                    rate = arr.sample_rate.value
+                    idx = int(round(
+                        (buffer_.gps_seconds + buffer_.gps_nanoseconds * 1e-9
+                         - span0) * rate))
+                    if c not in fill:
+                        fill[c] = [0, 0] if pad is not None else [idx, idx]
+                    first, last = fill[c]
+                    if idx < last:
+                        raise ValueError("Cannot append overlapping NDS data "
+                                         "for %s" % c)
+                    elif idx > last and pad is None:
+                        raise ValueError("Cannot append discontiguous NDS "
+                                         "data for %s, please give pad= to "
+                                         "fill gaps" % c)
+                    elif idx > last:
+                        arr.value[last:idx] = pad
+                    size = buffer_.data.size
+                    arr.value[idx:idx+size] = buffer_.data
+                    fill[c][1] = idx + size
                 if not nsteps:
                     if have_minute_trends:
                         dur = buffer_.length * 60
@@ -861,23 +1000,123 @@ class TimeSeriesBaseDict(OrderedDict):
                     if i == nsteps:
                         gprint('')
 
-        # pad to end of request if required
-        if len(qsegs) and iend < float(end):
-            dt = float(end) - float(iend)
-            for channel in out:
-                nsamp = dt * out[channel].sample_rate.value
-                out[channel].append(
-                    numpy.ones(nsamp, dtype=out[channel].dtype) * pad)
-        # match request exactly
-        for channel in out:
-            if istart > start or iend < end:
-                out[channel] = out[channel].crop(start, end)
+        out = cls()
+        for c, arr in arrays.iteritems():
+            first, last = fill[c]
+            # pad to end of request if required
+            if pad is not None:
+                arr.value[last:] = pad
+                last = arr.size
+            out[c] = arr[first:last]
+            # match request exactly
+            if span0 != start or span1 != end:
+                out[c] = out[c].crop(start, end)
 
         if verbose:
             gprint('Success.')
         return out
 
     @classmethod
+    def _fetch_concurrent(cls, channels, start, end, hostlist,
+                          concurrency=None, verbose=False, dtype=None,
+                          **kwargs):
+        """Fetch data for a number of channels from a list of NDS servers
+
+        Each request that fails is split into smaller batches for the same
+        server, while a single channel that fails moves on to the next
+        server. All pending requests are made concurrently, with each
+        channel taken from the first server that returns its data.
+
+        Parameters
+        ----------
+        channels : `list`
+            required data channels
+        start : `~gwpy.time.LIGOTimeGPS`
+            GPS start time of data span
+        end : `~gwpy.time.LIGOTimeGPS`
+            GPS end time of data span
+        hostlist : `list` of `tuple`
+            ordered list of ``(host, port)`` servers to try
+        concurrency : `int`, optional
+            maximum number of simultaneous requests, defaults to
+            `gwpy.io.nds.FETCH_CONCURRENCY`
+        verbose : `bool`, optional
+            print verbose output about NDS progress
+        dtype : `dict`, optional
+            `dict` of (`channel`, `dtype`) pairs
+        **kwargs
+            other keyword arguments to pass to `~TimeSeriesBaseDict.fetch`
+
+        Returns
+        -------
+        data : `TimeSeriesBaseDict`
+            the data for all channels
+
+        Raises
+        ------
+        RuntimeError
+            if the data for any channel cannot be fetched from any server
+        """
+        from .. import parallel
+        from ..io import nds as ndsio
+        if concurrency is None:
+            concurrency = ndsio.FETCH_CONCURRENCY
+        if dtype is None:
+            dtype = {}
+
+        def _fetch(task):
+            batch, i = task
+            host, port = hostlist[i]
+            try:
+                return cls.fetch(batch, start, end, host=host, port=port,
+                                 verbose=verbose,
+                                 dtype=dict((c, dtype.get(c)) for c in batch),
+                                 cache=False, **kwargs)
+            except (RuntimeError, ValueError) as e:
+                if verbose:
+                    gprint('Something went wrong:', file=sys.stderr)
+                    warnings.warn(str(e), ndsio.NDSWarning)
+                return e
+
+        # use a dedicated pool, these threads spend their time waiting on
+        # the network, so shouldn't be limited by the number of CPUs
+        if concurrency > 1:
+            executor = parallel.ThreadExecutor(concurrency)
+        else:
+            executor = parallel.SerialExecutor()
+        data = {}
+        missing = []
+        tasks = [(list(channels), 0)] if hostlist else []
+        try:
+            while tasks:
+                pending = []
+                for (batch, i), result in zip(tasks,
+                                              executor.map(_fetch, tasks)):
+                    if not isinstance(result, Exception):
+                        for c in batch:
+                            data[c] = result[c]
+                    elif len(batch) > 1:  # split into smaller batches
+                        pending.extend(
+                            (batch[slice_], i) for slice_ in
+                            parallel.chunks(len(batch), max(concurrency, 2)))
+                    elif i + 1 < len(hostlist):  # try the next server
+                        pending.append((batch, i + 1))
+                    else:
+                        missing.extend(batch)
+                tasks = pending
+        finally:
+            executor.shutdown()
+
+        if missing or not hostlist:
+            e = "Cannot find all relevant data on any known server."
+            if not verbose:
+                e += (" Try again using the verbose=True keyword argument to "
+                      "see detailed failures.")
+            raise RuntimeError(e)
+        return cls((c, data[c]) for c in channels)
+
+    @classmethod
+    @with_cache
     def find(cls, channels, start, end, frametype=None,
              pad=None, dtype=None, nproc=1, verbose=False,
              allow_tape=True, observatory=None, **readargs):
@@ -907,17 +1146,55 @@ class TimeSeriesBaseDict(OrderedDict):
             print verbose output about NDS progress.
         allow_tape : `bool`, optional, default: `True`
             allow reading from frames on tape
+        cache : `~gwpy.cache.DataCache`, `str`, `bool`, optional
+            local cache of data to use, either a `~gwpy.cache.DataCache`,
+            or the path of a cache directory, by default the cache set by
+            :func:`gwpy.cache.enable` is used, if any, give `False` to
+            not use a cache
         **readargs
             any other keyword arguments to be passed to `.read()`
         """
         start = to_gps(start)
         end = to_gps(end)
+        out = cls()
+        for ft, clist, cache in cls._find_frames(
+                channels, start, end, frametype=frametype,
+                allow_tape=allow_tape, observatory=observatory,
+                verbose=verbose):
+            if verbose:
+                gprint("Reading data from %s frames..." % ft, end=' ')
+            # read data
+            readargs.setdefault('format', 'gwf')
+            out.append(cls.read(cache, clist, start=start, end=end, pad=pad,
+                                dtype=dtype, nproc=nproc, **readargs))
+            if verbose:
+                gprint("Done")
+        return out
+
+    @staticmethod
+    def _find_frames(channels, start, end, frametype=None, allow_tape=True,
+                     observatory=None, verbose=False):
+        """Find the frames containing data for a number of channels
+
+        Returns
+        -------
+        frames : `list` of `tuple`
+            ``(frametype, channels, cache)`` for each frametype required
+
+        Raises
+        ------
+        RuntimeError
+            if no frames are found for any of the required frametypes
+        """
+        # all queries go through one session, so each frametype is only
+        # searched, and each interval only queried, once
+        session = datafind.get_session()
         # -- find frametype(s)
         if frametype is None:
             frametypes = dict()
-            for c in channels:
-                ft = datafind.find_best_frametype(c, start, end,
-                                                  allow_tape=allow_tape)
+            best = session.find_best_frametypes(channels, start, end,
+                                                allow_tape=allow_tape)
+            for c, ft in best.iteritems():
                 try:
                     frametypes[ft].append(c)
                 except KeyError:
@@ -929,12 +1206,9 @@ class TimeSeriesBaseDict(OrderedDict):
                        % frametypes.keys()[0])
         else:
             frametypes = {frametype: channels}
-        # -- read data
-        out = cls()
+        # -- find frames
+        frames = []
         for ft, clist in frametypes.iteritems():
-            if verbose:
-                gprint("Reading data from %s frames..." % ft, end=' ')
-            # find frames
             channellist = ChannelList.from_names(*clist)
             if observatory is None:
                 try:
@@ -943,21 +1217,16 @@ class TimeSeriesBaseDict(OrderedDict):
                 except TypeError as e:
                     e.args = ("Cannot parse list of IFOs from channel names",)
                     raise
-            connection = datafind.connect()
-            cache = connection.find_frame_urls(observatory, ft, start, end,
-                                               urltype='file')
+            cache = session.find_frame_urls(observatory, ft, start, end,
+                                            urltype='file')
             if len(cache) == 0:
                 raise RuntimeError("No %s-%s frame files found for [%d, %d)"
                                    % (observatory, ft, start, end))
-            # read data
-            readargs.setdefault('format', 'gwf')
-            out.append(cls.read(cache, clist, start=start, end=end, pad=pad,
-                                dtype=dtype, nproc=nproc, **readargs))
-            if verbose:
-                gprint("Done")
-        return out
+            frames.append((ft, clist, cache))
+        return frames
 
     @classmethod
+    @with_cache
     def get(cls, channels, start, end, pad=None, dtype=None, verbose=False,
             allow_tape=False, **kwargs):
         """Retrieve data for multiple channels from frames or NDS
@@ -992,6 +1261,11 @@ class TimeSeriesBaseDict(OrderedDict):
             to attempt to allow the `TimeSeries.fetch` method to
             intelligently select a server that doesn't use tapes for
             data storage (doesn't always work)
+        cache : `~gwpy.cache.DataCache`, `str`, `bool`, optional
+            local cache of data to use, either a `~gwpy.cache.DataCache`,
+            or the path of a cache directory, by default the cache set by
+            :func:`gwpy.cache.enable` is used, if any, give `False` to
+            not use a cache
         **kwargs
             other keyword arguments to pass to either
             `TimeSeriesBaseDict.find` (for direct GWF file access) or
@@ -1011,7 +1285,7 @@ class TimeSeriesBaseDict(OrderedDict):
             try:
                 return cls.find(channels, start, end, pad=pad, dtype=dtype,
                                 verbose=verbose, allow_tape=allow_tape,
-                                **kwargs)
+                                cache=False, **kwargs)
             except (RuntimeError, ValueError) as e:
                 if verbose:
                     gprint(str(e), file=sys.stderr)
@@ -1022,7 +1296,7 @@ class TimeSeriesBaseDict(OrderedDict):
         kwargs.pop('observatory', None)
         try:
             return cls.fetch(channels, start, end, pad=pad, dtype=dtype,
-                             verbose=verbose, **kwargs)
+                             verbose=verbose, cache=False, **kwargs)
         except RuntimeError as e:
             # if all else fails, try and get each channel individually
             if len(channels) == 1:
@@ -1034,9 +1308,151 @@ class TimeSeriesBaseDict(OrderedDict):
                            "group, trying individually:")
                 return cls(
                     (c, cls.EntryClass.get(c, start, end, pad=pad, dtype=dtype,
-                                           verbose=verbose, **kwargs))
+                                           verbose=verbose, cache=False,
+                                           **kwargs))
                     for c in channels)
 
+    @classmethod
+    def iter_read(cls, source, channels, start, end, stride, overlap=0,
+                  prefetch=True, **kwargs):
+        """Read data for a number of channels in consecutive chunks
+
+        Parameters
+        ----------
+        source : `str`, `list`, `~glue.lal.Cache`
+            source of data, a single file path, a LAL-format cache file,
+            or a list or `~glue.lal.Cache` of files
+        channels : `list`
+            required data channels.
+        start : `~gwpy.time.Time`, or float
+            GPS start time of data span.
+        end : `~gwpy.time.Time`, or float
+            GPS end time of data span.
+        stride : `float`
+            duration (seconds) of each chunk
+        overlap : `float`, optional, default: ``0``
+            duration (seconds) by which to pad each chunk at both ends,
+            e.g. to allow for filter or FFT edge effects; the padding is
+            restricted to the ``[start, end)`` interval
+        prefetch : `bool`, optional, default: `True`
+            read the next chunk in a background thread while the current
+            chunk is being processed
+        **kwargs
+            other keyword arguments to pass to `~TimeSeriesDict.read`
+
+        Yields
+        ------
+        data : `TimeSeriesBaseDict`
+            the data for each chunk, the un-padded span of chunk ``i`` is
+            ``[start + i * stride, start + (i + 1) * stride)``
+
+        See Also
+        --------
+        TimeSeries.iter_read
+            for more details
+        """
+        start = float(to_gps(start))
+        end = float(to_gps(end))
+        source = parse_source(source)
+
+        def _read(segment):
+            return cls.read(sieve_source(source, segment), channels,
+                            start=segment[0], end=segment[1], **kwargs)
+
+        return iter_chunks(_read, chunk_segments(start, end, stride, overlap),
+                           prefetch=prefetch)
+
+    @classmethod
+    def iter_get(cls, channels, start, end, stride, overlap=0, prefetch=True,
+                 pad=None, dtype=None, verbose=False, allow_tape=False,
+                 **kwargs):
+        """Get data for multiple channels from frames or NDS in chunks
+
+        The frames for the full span are found once, then each chunk is
+        read from those frames that overlap it. If frames can't be found,
+        each chunk is fetched from NDS.
+
+        Parameters
+        ----------
+        channels : `list`
+            required data channels.
+        start : `~gwpy.time.Time`, or float
+            GPS start time of data span.
+        end : `~gwpy.time.Time`, or float
+            GPS end time of data span.
+        stride : `float`
+            duration (seconds) of each chunk
+        overlap : `float`, optional, default: ``0``
+            duration (seconds) by which to pad each chunk at both ends
+        prefetch : `bool`, optional, default: `True`
+            get the next chunk in a background thread while the current
+            chunk is being processed
+        pad : `float`, optional
+            value with which to fill gaps in the source data
+        dtype : `numpy.dtype`, `str`, `type`, or `dict`
+            numeric data type for returned data
+        verbose : `bool`, optional
+            print verbose output about data access.
+        allow_tape : `bool`, optional, default: `False`
+            allow the use of frames that are held on tape
+        **kwargs
+            other keyword arguments to pass to either `.read` (for
+            direct GWF file access) or `.fetch` for remote NDS2 access
+
+        Yields
+        ------
+        data : `TimeSeriesBaseDict`
+            the data for each chunk
+
+        See Also
+        --------
+        TimeSeriesBaseDict.get
+            for details of how the data source is chosen
+        """
+        start = to_gps(start)
+        end = to_gps(end)
+        segments = chunk_segments(start, end, stride, overlap)
+        frametype = kwargs.pop('frametype', None)
+        observatory = kwargs.pop('observatory', None)
+
+        # find frames for the full span once
+        frames = None
+        host = kwargs.get('host', None)
+        if os.getenv('LIGO_DATAFIND_SERVER') and not (
+                host is not None and host.startswith('nds')):
+            try:
+                frames = cls._find_frames(
+                    channels, start, end, frametype=frametype,
+                    allow_tape=allow_tape, observatory=observatory,
+                    verbose=verbose)
+            except (RuntimeError, ValueError) as e:
+                if verbose:
+                    gprint(str(e), file=sys.stderr)
+                    gprint("Failed to access data from frames, trying NDS...")
+
+        if frames is not None:
+            readargs = kwargs.copy()
+            readargs.setdefault('format', 'gwf')
+            for key in ('host', 'port', 'connection', 'verify', 'type'):
+                readargs.pop(key, None)
+
+            def _read(segment):
+                out = cls()
+                for _, clist, cache in frames:
+                    out.append(cls.read(
+                        sieve_source(cache, segment), clist,
+                        start=segment[0], end=segment[1], pad=pad,
+                        dtype=dtype, **readargs))
+                return out
+        else:
+            kwargs.pop('nproc', None)
+
+            def _read(segment):
+                return cls.fetch(channels, segment[0], segment[1], pad=pad,
+                                 dtype=dtype, verbose=verbose, **kwargs)
+
+        return iter_chunks(_read, segments, prefetch=prefetch)
+
     def plot(self, label='key', **kwargs):
         """Plot the data for this `TimeSeriesBaseDict`.
 
@@ -1126,26 +1542,21 @@ class TimeSeriesBaseList(list):
         This method implicitly sorts and potentially shortens the this list.
         """
         self.sort(key=lambda ts: ts.x0.value)
-        i = j = 0
-        N = len(self)
-        while j < N:
-            this = self[j]
-            j += 1
-            if j < N and this.is_contiguous(self[j]) == 1:
-                while j < N and this.is_contiguous(self[j]):
-                    try:
-                        this = self[i] = this.append(self[j])
-                    except ValueError as e:
-                        if 'cannot resize this array' in str(e):
-                            this = this.copy()
-                            this = self[i] = this.append(self[j])
-                        else:
-                            raise
-                    j += 1
+        # group runs of contiguous elements
+        groups = []
+        end = None
+        for ts in self:
+            span = ts.xspan
+            if groups:
+                groups[-1][0].is_compatible(ts)
+            if groups and abs(float(end - span[0])) < CONTIGUITY_TOLERANCE:
+                groups[-1].append(ts)
             else:
-                self[i] = this
-            i += 1
-        del self[i:]
+                groups.append([ts])
+            end = span[1]
+        # and join each run into a single new series
+        self[:] = [group[0] if len(group) == 1 else _join(group) for
+                   group in groups]
         return self
 
     def join(self, pad=0.0, gap='raise'):
@@ -1169,6 +1580,11 @@ class TimeSeriesBaseList(list):
              a single `TimeSeriesBase` covering the full span of all entries
              in this list
 
+        Notes
+        -----
+        The output array is allocated once, and each element copied into
+        place, so the cost of joining is linear in the total amount of data.
+
         See Also
         --------
         TimeSeriesBase.append
@@ -1177,7 +1593,81 @@ class TimeSeriesBaseList(list):
         if len(self) == 0:
             return self.EntryClass(numpy.empty((0,) * self.EntryClass._ndim))
         self.sort(key=lambda t: t.epoch.gps)
-        out = self[0].copy()
-        for ts in self[1:]:
-            out.append(ts, gap=gap, pad=pad)
-        return out
+        return _join(self, pad=pad, gap=gap)
+
+
+def _allocate_like(series, start, end):
+    """Allocate a new, empty series to hold data for ``[start, end)``
+
+    The new series has the same type, metadata, and sample rate as the
+    input.
+    """
+    rate = series.sample_rate.value
+    nsamp = int(round((end - start) * rate))
+    new = numpy.empty((nsamp,), dtype=series.dtype).view(type(series))
+    new.__dict__ = series.copy_metadata()
+    new.__dict__.pop('_xindex', None)
+    new.x0 = units.Quantity(start, series.xunit)
+    return new
+
+
+def _join(series, pad=0.0, gap='raise'):
+    """Concatenate a time-ordered list of series into a new series
+
+    The position of each input series (and any padding) in the output is
+    worked out first, so that the output can be allocated in one go and
+    each input copied into place exactly once.
+
+    See `TimeSeriesBaseList.join` for details of the arguments.
+    """
+    first = series[0]
+    x0 = first.xspan[0]
+    dx = first.dx.to(first._default_xunit).value
+    name = type(first).__name__
+
+    # lay out the output
+    layout = []
+    padding = []
+    size = 0
+    for i, ts in enumerate(series):
+        first.is_compatible(ts)
+        span = ts.xspan
+        end = x0 + size * dx
+        if i and abs(float(end - span[0])) >= CONTIGUITY_TOLERANCE:
+            if gap == 'pad':
+                ngap = int(numpy.floor((span[0] - end) / dx + 0.5))
+                if ngap < 1:
+                    raise ValueError(
+                        "Cannot append {0} that starts before this one:\n"
+                        "    {0} 1 span: {1}\n    {0} 2 span: {2}".format(
+                            name, (x0, end), span))
+                padding.append((size, ngap))
+                size += ngap
+            elif gap == 'warn':
+                warnings.warn("Appending discontiguous {0}, {1} to {2}, "
+                              "removing gap".format(name, (x0, end), span))
+            elif gap == 'ignore':
+                pass
+            elif x0 < span[0] < end:
+                raise ValueError(
+                    "Cannot append overlapping {0}s:\n"
+                    "    {0} 1 span: {1}\n    {0} 2 span: {2}".format(
+                        name, (x0, end), span))
+            else:
+                raise ValueError(
+                    "Cannot append discontiguous {0}\n"
+                    "    {0} 1 span: {1}\n    {0} 2 span: {2}".format(
+                        name, (x0, end), span))
+        layout.append((size, ts))
+        size += ts.shape[0]
+
+    # allocate the output and copy everything into place
+    out = numpy.empty((size,) + first.shape[1:],
+                      dtype=first.dtype).view(type(first))
+    out.__dict__ = first.copy_metadata()
+    out.__dict__.pop('_xindex', None)
+    for idx, ts in layout:
+        out.value[idx:idx+ts.shape[0]] = ts.value
+    for idx, ngap in padding:
+        out.value[idx:idx+ngap] = pad
+    return out
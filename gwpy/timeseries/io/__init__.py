@@ -40,5 +40,8 @@ from . import cache
 # register HDF5
 from . import hdf5
 
+# register HDF5 archive
+from . import archive
+
 # register LOSC
 from . import losc
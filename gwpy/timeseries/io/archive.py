@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Read and write an appendable HDF5 archive of time-series data
+
+Each channel is stored in its own HDF5 group, holding
+
+- ``data``: a resizable, chunked, compressed dataset containing all of the
+  samples for that channel, with no padding for gaps,
+- ``segments``: an ``(N, 3)`` index of ``(start, end, offset)`` rows, one
+  for each contiguous segment of data, giving the GPS ``[start, end)``
+  span of the segment and the index of its first sample in ``data``.
+
+New data are appended in place, extending the last segment if contiguous,
+and reads of a GPS interval only touch the chunks that contain it.
+"""
+
+import numpy
+
+from astropy.units import Quantity
+
+from ... import version
+from ...io.hdf5 import (open_hdf5, hyperslab)
+from ...io.registry import (register_reader, register_writer)
+from ...time import to_gps
+from ...utils.deps import with_import
+from .. import (TimeSeries, TimeSeriesDict, TimeSeriesList)
+from ..core import CONTIGUITY_TOLERANCE
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+FORMAT = 'hdf5-archive'
+
+#: default number of samples per HDF5 chunk
+CHUNK_SIZE = 16384
+
+
+# -- read ---------------------------------------------------------------------
+
+def read_timeseriesdict(source, channels=None, start=None, end=None,
+                        pad=None):
+    """Read a `TimeSeriesDict` from an HDF5 archive
+
+    Parameters
+    ----------
+    source : `str`, `h5py.Group`
+        path of the archive file, or an open `h5py.Group`
+    channels : `list`, optional
+        the names of the channels to read, defaults to all channels in
+        the archive
+    start : `~gwpy.time.LIGOTimeGPS`, `float`, `str`, optional
+        GPS start time of required data, defaults to the start of the
+        data for each channel
+    end : `~gwpy.time.LIGOTimeGPS`, `float`, `str`, optional
+        GPS end time of required data, defaults to the end of the
+        data for each channel
+    pad : `float`, optional
+        value with which to fill gaps in the archived data, by default
+        an exception is raised if the requested interval contains a gap
+
+    Returns
+    -------
+    data : `TimeSeriesDict`
+        the data for each channel
+    """
+    h5f = open_hdf5(source)
+    try:
+        if channels is None:
+            channels = list(h5f.keys())
+        elif isinstance(channels, (unicode, str)):
+            channels = channels.split(',')
+        out = TimeSeriesDict()
+        for channel in channels:
+            try:
+                group = h5f[str(channel)]
+            except KeyError:
+                raise ValueError("Channel %r not found in HDF5 archive"
+                                 % str(channel))
+            out[channel] = _read_group(group, start=start, end=end, pad=pad)
+    finally:
+        if h5f is not source:
+            h5f.close()
+    return out
+
+
+def read_timeseries(source, channel, **kwargs):
+    """Read a `TimeSeries` from an HDF5 archive
+
+    See Also
+    --------
+    read_timeseriesdict
+        for documentation of the keyword arguments
+    """
+    return read_timeseriesdict(source, [channel], **kwargs)[channel]
+
+
+def _read_group(group, start=None, end=None, pad=None):
+    """Read the data for a single channel from its archive group
+    """
+    dataset = group['data']
+    segments = group['segments'][()]
+    dx = float(group.attrs['dx'])
+    if start is not None:
+        start = float(to_gps(start))
+    if end is not None:
+        end = float(to_gps(end))
+    kwargs = {
+        'sample_rate': 1 / dx,
+        'unit': group.attrs.get('unit', None),
+        'name': group.attrs.get('name', None),
+        'channel': group.attrs.get('channel', None),
+    }
+
+    # read the overlapping part of each segment
+    pieces = TimeSeriesList()
+    for seg0, seg1, offset in segments:
+        if ((start is not None and seg1 <= start) or
+                (end is not None and seg0 >= end)):
+            continue
+        slice_ = hyperslab(int(round((seg1 - seg0) / dx)), seg0, dx,
+                           start=start, end=end)
+        if slice_.start == slice_.stop:
+            continue
+        offset = int(offset)
+        data = dataset[offset + slice_.start:offset + slice_.stop]
+        pieces.append(TimeSeries(data, epoch=seg0 + slice_.start * dx,
+                                 copy=False, **kwargs))
+
+    if not pieces:
+        return TimeSeries(numpy.empty((0,), dtype=dataset.dtype),
+                          epoch=start, **kwargs)
+    if pad is None:
+        return pieces.join(gap='raise')
+    return pieces.join(pad=pad, gap='pad')
+
+
+# -- write --------------------------------------------------------------------
+
+@with_import('h5py')
+def write_timeseriesdict(tsdict, output, compression='gzip', chunks=None,
+                         **kwargs):
+    """Write a `TimeSeriesDict` to an HDF5 archive
+
+    If the archive already contains data for a channel, the new data are
+    appended in place.
+
+    Parameters
+    ----------
+    tsdict : `TimeSeriesDict`
+        the data to write
+    output : `str`, `h5py.Group`
+        path of the archive file, or an open `h5py.Group`, the file is
+        created if it doesn't exist
+    compression : `str`, optional, default: ``'gzip'``
+        name of compression filter to use for new datasets
+    chunks : `int`, optional
+        number of samples per chunk for new datasets, defaults to
+        `CHUNK_SIZE`, or the size of the data, if smaller
+    **kwargs
+        other keyword arguments passed to
+        :meth:`h5py.Group.create_dataset` for new datasets
+
+    Raises
+    ------
+    ValueError
+        if the new data overlap those already in the archive, or have a
+        different sample rate
+    """
+    if isinstance(output, h5py.Group):
+        h5f = output
+    else:
+        h5f = h5py.File(output, 'a')
+    try:
+        for key, series in tsdict.iteritems():
+            name = key if key is not None else series.name
+            if name is None:
+                raise ValueError("Cannot store %s without a name. Either "
+                                 "assign the name attribute of the series, "
+                                 "or write a TimeSeriesDict"
+                                 % type(series).__name__)
+            name = str(name)
+            if name in h5f:
+                _append_group(h5f[name], series)
+            else:
+                _create_group(h5f, name, series, compression=compression,
+                              chunks=chunks, **kwargs)
+    finally:
+        if not isinstance(output, h5py.Group):
+            h5f.close()
+
+
+def write_timeseries(series, output, **kwargs):
+    """Write a `TimeSeries` to an HDF5 archive
+
+    See Also
+    --------
+    write_timeseriesdict
+        for documentation of the keyword arguments
+    """
+    return write_timeseriesdict({None: series}, output, **kwargs)
+
+
+def _create_group(h5f, name, series, compression='gzip', chunks=None,
+                  **kwargs):
+    """Create a new archive group for the given series
+    """
+    if chunks is None:
+        chunks = min(CHUNK_SIZE, max(series.size, 1))
+    group = h5f.create_group(name)
+    group.create_dataset('data', data=series.value, maxshape=(None,),
+                         chunks=(chunks,), compression=compression,
+                         **kwargs)
+    group.create_dataset('segments', shape=(0, 3), maxshape=(None, 3),
+                         chunks=(1024, 3), dtype='float64')
+    group.attrs['dx'] = series.dx.to('s').value
+    for attr in ('unit', 'name', 'channel'):
+        value = getattr(series, attr)
+        if attr == 'channel' and value is not None:
+            value = value.ndsname
+        if value is not None:
+            group.attrs[attr] = str(value)
+    _add_segment(group, series, 0)
+    return group
+
+
+def _append_group(group, series):
+    """Append the given series to an existing archive group
+    """
+    dx = float(group.attrs['dx'])
+    if abs(series.dx.to('s').value - dx) > dx * CONTIGUITY_TOLERANCE:
+        raise ValueError("Cannot append %s with sample rate %s to archive "
+                         "of %s with sample rate %s"
+                         % (series.name, series.sample_rate,
+                            group.name.lstrip('/'),
+                            Quantity(1 / dx, 'Hz')))
+    segments = group['segments']
+    if segments.shape[0]:
+        last = float(segments[-1, 1])
+        if series.span[0] < last - CONTIGUITY_TOLERANCE:
+            raise ValueError("Cannot append data starting at %s to archive "
+                             "of %s ending at %s"
+                             % (series.span[0], group.name.lstrip('/'),
+                                last))
+    dataset = group['data']
+    offset = dataset.shape[0]
+    dataset.resize((offset + series.size,))
+    dataset[offset:] = series.value
+    _add_segment(group, series, offset)
+
+
+def _add_segment(group, series, offset):
+    """Record the segment for some new data in the archive index
+
+    The last segment is extended if the new data are contiguous with it.
+    """
+    if not series.size:
+        return
+    seg0, seg1 = map(float, series.span)
+    segments = group['segments']
+    n = segments.shape[0]
+    if n and abs(seg0 - segments[-1, 1]) < CONTIGUITY_TOLERANCE:
+        segments[-1, 1] = seg1
+    else:
+        segments.resize((n + 1, 3))
+        segments[n] = (seg0, seg1, offset)
+
+
+# -- register -----------------------------------------------------------------
+
+register_reader(FORMAT, TimeSeriesDict, read_timeseriesdict)
+register_reader(FORMAT, TimeSeries, read_timeseries)
+register_writer(FORMAT, TimeSeriesDict, write_timeseriesdict)
+register_writer(FORMAT, TimeSeries, write_timeseries)
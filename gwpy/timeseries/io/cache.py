@@ -23,15 +23,14 @@ from __future__ import division
 
 import os
 import warnings
-from math import ceil
-from multiprocessing import (Process, Queue as ProcessQueue)
+from functools import partial
 
 from glue.lal import Cache
 
-from ...io import registry
+from ... import parallel
+from ...io import (registry, shm)
 from ...io.cache import (cache_segments, open_cache)
-from .. import (TimeSeries, TimeSeriesList, TimeSeriesDict,
-                StateVector, StateVectorList, StateVectorDict)
+from .. import (TimeSeries, TimeSeriesDict, StateVector, StateVectorDict)
 
 # set maximum number of channels with which to still use lalframe
 MAX_LALFRAME_CHANNELS = 4
@@ -162,78 +161,139 @@ def read_cache(cache, channel, start=None, end=None, resample=None,
 
     # -- process single cache segment
 
-    # force one frame per process minimum
-    nproc = min(nproc, len(cache))
+    executor = parallel.get_executor(nproc)
+    params = dict(cls=cls, channel=channel, format=format, start=start,
+                  end=end, resample=resample, cspan=cspan, kwargs=kwargs)
 
     # single-process
-    if nproc <= 1:
+    if min(executor.nworkers, len(cache)) <= 1 or isinstance(
+            executor, parallel.SerialExecutor):
         return cls.read(cache, channel, format=format, start=start, end=end,
                         resample=resample, **kwargs)
 
-    # define how to read each frame
-    def _read(q, pstart, pend):
-        try:
-            # don't go beyond the requested limits
-            pstart = float(max(start, pstart))
-            pend = float(min(end, pend))
-            # if resampling TimeSeries, pad by 8 seconds inside cache limits
-            if cls not in (StateVector, StateVectorDict) and resample:
-                cstart = float(max(cspan[0], pstart - 8))
-                subcache = cache.sieve(segment=Segment(cstart, pend))
-                out = cls.read(subcache, channel, format=format, start=cstart,
-                               end=pend, resample=None, **kwargs)
-                out = out.resample(resample)
-                q.put(out.crop(pstart, pend))
-            else:
-                subcache = cache.sieve(segment=Segment(pstart, pend))
-                q.put(cls.read(subcache, channel, format=format, start=pstart,
-                               end=pend, resample=resample, **kwargs))
-        except Exception as e:
-            q.put(e)
-
-    # separate cache into parts
-    fperproc = int(ceil(len(cache) / nproc))
-    subcaches = [Cache(cache[i:i+fperproc]) for
-                 i in range(0, len(cache), fperproc)]
-    subsegments = SegmentList([Segment(c[0].segment[0], c[-1].segment[1])
-                               for c in subcaches])
-
-    # start all processes
-    queue = ProcessQueue(nproc)
-    proclist = []
-    for subseg in subsegments:
-        process = Process(target=_read, args=(queue, subseg[0], subseg[1]))
-        process.daemon = True
-        proclist.append(process)
-        process.start()
-
-    # get data and block
-    data = [queue.get() for p in proclist]
-    for result in data:
-        process.join()
-        if isinstance(result, Exception):
-            raise result
-
-    # format and return
+    # read the first file here to get the sample rate and type of each
+    # output, these data are the first piece of the output
+    first = _read_chunk((Cache(cache[:1]), cache[0].segment[0],
+                         cache[0].segment[1]), **params)
+
+    # allocate a shared buffer big enough to hold all of the data
+    description = []
+    for key, template, shape, dtype in shm.describe(first):
+        size = int(round(float(end - start) * template.sample_rate.value))
+        description.append((key, template, (size,) + shape[1:], dtype))
+    nbytes, layout = shm.plan(description)
+    path, buffer_ = shm.allocate(nbytes)
+
+    # separate the rest of the cache into parts, and have each process
+    # write its part directly into the shared buffer
+    rest = cache[1:]
+    subcaches = [Cache(rest[chunk]) for
+                 chunk in parallel.chunks(len(rest), executor)]
+    tasks = [(subcache, subcache[0].segment[0], subcache[-1].segment[1])
+             for subcache in subcaches]
+    try:
+        pieces = [_write_shared(first, start, path, layout)]
+        pieces.extend(executor.map(
+            partial(_read_chunk, shared=(path, layout), **params), tasks))
+    finally:
+        shm.release(path)
+
+    # wrap the buffer as the output
+    data = shm.assemble(buffer_, layout)
+    for key in data:
+        data[key] = _format_output(data[key], [p[key] for p in pieces],
+                                   start, gap)
     if issubclass(cls, dict):
-        try:
-            data.sort(key=lambda tsd: tsd.values()[0].epoch.gps)
-        except IndexError:
-            pass
-        out = cls()
-        while len(data):
-            tsd = data.pop(0)
-            out.append(tsd)
-            del tsd
-        return out
+        return cls(data)
+    return data[None]
+
+
+def _read_chunk(task, cls, channel, format, start, end, resample, cspan,
+                kwargs, shared=None):
+    """Read the data for one chunk of a cache
+
+    Parameters
+    ----------
+    task : `tuple`
+        ``(cache, start, end)`` of data to read
+    shared : `tuple`, optional
+        ``(path, layout)`` of a shared buffer into which to write the data,
+        as created by `gwpy.io.shm.allocate` and `gwpy.io.shm.plan`
+
+    Returns
+    -------
+    data : `TimeSeries`, `TimeSeriesDict`, `dict`
+        if ``shared`` is not given, the data, otherwise a `dict` of
+        ``(key, (index, size))`` giving where the data for each key was
+        written in the buffer
+    """
+    from gwpy.segments import Segment
+    cache, pstart, pend = task
+    # don't go beyond the requested limits
+    pstart = float(max(start, pstart))
+    pend = float(min(end, pend))
+    # if resampling TimeSeries, pad by 8 seconds inside cache limits
+    if cls not in (StateVector, StateVectorDict) and resample:
+        cstart = float(max(cspan[0], pstart - 8))
+        subcache = cache.sieve(segment=Segment(cstart, pend))
+        out = cls.read(subcache, channel, format=format, start=cstart,
+                       end=pend, resample=None, **kwargs)
+        out = out.resample(resample).crop(pstart, pend)
     else:
-        if cls in (TimeSeries, TimeSeriesDict):
-            out = TimeSeriesList(*data)
-        else:
-            out = StateVectorList(*data)
-        out.sort(key=lambda ts: ts.epoch.gps)
-        ts = out.join(gap=gap)
-        return ts
+        subcache = cache.sieve(segment=Segment(pstart, pend))
+        out = cls.read(subcache, channel, format=format, start=pstart,
+                       end=pend, resample=resample, **kwargs)
+    if shared is None:
+        return out
+    return _write_shared(out, start, *shared)
+
+
+def _write_shared(data, start, path, layout):
+    """Write data into a shared buffer at the right place for its epoch
+
+    Returns
+    -------
+    index : `dict`
+        ``(key, (index, size))`` giving where the data for each key was
+        written in the buffer
+    """
+    index = {}
+    for key, template, shape, _ in shm.describe(data):
+        rate = layout[key][3].sample_rate.value
+        index[key] = int(round((template.x0.value - float(start)) * rate))
+    shm.write(data, path, layout, index)
+    return dict((key, (index[key], shape[0])) for
+                key, _, shape, _ in shm.describe(data))
+
+
+def _format_output(series, pieces, start, gap):
+    """Set the epoch of a shared-buffer output series and check for gaps
+
+    If the pieces of data written by each process don't join up, they are
+    shifted together (unless ``gap='raise'``), as if they had been appended.
+    """
+    rate = series.sample_rate.value
+    pieces = sorted(pieces)
+    # check that the data are contiguous
+    for (idx, size), (idx2, _) in zip(pieces[:-1], pieces[1:]):
+        if idx2 != idx + size:
+            name = type(series).__name__
+            msg = ("Cannot append discontiguous %s\n"
+                   "    %s 1 end: %s\n    %s 2 start: %s"
+                   % (name, name, float(start) + (idx + size) / rate, name,
+                      float(start) + idx2 / rate))
+            if gap == 'warn':
+                warnings.warn(msg)
+            elif gap != 'ignore':
+                raise ValueError(msg)
+    # shift the data together if needed
+    pos = 0
+    for idx, size in pieces:
+        if idx != pos:
+            series.value[pos:pos+size] = series.value[idx:idx+size]
+        pos += size
+    series.x0 = float(start) + pieces[0][0] / rate
+    return series[:pos]
 
 
 def read_state_cache(*args, **kwargs):
@@ -115,7 +115,7 @@ def register_gwf_io_library(library, package='gwpy.timeseries.io.gwf'):
         # use multiprocessing or padding
         nproc = kwargs.pop('nproc', 1)
         pad = kwargs.pop('pad', None)
-        if nproc > 1 or pad is not None:
+        if nproc != 1 or pad is not None:
             from ..cache import read_cache
             kwargs['target'] = TimeSeriesDict
             kwargs['nproc'] = nproc
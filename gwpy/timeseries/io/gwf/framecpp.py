@@ -21,14 +21,19 @@
 
 from __future__ import division
 import __builtin__
+import os
+import sqlite3
+from threading import local
 
 import numpy
 
 from .... import version
 from ....io.cache import (CacheEntry, file_list)
+from ....io.gwf_index import (get_index, read_toc)
 from ....time import LIGOTimeGPS
 from ....segments import Segment
 from ....utils import (gprint, with_import)
+from ....utils.compat import OrderedDict
 from ... import (TimeSeries, TimeSeriesDict)
 
 from . import channel_dict_kwarg
@@ -86,6 +91,12 @@ FRVECT_TYPE_FROM_NUMPY = dict(
     (v, k) for k, v in NUMPY_TYPE_FROM_FRVECT.items())
 
 
+#: number of open frame file streams to keep for re-use in each thread
+STREAM_CACHE_SIZE = 8
+
+_STREAMS = local()
+
+
 @with_import(DEPENDS)
 def read_timeseriesdict(source, channels, start=None, end=None, type=None,
                         dtype=None, resample=None, verbose=False,
@@ -155,7 +166,14 @@ def read_timeseriesdict(source, channels, start=None, end=None, type=None,
     if dtype is None:
         raise ValueError("Cannot parse `dtype` request, please review "
                          "documentation for that argument")
-    # read each individually and append
+    # work out how much data will be read, so that the output array for
+    # each channel can be allocated once, rather than grown for every frame
+    span = Segment(start is not None and start or -numpy.inf,
+                   end is not None and end or numpy.inf)
+    segments = [_frame_segments(fp) for fp in filelist]
+    duration = sum(abs(seg) for segs in segments for seg in segs if
+                   seg.intersects(span))
+    # read each file directly into the output
     N = len(filelist)
     if verbose:
         if not isinstance(verbose, (unicode, str)):
@@ -163,28 +181,36 @@ def read_timeseriesdict(source, channels, start=None, end=None, type=None,
         gprint("%sReading %d channels from frames... 0/%d (0.00%%)\r"
                % (verbose, len(channels), N), end='')
     out = TimeSeriesDict()
-    for i, fp in enumerate(filelist):
-        # read frame
-        new = _read_frame(fp, channels, start=start, end=end, ctype=type,
-                          dtype=dtype, _SeriesClass=_SeriesClass)
-        # get channel type for next frame (means we only query the TOC once)
-        if not i:
-            for channel, ts in new.iteritems():
-                type[channel] = ts.channel._ctype
-        # store
-        out.append(new, copy=False)
+    nsamp = {}
+    for i, (fp, segs) in enumerate(zip(filelist, segments)):
+        # read frame, unless it is known not to overlap the requested span
+        if not segs or any(seg.intersects(span) for seg in segs):
+            _read_frame(fp, channels, start=start, end=end, ctype=type,
+                        dtype=dtype, out=out, nsamp=nsamp,
+                        duration=duration or None,
+                        _SeriesClass=_SeriesClass)
+            # get channel type for next frame (so we only query the TOC once)
+            for channel, ts in out.iteritems():
+                type.setdefault(channel, ts.channel._ctype)
         if verbose is not False:
             gprint("%sReading %d channels from frames... %d/%d (%.1f%%)\r"
                    % (verbose, len(channels), i+1, N, (i+1)/N * 100), end='')
     if verbose is not False:
         gprint("%sReading %d channels from frames... %d/%d (100.0%%)"
                % (verbose, len(channels), N, N))
+    for channel in channels:
+        if channel not in out:
+            raise ValueError("Channel '%s' not found in any frame in the "
+                             "given source" % str(channel))
+        # discard unused allocation
+        if nsamp[channel] < out[channel].size:
+            out[channel] = out[channel][:nsamp[channel]]
+    # resample data, channels with the same rate are resampled together
+    if resample:
+        out.resample(resample)
     # finalise
     for channel, ts in out.iteritems():
         ts.channel.frametype = frametype
-        # resample data
-        if resample is not None and channel in resample:
-            out[channel] = out[channel].resample(resample[channel])
         # crop data
         if start is not None or end is not None:
             out[channel] = out[channel].crop(start=start, end=end)
@@ -193,8 +219,120 @@ def read_timeseriesdict(source, channels, start=None, end=None, type=None,
     return out
 
 
+def _frame_segments(framefile):
+    """Internal function to find the GPS segments covered by a frame file
+
+    The segment is parsed from the file name, if it follows the LIGO-T050017
+    convention, otherwise it is read from the `~gwpy.io.gwf_index`.
+
+    Parameters
+    ----------
+    framefile : `str`, :class:`~glue.lal.CacheEntry`
+        path to GWF-format frame file on disk.
+
+    Returns
+    -------
+    segments : `list` of `~gwpy.segments.Segment`
+        the GPS ``[start, end)`` segments of data in this file, or an
+        empty list if these cannot be determined
+    """
+    if isinstance(framefile, CacheEntry):
+        return [Segment(*map(float, framefile.segment))]
+    try:
+        entry = CacheEntry.from_T050017(framefile)
+    except ValueError:
+        pass
+    else:
+        return [Segment(*map(float, entry.segment))]
+    try:
+        return get_index().segments(framefile)
+    except (AttributeError, IOError, OSError, RuntimeError, TypeError,
+            sqlite3.Error):
+        return []
+
+
+def _read_toc(path):
+    """Internal function to find the frame epochs and channel types in a file
+
+    These are taken from the `~gwpy.io.gwf_index` where possible, otherwise
+    the table of contents of the file is read directly (e.g. if the file
+    cannot be stat'd, or the index database is locked).
+
+    Returns
+    -------
+    epochs : `list` of `float`
+        the GPS start time of each frame in the file
+    types : `dict`
+        ``(name, type)`` pairs for each channel in the file
+    """
+    try:
+        info = get_index().get(path)
+    except (OSError, sqlite3.Error):
+        epochs, _, channels = read_toc(path)
+        return epochs, dict((name, ctype) for (name, ctype, _) in channels)
+    return info.epochs, dict(
+        (name, chan.type) for (name, chan) in info.channels.items())
+
+
+def _open_stream(path):
+    """Open an `IFrameFStream` for the given file, re-using open streams
+
+    The most recently used streams are held open for each thread, so that
+    reading consecutive chunks of data from the same file (e.g. with
+    `TimeSeries.iter_read`) doesn't re-open the file and re-parse the
+    table of contents each time.
+    """
+    try:
+        streams = _STREAMS.streams
+    except AttributeError:
+        streams = _STREAMS.streams = OrderedDict()
+    try:
+        stat = os.stat(path)
+    except OSError:  # not a local file, let frameCPP handle it
+        return frameCPP.IFrameFStream(path)
+    key = (path, stat.st_mtime, stat.st_size)
+    try:
+        stream = streams.pop(key)
+    except KeyError:
+        # close streams for old versions of this file
+        for old in [k for k in streams if k[0] == path]:
+            _close_stream(streams.pop(old))
+        stream = frameCPP.IFrameFStream(path)
+        while len(streams) >= STREAM_CACHE_SIZE:
+            _close_stream(streams.popitem(last=False)[1])
+    streams[key] = stream
+    return stream
+
+
+def _close_stream(stream):
+    """Close an `IFrameFStream`, ignoring any errors
+
+    Not all versions of frameCPP allow closing a stream explicitly, in
+    which case the file is closed when the stream is deleted.
+    """
+    close = getattr(stream, 'Close', None)
+    if close is not None:
+        try:
+            close()
+        except Exception:
+            pass
+
+
+def close_streams():
+    """Close all frame file streams held open by the current thread
+
+    Streams are held open by `_open_stream` for re-use between reads,
+    call this to release the files once reading is finished.
+    """
+    streams = getattr(_STREAMS, 'streams', None)
+    _STREAMS.streams = OrderedDict()
+    for stream in (streams or {}).values():
+        _close_stream(stream)
+
+
 def _read_frame(framefile, channels, start=None, end=None, ctype=None,
-                dtype=None, _SeriesClass=TimeSeries):
+                dtype=None, out=None, nsamp=None, duration=None,
+                _SeriesClass=TimeSeries):
     """Internal function to read data from a single frame.
 
     All users should be using the wrapper `read_timeseriesdict`.
@@ -212,6 +350,18 @@ def _read_frame(framefile, channels, start=None, end=None, ctype=None,
     ctype : `str`, optional
         channel data type to read, one of: ``'adc'``, ``'proc'``.
     dtype : `numpy.dtype`, `str`, `type`, `dict`
+    out : `TimeSeriesDict`, optional
+        dict of series into which to decode the data for each channel,
+        new data are written into each series starting from the index
+        given by ``nsamp``, channels not in ``out`` are allocated with
+        enough space for ``duration`` seconds of data
+    nsamp : `dict`, optional
+        `dict` of (`channel`, `int`) pairs giving the number of samples
+        already written into each series in ``out``, this is updated
+        in-place
+    duration : `float`, optional
+        total duration (seconds) of data to allocate for each new series,
+        default is to allocate enough for all frames in this file
     _SeriesClass : `type`, optional
         class object to use as the data holder for a single channel,
         default is :class:`~gwpy.timeseries.TimeSeries`
@@ -219,10 +369,23 @@ def _read_frame(framefile, channels, start=None, end=None, ctype=None,
     Returns
     -------
     dict : :class:`~gwpy.timeseries.TimeSeriesDict`
-        dict of (channel, `TimeSeries`) data pairs
+        dict of (channel, `TimeSeries`) data pairs, if ``out`` was
+        given, this is the same object
+
+    Raises
+    ------
+    ValueError
+        if the data for a channel do not follow on from those already
+        in ``out``
     """
     if isinstance(channels, (unicode, str)):
         channels = channels.split(',')
+    if out is None:
+        out = TimeSeriesDict()
+    if nsamp is None:
+        nsamp = {}
+    if dtype is None:
+        dtype = {}
 
     # construct span segment
     span = Segment(start is not None and start or -numpy.inf,
@@ -233,7 +396,7 @@ def _read_frame(framefile, channels, start=None, end=None, ctype=None,
         fp = framefile.path
     else:
         fp = framefile
-    stream = frameCPP.IFrameFStream(fp)
+    stream = _open_stream(fp)
 
     # interpolate frame epochs from CacheEntry
     try:
@@ -245,39 +408,27 @@ def _read_frame(framefile, channels, start=None, end=None, ctype=None,
     else:
         epochs = None
 
-    # load table of contents if needed
+    # get table of contents from the index if needed
     if epochs is None or not ctype:
-        toc = stream.GetTOC()
+        toc_epochs, toc_types = _read_toc(fp)
     # get list of frame epochs
     if epochs is None:
-        epochs = toc.GTimeS
+        epochs = toc_epochs
     # work out channel types
     if not ctype:
-        try:
-            adcs = toc.GetADC().keys()
-        except AttributeError:
-            adcs = toc.GetADC()
-        try:
-            procs = toc.GetProc().keys()
-        except AttributeError:
-            procs = toc.GetProc()
         ctype = {}
         for channel in channels:
-            name = str(channel)
-            if name in adcs:
-                ctype[channel] = 'adc'
-            elif name in procs:
-                ctype[channel] = 'proc'
-            else:
+            try:
+                ctype[channel] = toc_types[str(channel)]
+            except KeyError:
                 raise ValueError("Channel %s not found in frame table of "
-                                 "contents" % name)
+                                 "contents" % str(channel))
 
-    # set output
-    out = TimeSeriesDict()
+    # decode data straight into the output arrays
     for channel in channels:
         name = str(channel)
         read_ = getattr(stream, 'ReadFr%sData' % ctype[channel].title())
-        ts = None
+        found = False
         i = 0
         dtype_ = dtype.get(channel, None)
         while True:
@@ -304,26 +455,49 @@ def _read_frame(framefile, channels, start=None, end=None, ctype=None,
                     arr = numpy.frombuffer(
                         arr, dtype=NUMPY_TYPE_FROM_FRVECT[vect.GetType()])
                 dx = vect.GetDim(0).dx
-                if ts is None:
-                    # create array
+                if channel not in out:
+                    # allocate the full array once
+                    if duration:
+                        size = int(round(duration / dx))
+                    else:
+                        size = arr.size * (nframe or 1)
                     unit = vect.GetUnitY() or None
-                    ts = numpy.require(
-                        _SeriesClass(arr, epoch=thisepoch, dx=dx, name=name,
-                                     channel=channel, unit=unit, dtype=dtype_,
-                                     copy=False), requirements=['O'])
+                    if dtype_ is None:
+                        dtype_ = arr.dtype
+                    ts = out[channel] = numpy.require(
+                        _SeriesClass(numpy.empty(max(size, arr.size),
+                                                 dtype=dtype_),
+                                     epoch=thisepoch, dx=dx, name=name,
+                                     channel=channel, unit=unit, copy=False),
+                        requirements=['O'])
                     if not ts.channel.dtype:
                         ts.channel.dtype = arr.dtype
                     ts.channel._ctype = ctype[channel]
-                elif arr.dtype != ts.dtype:
-                    ts.append(arr.astype(dtype_))
-                else:
-                    ts.append(arr)
+                    nsamp[channel] = 0
+                ts = out[channel]
+                idx = nsamp[channel]
+                # check that these data follow on from the last
+                expected = ts.x0.value + idx * ts.dx.value
+                if abs(thisepoch - expected) >= ts.dx.value / 2.:
+                    raise ValueError(
+                        "Cannot append discontiguous %s\n"
+                        "    %s 1 span: %s\n    %s 2 span: %s"
+                        % (type(ts).__name__, type(ts).__name__,
+                           Segment(ts.x0.value, expected),
+                           type(ts).__name__,
+                           Segment(thisepoch, thisepoch + arr.size * dx)))
+                # grow the output if the allocation was too small
+                if idx + arr.size > ts.size:
+                    ts.resize((max(idx + arr.size, 2 * ts.size),),
+                              refcheck=False)
+                ts.value[idx:idx+arr.size] = arr
+                nsamp[channel] = idx + arr.size
+                thisepoch += arr.size * dx
+                found = True
             i += 1
-        if ts is None:
+        if not found:
             raise ValueError("Channel '%s' not found in frame '%s'"
                              % (str(channel), fp))
-        else:
-            out[channel] = ts
 
     return out
 
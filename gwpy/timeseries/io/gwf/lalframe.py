@@ -124,7 +124,8 @@ def read_timeseriesdict(source, channels, start=None, end=None, dtype=None,
         ts.channel.frametype = frametype
         if channel in dtype:
             ts = ts.astype(dtype[channel])
-        if channel in resample:
-            ts = ts.resample(resample[channel])
         out[channel] = ts
+    # resample data, channels with the same rate are resampled together
+    if resample:
+        out.resample(resample)
     return out
@@ -29,11 +29,14 @@ from astropy.units import Quantity
 from .. import (StateVector, TimeSeries, TimeSeriesList)
 from ...utils.deps import with_import
 from ...io.cache import file_list
-from ...io.hdf5 import open_hdf5
+from ...io.hdf5 import (open_hdf5, hyperslab)
 from ...detector.units import parse_unit
+from ...segments import Segment
+from ...time import to_gps
 
 
-def read_losc_data(filename, channel, group=None, copy=False):
+def read_losc_data(filename, channel, group=None, start=None, end=None,
+                   copy=False):
     """Read a `TimeSeries` from a LOSC-format HDF file.
 
     Parameters
@@ -50,23 +53,31 @@ def read_losc_data(filename, channel, group=None, copy=False):
         start GPS time of desired data
     end : `Time`, `~gwpy.time.LIGOTimeGPS`, optional
         end GPS time of desired data
+    copy : `bool`, default: `False`
+        create a fresh-memory copy of the underlying array
 
     Returns
     -------
     data : :class`~gwpy.timeseries.TimeSeries`
         a new `TimeSeries` containing the data read from disk
+
+    Notes
+    -----
+    If ``start`` or ``end`` are given, only the samples within that span
+    are read from disk.
     """
     h5file = open_hdf5(filename)
     if group:
         channel = '%s/%s' % (group, channel)
     dataset = _find_dataset(h5file, channel)
-    # read data
-    nddata = dataset.value
     # read metadata
     xunit = parse_unit(dataset.attrs['Xunits'])
     epoch = dataset.attrs['Xstart']
     dt = Quantity(dataset.attrs['Xspacing'], xunit)
     unit = dataset.attrs['Yunits']
+    # read data
+    nddata, epoch = _read_hyperslab(dataset, epoch, dt.to('s').value,
+                                    start, end)
     # build and return
     return TimeSeries(nddata, epoch=epoch, sample_rate=(1/dt).to('Hertz'),
                       unit=unit, name=channel.rsplit('/', 1)[0], copy=copy)
@@ -97,21 +108,43 @@ def read_losc_data_cache(f, channel, start=None, end=None, resample=None,
         a new `TimeSeries` containing the data read from disk
     """
     files = file_list(f)
+    if target is TimeSeries:
+        read_ = read_losc_data
+    elif target is StateVector:
+        read_ = read_losc_state
+    else:
+        raise ValueError("Cannot read %s from LOSC data"
+                         % (target.__name__))
+    if start is not None:
+        start = to_gps(start)
+    if end is not None:
+        end = to_gps(end)
+    span = Segment(-float('inf') if start is None else float(start),
+                   float('inf') if end is None else float(end))
 
     out = None
     for fp in files:
-        if target is TimeSeries:
-            new = read_losc_data(fp, channel, group=group, copy=False)
-        elif target is StateVector:
-            new = read_losc_state(fp, channel, group=group, copy=False)
+        # skip files that don't overlap the requested span
+        try:
+            segment = CacheEntry.from_T050017(fp).segment
+        except ValueError:
+            pass
         else:
-            raise ValueError("Cannot read %s from LOSC data"
-                             % (target.__name__))
+            if not segment.intersects(span):
+                continue
+        new = read_(fp, channel, group=group, start=start, end=end,
+                    copy=False)
+        if not new.size:
+            continue
         if out is None:
             out = new.copy()
         else:
             out.append(new)
 
+    if out is None:
+        raise ValueError("No %s data found in [%s, %s)"
+                         % (channel, span[0], span[1]))
+
     if resample:
         out = out.resample(resample)
 
@@ -153,9 +186,7 @@ def read_losc_state(filename, channel, group=None, start=None, end=None,
     # find data
     dataset = _find_dataset(h5file, '%s/DQmask' % channel)
     maskset = _find_dataset(h5file, '%s/DQDescriptions' % channel)
-    # read data
-    nddata = dataset.value
-    bits = list(maskset.value)
+    bits = list(maskset[()])
     # read metadata
     try:
         epoch = dataset.attrs['Xstart']
@@ -173,6 +204,12 @@ def read_losc_state(filename, channel, group=None, start=None, end=None,
     else:
         xunit = parse_unit(dataset.attrs['Xunits'])
         dt = Quantity(dt, xunit)
+    # read data
+    if epoch is None:
+        nddata = dataset[()]
+    else:
+        nddata, epoch = _read_hyperslab(dataset, epoch, dt.to('s').value,
+                                        start, end)
     return StateVector(nddata, bits=bits, epoch=epoch, name='Data quality',
                        dx=dt, copy=copy)
 
@@ -205,6 +242,27 @@ def read_losc_state_cache(*args, **kwargs):
     return read_losc_data_cache(*args, **kwargs)
 
 
+def _read_hyperslab(dataset, epoch, dt, start, end):
+    """Read the samples of a LOSC dataset within the given GPS span
+
+    Returns
+    -------
+    data : `numpy.ndarray`
+        the data read from the dataset
+    epoch : `float`
+        the GPS time of the first sample read
+    """
+    if start is None and end is None:
+        return dataset[()], epoch
+    if start is not None:
+        start = float(to_gps(start))
+    if end is not None:
+        end = float(to_gps(end))
+    slice_ = hyperslab(dataset.shape[0], float(epoch), dt, start=start,
+                       end=end)
+    return dataset[slice_], epoch + slice_.start * dt
+
+
 @with_import('h5py')
 def _find_dataset(h5group, name):
     """Find the named :class:`h5py.Dataset` in an HDF file.
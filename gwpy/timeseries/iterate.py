@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Utilities for reading long spans of data in consecutive chunks
+
+These support the ``iter_read`` and ``iter_get`` methods of the
+`TimeSeries` and `TimeSeriesDict` classes, which yield one chunk of data
+at a time, so that spans of data much larger than the available memory
+can be analysed.
+"""
+
+import sys
+import threading
+from math import ceil
+
+from six import reraise
+from six.moves.queue import Queue
+
+from glue.lal import (Cache, CacheEntry)
+
+from ..io.cache import open_cache
+from ..segments import Segment
+from .. import version
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+_STOP = object()
+
+
+def chunk_segments(start, end, stride, overlap=0):
+    """Split a GPS interval into consecutive chunks
+
+    Parameters
+    ----------
+    start : `float`
+        GPS start time of the interval
+    end : `float`
+        GPS end time of the interval
+    stride : `float`
+        duration (seconds) of each chunk, the last chunk may be shorter
+    overlap : `float`, optional, default: ``0``
+        duration (seconds) by which to pad each chunk at both ends, the
+        padding is restricted to the ``[start, end)`` interval
+
+    Returns
+    -------
+    segments : `list` of `~gwpy.segments.Segment`
+        the padded segment for each chunk
+    """
+    start = float(start)
+    end = float(end)
+    if stride <= 0:
+        raise ValueError("Cannot split data into chunks with stride %r"
+                         % stride)
+    if overlap < 0:
+        raise ValueError("Cannot pad chunks by negative overlap %r"
+                         % overlap)
+    nchunk = int(ceil((end - start) / stride))
+    segments = []
+    for i in range(nchunk):
+        seg0 = start + i * stride
+        seg1 = min(seg0 + stride, end)
+        segments.append(Segment(max(seg0 - overlap, start),
+                                min(seg1 + overlap, end)))
+    return segments
+
+
+def parse_source(source):
+    """Parse a data source once, so that it can be sieved for each chunk
+
+    Parameters
+    ----------
+    source : `str`, `list`, `~glue.lal.Cache`
+        the data source, LAL-format cache files are read, and lists of
+        file paths following the LIGO-T050017 naming convention are
+        converted into a `~glue.lal.Cache`
+
+    Returns
+    -------
+    source : `~glue.lal.Cache`, or the input
+        a `~glue.lal.Cache` describing the source, if possible, otherwise
+        the input source
+    """
+    if isinstance(source, Cache):
+        return source
+    if isinstance(source, (unicode, str)):
+        if source.endswith(('.lcf', '.cache')):
+            return open_cache(source)
+        return source
+    try:
+        return Cache(e if isinstance(e, CacheEntry) else
+                     CacheEntry.from_T050017(e) for e in source)
+    except (TypeError, ValueError):
+        return source
+
+
+def sieve_source(source, segment):
+    """Restrict a data source to those files that overlap a segment
+
+    Sources that aren't a `~glue.lal.Cache` are returned as given.
+    """
+    if isinstance(source, Cache):
+        return source.sieve(segment=segment)
+    return source
+
+
+def _close_streams():
+    """Close any frame file streams held open by the current thread
+
+    The frameCPP reader is only consulted if it has already been imported,
+    otherwise there is nothing to close.
+    """
+    framecpp = sys.modules.get('%s.io.gwf.framecpp'
+                               % __name__.rsplit('.', 1)[0])
+    if framecpp is not None:
+        framecpp.close_streams()
+
+
+def iter_chunks(read, segments, prefetch=True):
+    """Call a function for each of a list of segments, yielding the results
+
+    Parameters
+    ----------
+    read : `callable`
+        the method to call with each segment as its only argument
+    segments : `list` of `~gwpy.segments.Segment`
+        the segments to read
+    prefetch : `bool`, optional, default: `True`
+        call ``read`` for the next segment in a background thread while
+        the caller works on the current result
+
+    Yields
+    ------
+    data
+        the output of ``read`` for each segment, in order
+
+    Notes
+    -----
+    With ``prefetch=True`` all calls to ``read`` happen in the same
+    background thread, so any per-thread state (e.g. open file handles)
+    is re-used from one chunk to the next. Any frame files held open for
+    re-use are closed when the iteration finishes.
+    """
+    if not prefetch:
+        try:
+            for segment in segments:
+                yield read(segment)
+        finally:
+            _close_streams()
+        return
+    segments = list(segments)
+    if not segments:
+        return
+    requests = Queue()
+    results = Queue()
+
+    def _worker():
+        try:
+            while True:
+                segment = requests.get()
+                if segment is _STOP:
+                    break
+                try:
+                    results.put((True, read(segment)))
+                except Exception:
+                    results.put((False, sys.exc_info()))
+        finally:
+            _close_streams()
+
+    thread = threading.Thread(target=_worker, name='gwpy-prefetch')
+    thread.daemon = True
+    thread.start()
+    try:
+        requests.put(segments[0])
+        for i in range(len(segments)):
+            ok, result = results.get()
+            # start reading the next chunk before handing over this one
+            if ok and i + 1 < len(segments):
+                requests.put(segments[i + 1])
+            if not ok:
+                reraise(*result)
+            yield result
+    finally:
+        requests.put(_STOP)
+        _close_streams()
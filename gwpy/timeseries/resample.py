@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Rational-factor polyphase resampling of time-series data
+
+Anti-aliasing FIR filters are designed once for each combination of
+``(up, down, numtaps, window)`` and stored in a size-bounded cache, so
+resampling many channels, or many segments of one channel, by the same
+factor does not repeat the filter design.
+"""
+
+from __future__ import division
+
+from fractions import Fraction
+
+import numpy
+from scipy import signal
+
+from ..utils.lru import (LRUCache, window_key)
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+__all__ = []
+
+FILTER_CACHE = LRUCache(maxsize=32)
+
+
+def rational_factors(sample_rate, rate, maxden=10000):
+    """Return the up- and down-sampling factors between two rates
+
+    Parameters
+    ----------
+    sample_rate : `float`
+        the input sampling rate
+    rate : `float`
+        the output sampling rate
+    maxden : `int`, optional, default: ``10000``
+        the largest acceptable factor
+
+    Returns
+    -------
+    up, down : `int`
+        the (coprime) up- and down-sampling factors, such that
+        ``rate = sample_rate * up / down``
+
+    Raises
+    ------
+    ValueError
+        if the ratio of the rates cannot be represented by factors
+        less than ``maxden``
+    """
+    ratio = rate / sample_rate
+    frac = Fraction(ratio).limit_denominator(maxden)
+    if not numpy.isclose(float(frac), ratio, rtol=1e-12, atol=0):
+        raise ValueError("Cannot resample from %s Hz to %s Hz with a "
+                         "rational factor" % (sample_rate, rate))
+    return frac.numerator, frac.denominator
+
+
+def _design_filter(up, down, numtaps, window):
+    if numtaps is None and up == 1:  # match scipy.signal.decimate
+        numtaps = 61
+    elif numtaps is None:
+        numtaps = 20 * max(up, down) + 1
+    elif not numtaps % 2:  # zero-phase filter needs an odd length
+        numtaps += 1
+    filt = signal.firwin(numtaps, 1. / max(up, down), window=window)
+    filt.flags.writeable = False
+    return filt
+
+
+def design_filter(up, down, numtaps=None, window='hamming'):
+    """Return the (cached) anti-aliasing filter for a resampling operation
+
+    Parameters
+    ----------
+    up : `int`
+        the up-sampling factor
+    down : `int`
+        the down-sampling factor
+    numtaps : `int`, optional
+        the length of the filter, defaults to ``61`` for integer
+        down-sampling (as for :func:`scipy.signal.decimate`), otherwise
+        ``20 * max(up, down) + 1``
+    window : `str`, `tuple`, optional, default: ``'hamming'``
+        the window to use in the filter design, see
+        :func:`scipy.signal.firwin`
+
+    Returns
+    -------
+    filter : `numpy.ndarray`
+        the FIR filter coefficients, this array is shared between
+        callers so is read-only
+    """
+    key = (int(up), int(down), numtaps, window_key(window))
+    return FILTER_CACHE.get(key, _design_filter, int(up), int(down),
+                            numtaps, window)
+
+
+def resample(data, sample_rate, rate, window='hamming', numtaps=None,
+             chunksize=None):
+    """Resample an array (along its last axis) by a rational factor
+
+    The data are up-sampled, filtered with a zero-phase FIR
+    filter, and down-sampled in a single polyphase operation
+    (:func:`scipy.signal.resample_poly`).
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        the input data, 1-D or 2-D (with one row per channel)
+    sample_rate : `float`
+        the sampling rate of the input data
+    rate : `float`
+        the desired output sampling rate
+    window : `str`, `tuple`, optional, default: ``'hamming'``
+        the window to use in the filter design
+    numtaps : `int`, optional
+        the length of the anti-aliasing filter, see `design_filter`
+        for the defaults
+    chunksize : `int`, optional
+        the number of input samples to process at once, by default all
+        data are processed in one go; the output is identical either way
+
+    Returns
+    -------
+    out : `numpy.ndarray`
+        the resampled data, with ``ceil(N * rate / sample_rate)`` samples
+        along the last axis
+    """
+    data = numpy.asarray(data)
+    up, down = rational_factors(sample_rate, rate)
+    if up == down:
+        return data.astype(float)
+    filt = design_filter(up, down, numtaps=numtaps, window=window)
+    size = data.shape[-1]
+    if not chunksize or chunksize >= size:
+        return _resample_poly(data, up, down, filt)
+
+    # process in chunks, each padded with enough real data either side
+    # to cover the length of the filter; chunk boundaries (and padding)
+    # are multiples of ``down`` so that output samples align
+    chunk = max(down, chunksize // down * down)
+    margin = down * int(numpy.ceil(((filt.size // 2) // up + 2) / down))
+    nout = -(-size * up // down)
+    out = numpy.empty(data.shape[:-1] + (nout,))
+    for i0 in range(0, size, chunk):
+        i1 = min(i0 + chunk, size)
+        a = max(0, i0 - margin)
+        b = min(size, i1 + margin)
+        new = _resample_poly(data[..., a:b], up, down, filt)
+        o0 = (i0 - a) * up // down
+        j0 = i0 * up // down
+        j1 = min(-(-i1 * up // down), nout)
+        out[..., j0:j1] = new[..., o0:o0 + j1 - j0]
+    return out
+
+
+def _resample_poly(data, up, down, filt):
+    # pass a copy, so that the cached filter is never modified
+    return signal.resample_poly(data, up, down, axis=-1,
+                                window=numpy.array(filt))
@@ -0,0 +1,466 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Fixed-duration circular buffers of time-series data
+
+These are designed for online monitoring, where a fixed amount of the
+most recent data is displayed or analysed, and new data arrive in short
+chunks. `TimeSeries.update` shifts all of the stored data to make room
+for each new chunk; a `RingTimeSeries` instead overwrites the oldest data
+in place, so each update only costs as much as the new data.
+"""
+
+from math import floor
+
+import numpy
+
+from astropy import units
+
+from .core import CONTIGUITY_TOLERANCE
+from .timeseries import (TimeSeries, TimeSeriesDict)
+from ..utils.compat import OrderedDict
+from .. import version
+
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+__all__ = ['RingTimeSeries', 'RingTimeSeriesDict']
+
+
+class RingTimeSeries(object):
+    """A fixed-duration circular buffer of `TimeSeries` data
+
+    Parameters
+    ----------
+    duration : `float`, `~astropy.units.Quantity`
+        the duration (seconds) of data to hold
+    sample_rate : `float`, `~astropy.units.Quantity`, optional
+        the rate of samples per second (Hertz), defaults to the rate of
+        the first data passed to `~RingTimeSeries.update`
+    dtype : `numpy.dtype`, optional
+        the data type of the buffer, defaults to that of the first data
+        passed to `~RingTimeSeries.update`
+    unit : `~astropy.units.Unit`, optional
+        physical unit of the data, defaults to that of the first data
+    name : `str`, optional
+        descriptive title for the data, defaults to that of the first data
+    channel : `~gwpy.detector.Channel`, `str`, optional
+        source data stream for the data, defaults to that of the first data
+
+    Notes
+    -----
+    The data are stored in a single array, with the oldest sample at
+    position `~RingTimeSeries.head`. Each call to `~RingTimeSeries.update`
+    writes the new data after the newest sample, overwriting the oldest
+    data once the buffer is full.
+
+    The data are returned in time order by `~RingTimeSeries.to_timeseries`,
+    which is a view of the buffer unless the stored data wrap around the
+    end of the buffer. The `~RingTimeSeries.psd`,
+    `~RingTimeSeries.spectrogram`, and `~RingTimeSeries.plot` methods all
+    operate on this `TimeSeries`.
+
+    Examples
+    --------
+    To hold the most recent 10 minutes of data from an online stream:
+
+    >>> from gwpy.timeseries import RingTimeSeries
+    >>> ring = RingTimeSeries(600)
+    >>> for buffer_ in stream:
+    ...     ring.update(buffer_)
+    ...     plot = ring.plot()
+    """
+    EntryClass = TimeSeries
+
+    def __init__(self, duration, sample_rate=None, dtype=None, unit=None,
+                 name=None, channel=None):
+        if isinstance(duration, units.Quantity):
+            duration = duration.to('s').value
+        self.duration = float(duration)
+        if isinstance(sample_rate, units.Quantity):
+            sample_rate = sample_rate.to('Hz').value
+        self._sample_rate = sample_rate
+        self._dtype = dtype
+        self.unit = unit
+        self.name = name
+        self.channel = channel
+        self._data = None
+        self.head = 0
+        self.size = 0
+        self._end = None
+
+    def __repr__(self):
+        return '<%s(duration=%s, sample_rate=%s, name=%r, span=%s)>' % (
+            type(self).__name__, self.duration, self._sample_rate, self.name,
+            self.span)
+
+    def __len__(self):
+        return self.size
+
+    # -- properties -------------------------
+
+    @property
+    def sample_rate(self):
+        """Data rate for this buffer in samples per second (Hertz)
+
+        :type: `~astropy.units.Quantity` scalar
+        """
+        if self._sample_rate is None:
+            return None
+        return units.Quantity(self._sample_rate, 'Hz')
+
+    @property
+    def dt(self):
+        """Time between samples for this buffer
+
+        :type: `~astropy.units.Quantity` scalar
+        """
+        if self._sample_rate is None:
+            return None
+        return units.Quantity(1 / self._sample_rate, 's')
+
+    @property
+    def capacity(self):
+        """Number of samples this buffer can hold
+
+        :type: `int`
+        """
+        if self._sample_rate is None:
+            return None
+        return int(round(self.duration * self._sample_rate))
+
+    @property
+    def dtype(self):
+        """Data type of this buffer
+        """
+        if self._data is None:
+            return self._dtype and numpy.dtype(self._dtype)
+        return self._data.dtype
+
+    @property
+    def span(self):
+        """GPS [start, stop) segment of the data held in this buffer
+
+        :type: `~gwpy.segments.Segment`
+        """
+        from ..segments import Segment
+        if self._end is None:
+            return None
+        return Segment(self._end - self.size / self._sample_rate, self._end)
+
+    @property
+    def x0(self):
+        """GPS time of the oldest sample in this buffer
+
+        :type: `~astropy.units.Quantity` scalar
+        """
+        if self._end is None:
+            return None
+        return units.Quantity(self.span[0], 's')
+
+    @property
+    def is_wrapped(self):
+        """`True` if the stored data wrap around the end of the buffer
+
+        If not, `~RingTimeSeries.to_timeseries` returns a view of the
+        buffer without copying.
+        """
+        return self._data is not None and (
+            self.head + self.size > self._data.shape[0])
+
+    # -- update -----------------------------
+
+    def _allocate(self, data):
+        if self._sample_rate is None:
+            self._sample_rate = data.sample_rate.to('Hz').value
+        if self._dtype is None:
+            self._dtype = data.dtype
+        for attr in ('unit', 'name', 'channel'):
+            if getattr(self, attr) is None:
+                setattr(self, attr, getattr(data, attr, None))
+        if not self.capacity:
+            raise ValueError("Cannot allocate %s with %r seconds at %r Hz, "
+                             "buffer would be empty" % (
+                                 type(self).__name__, self.duration,
+                                 self._sample_rate))
+        self._data = numpy.empty(self.capacity, dtype=self._dtype)
+
+    def _check_compatible(self, data):
+        if not numpy.isclose(data.sample_rate.to('Hz').value,
+                             self._sample_rate):
+            raise ValueError("%s sample rates do not match: %s vs %s."
+                             % (type(self).__name__, self.sample_rate,
+                                data.sample_rate))
+        unit = self.unit
+        if unit is not None and data.unit is not None and (
+                units.Unit(unit) != data.unit):
+            raise ValueError("%s units do not match: %s vs %s."
+                             % (type(self).__name__, unit, data.unit))
+
+    def _write(self, values, n=None):
+        """Write new samples after the newest sample in the buffer
+
+        This overwrites the oldest samples, if needed.
+
+        Parameters
+        ----------
+        values : `numpy.ndarray`, `float`
+            the new samples, or a single value to write ``n`` times
+        n : `int`, optional
+            the number of times to write ``values``, if it is a single value
+        """
+        buffer_ = self._data
+        capacity = buffer_.shape[0]
+        scalar = n is not None
+        if not scalar:
+            n = values.shape[0]
+        if n >= capacity:
+            buffer_[:] = values if scalar else values[-capacity:]
+            self.head = 0
+            self.size = capacity
+            return
+        tail = (self.head + self.size) % capacity
+        first = min(n, capacity - tail)
+        if scalar:
+            buffer_[tail:tail+first] = values
+            buffer_[:n-first] = values
+        else:
+            buffer_[tail:tail+first] = values[:first]
+            buffer_[:n-first] = values[first:]
+        overflow = self.size + n - capacity
+        if overflow > 0:
+            self.head = (self.head + overflow) % capacity
+            self.size = capacity
+        else:
+            self.size += n
+
+    def update(self, other, gap='raise', pad=0.0):
+        """Add new data to this buffer, discarding the oldest data if full
+
+        This costs only as much as the size of ``other``, regardless of
+        the duration of this buffer.
+
+        Parameters
+        ----------
+        other : `TimeSeries`
+            the new data, should start where the data held in this buffer
+            end
+        gap : `str`, optional, default: ``'raise'``
+            action to perform if there's a gap between the end of this
+            buffer and the start of ``other``. One of
+
+                - ``'raise'`` - raise an `Exception`
+                - ``'ignore'`` - remove gap and join data
+                - ``'pad'`` - pad gap with ``pad``
+
+        pad : `float`, optional, default: ``0.0``
+            value with which to pad gaps
+
+        Returns
+        -------
+        self : `RingTimeSeries`
+            this buffer, updated with the new data
+
+        Raises
+        ------
+        ValueError
+            if ``other`` is not compatible with, or contiguous with, this
+            buffer
+        """
+        if self._data is None:
+            self._allocate(other)
+        self._check_compatible(other)
+        start = other.span[0]
+        if self._end is not None and (
+                abs(float(start - self._end)) >= CONTIGUITY_TOLERANCE):
+            if gap == 'pad':
+                ngap = int(floor((start - self._end) *
+                                 self._sample_rate + 0.5))
+                if ngap < 1:
+                    raise ValueError(
+                        "Cannot update %s with data that start before the "
+                        "end of the buffer: %s vs %s"
+                        % (type(self).__name__, start, self._end))
+                self._write(pad, n=ngap)
+            elif gap != 'ignore':
+                raise ValueError(
+                    "Cannot update %s with discontiguous data: buffer ends "
+                    "at %s, new data start at %s"
+                    % (type(self).__name__, self._end, start))
+        self._write(numpy.asarray(other.value))
+        self._end = float(start + other.shape[0] / self._sample_rate)
+        return self
+
+    def clear(self):
+        """Remove all data from this buffer
+        """
+        self.head = 0
+        self.size = 0
+        self._end = None
+
+    # -- output -----------------------------
+
+    @property
+    def value(self):
+        """The data held in this buffer, in time order
+
+        This is a view of the buffer if the data don't wrap around the
+        end of the buffer, otherwise a new array.
+
+        :type: `numpy.ndarray`
+        """
+        if self._data is None:
+            return numpy.empty(0, dtype=self.dtype)
+        if self.is_wrapped:
+            return numpy.concatenate((self._data[self.head:],
+                                      self._data[:self.head + self.size -
+                                                 self._data.shape[0]]))
+        return self._data[self.head:self.head+self.size]
+
+    def to_timeseries(self, copy=False):
+        """Return the data held in this buffer as a `TimeSeries`
+
+        Parameters
+        ----------
+        copy : `bool`, optional, default: `False`
+            always copy the data to new memory, otherwise the output is
+            a view of the buffer when the data don't wrap around its end
+
+        Returns
+        -------
+        timeseries : `TimeSeries`
+            the data held in this buffer, in time order
+
+        Notes
+        -----
+        A view of the buffer will be overwritten by subsequent calls to
+        `~RingTimeSeries.update`, use ``copy=True`` if the output
+        needs to outlive the next update.
+        """
+        value = self.value
+        if copy and not self.is_wrapped:
+            value = value.copy()
+        if self._end is None:
+            epoch = None
+        else:
+            epoch = self.span[0]
+        return self.EntryClass(value, unit=self.unit, name=self.name,
+                               channel=self.channel, epoch=epoch,
+                               sample_rate=self._sample_rate, copy=False)
+
+    def psd(self, *args, **kwargs):
+        """Calculate the PSD of the data held in this buffer
+
+        See `TimeSeries.psd` for details.
+        """
+        return self.to_timeseries().psd(*args, **kwargs)
+
+    def asd(self, *args, **kwargs):
+        """Calculate the ASD of the data held in this buffer
+
+        See `TimeSeries.asd` for details.
+        """
+        return self.to_timeseries().asd(*args, **kwargs)
+
+    def spectrogram(self, *args, **kwargs):
+        """Calculate a `Spectrogram` of the data held in this buffer
+
+        See `TimeSeries.spectrogram` for details.
+        """
+        return self.to_timeseries().spectrogram(*args, **kwargs)
+
+    def plot(self, **kwargs):
+        """Plot the data held in this buffer
+
+        See `TimeSeries.plot` for details.
+        """
+        return self.to_timeseries().plot(**kwargs)
+
+
+class RingTimeSeriesDict(OrderedDict):
+    """An ordered key-value mapping of named `RingTimeSeries`
+
+    Parameters
+    ----------
+    duration : `float`, `~astropy.units.Quantity`
+        the duration (seconds) of data to hold for each entry
+    gap : `str`, optional, default: ``'raise'``
+        default action to perform on gaps, see `RingTimeSeries.update`
+    pad : `float`, optional, default: ``0.0``
+        default value with which to pad gaps
+
+    Notes
+    -----
+    A new `RingTimeSeries` is created for each key the first time data
+    are given for that key by `~RingTimeSeriesDict.update`.
+    """
+    EntryClass = RingTimeSeries
+
+    def __init__(self, duration, gap='raise', pad=0.0):
+        super(RingTimeSeriesDict, self).__init__()
+        self.duration = duration
+        self.gap = gap
+        self.pad = pad
+
+    def update(self, other, gap=None, pad=None):
+        """Add new data to each buffer in this dict
+
+        Parameters
+        ----------
+        other : `dict` of `TimeSeries`
+            the new data for each key, e.g. a `TimeSeriesDict`
+        gap : `str`, optional
+            action to perform on gaps, defaults to the value given when
+            this dict was created
+        pad : `float`, optional
+            value with which to pad gaps, defaults to the value given when
+            this dict was created
+
+        Returns
+        -------
+        self : `RingTimeSeriesDict`
+            this dict, updated with the new data
+        """
+        if gap is None:
+            gap = self.gap
+        if pad is None:
+            pad = self.pad
+        for key, ts in other.items():
+            try:
+                ring = self[key]
+            except KeyError:
+                ring = self[key] = self.EntryClass(self.duration)
+            ring.update(ts, gap=gap, pad=pad)
+        return self
+
+    def to_timeseriesdict(self, copy=False):
+        """Return the data held in each buffer as a `TimeSeriesDict`
+
+        See `RingTimeSeries.to_timeseries` for details.
+        """
+        out = TimeSeriesDict()
+        for key, ring in self.items():
+            out[key] = ring.to_timeseries(copy=copy)
+        return out
+
+    def plot(self, **kwargs):
+        """Plot the data held in this dict
+
+        See `TimeSeriesDict.plot` for details.
+        """
+        return self.to_timeseriesdict().plot(**kwargs)
@@ -32,7 +32,6 @@ import sys
 
 import numpy
 
-from glue.segmentsUtils import from_bitstream
 from astropy.units import Quantity
 
 from .core import (TimeSeriesBase, TimeSeriesBaseDict, TimeSeriesBaseList,
@@ -128,10 +127,9 @@ class StateTimeSeries(TimeSeriesBase):
         from ..segments import (Segment, SegmentList, DataQualityFlag)
         start = self.x0.value
         dt = self.dx.value
-        active = from_bitstream(self.value, start, dt, minlen=int(minlen))
-        if dtype is not float:
-            active = active.__class__([Segment(dtype(s[0]), dtype(s[1])) for
-                                       s in active])
+        active = SegmentList(
+            Segment(dtype(start + i * dt), dtype(start + j * dt)) for
+            i, j in _true_blocks(self.value, minlen=int(minlen)))
         known = SegmentList([self.span])
         out = DataQualityFlag(name=name or self.name, active=active,
                               known=known, label=label or self.name,
@@ -352,11 +350,7 @@ class StateVector(TimeSeriesBase):
         try:
             return self._boolean
         except AttributeError:
-            nbits = len(self.bits)
-            boolean = numpy.zeros((self.size, nbits), dtype=bool)
-            for i, d in enumerate(self.value):
-                boolean[i, :] = [int(d) >> j & 1 for
-                                 j in range(nbits)]
+            boolean = _unpack_bits(self.value, len(self.bits))
             self._boolean = ArrayTimeSeries(boolean, name=self.name,
                                             epoch=self.epoch,
                                             sample_rate=self.sample_rate,
@@ -387,10 +381,14 @@ class StateVector(TimeSeriesBase):
             except IndexError as e:
                 e.args = ('Bit %r not found in StateVector' % b)
                 raise e
+        # unpack all required bits in one go
+        if bindex:
+            unpacked = _unpack_bits(self.value,
+                                    max(i for i, _ in bindex) + 1)
         self._bitseries = StateTimeSeriesDict()
         for i, bit in bindex:
             self._bitseries[bit] = StateTimeSeries(
-                self.value >> i & 1, name=bit, epoch=self.x0.value,
+                unpacked[:, i], name=bit, epoch=self.x0.value,
                 channel=self.channel, sample_rate=self.sample_rate)
         return self._bitseries
 
@@ -484,7 +482,7 @@ class StateVector(TimeSeriesBase):
         from ..segments import DataQualityDict
         out = DataQualityDict()
         bitseries = self.get_bit_series(bits=bits)
-        for bit, sts in bitseries.iteritems():
+        for bit, sts in bitseries.items():
             out[bit] = sts.to_dqflag(name=bit, minlen=minlen, round=round,
                                      dtype=dtype,
                                      description=self.bits.description[bit])
@@ -589,8 +587,8 @@ class StateVector(TimeSeriesBase):
         # downsample
         elif (rate1 / rate2).is_integer():
             factor = int(rate1 / rate2)
-            # reshape incoming data to one column per new sample
-            newsize = self.size / factor
+            # reshape incoming data to one row per new sample
+            newsize = self.size // factor
             old = self.value.reshape((newsize, self.size // newsize))
             # work out number of bits
             if len(self.bits):
@@ -598,21 +596,16 @@ class StateVector(TimeSeriesBase):
             else:
                 max = self.value.max()
                 nbits = max != 0 and int(ceil(log(self.value.max(), 2))) or 1
-            bits = range(nbits)
-            # construct an iterator over the columns of the old array
-            it = numpy.nditer([old, None],
-                              flags=['external_loop', 'reduce_ok'],
-                              op_axes=[None, [0, -1]],
-                              op_flags=[['readonly'],
-                                        ['readwrite', 'allocate']])
-            dtype = self.dtype
-            type_ = self.dtype.type
-            # for each new sample, each bit is logical AND of old samples
-            # bit is ON,
-            for x, y in it:
-                y[...] = numpy.sum([type_((x >> bit & 1).all() * (2 ** bit))
-                                    for bit in bits], dtype=self.dtype)
-            new = StateVector(it.operands[1], dtype=dtype)
+            # for each new sample, each bit is ON if that bit is ON in all
+            # of the old samples, i.e. the bitwise AND of the whole row
+            # (numpy.bitwise_and.reduce has the wrong identity before
+            # numpy 1.12, so AND the columns one at a time)
+            data = old[:, 0].copy()
+            for i in range(1, old.shape[1]):
+                data &= old[:, i]
+            if nbits < self.itemsize * 8:
+                data &= self.dtype.type((1 << nbits) - 1)
+            new = StateVector(data)
             new.__dict__ = self.copy_metadata()
             new.sample_rate = rate2
             return new
@@ -698,3 +691,67 @@ class StateVectorDict(TimeSeriesBaseDict):
 
 class StateVectorList(TimeSeriesBaseList):
     EntryClass = StateVector
+
+
+# -- utilities ----------------------------------------------------------------
+
+def _unpack_bits(data, nbits):
+    """Unpack the lowest ``nbits`` bits of each element of an array
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        1-D array of integers, other types are truncated to integers
+
+    nbits : `int`
+        the number of bits to unpack
+
+    Returns
+    -------
+    bits : `numpy.ndarray`
+        2-D boolean array of shape ``(data.size, nbits)``, with column
+        ``j`` holding bit ``j`` (counting from the least significant)
+        of each element
+    """
+    data = numpy.asarray(data)
+    if data.dtype.kind not in 'ui':
+        data = data.astype('int64')
+    size = data.size
+    itemsize = data.dtype.itemsize
+    # view as little-endian bytes, unpack each, then reverse the bits in
+    # each byte to count up from the least significant bit
+    bytes_ = numpy.ascontiguousarray(
+        data, dtype=data.dtype.newbyteorder('<')).view(numpy.uint8)
+    bits = numpy.unpackbits(bytes_.reshape((size, itemsize)), axis=1)
+    bits = bits.reshape((size, itemsize, 8))[:, :, ::-1].reshape(
+        (size, itemsize * 8)).view(bool)
+    if nbits <= itemsize * 8:
+        return bits[:, :nbits]
+    out = numpy.zeros((size, nbits), dtype=bool)
+    out[:, :itemsize * 8] = bits
+    return out
+
+
+def _true_blocks(data, minlen=1):
+    """Find the contiguous blocks of `True` in a boolean array
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        1-D boolean array
+
+    minlen : `int`, optional, default: 1
+        minimum length of block to return
+
+    Returns
+    -------
+    blocks : `list` of `tuple`
+        list of ``(start, end)`` index pairs, with the ``end`` index
+        being exclusive
+    """
+    edges = numpy.diff(numpy.concatenate(
+        ([0], numpy.asarray(data, dtype=bool).astype(numpy.int8), [0])))
+    starts = numpy.nonzero(edges == 1)[0]
+    ends = numpy.nonzero(edges == -1)[0]
+    keep = (ends - starts) >= minlen
+    return list(zip(starts[keep].tolist(), ends[keep].tolist()))
@@ -23,7 +23,7 @@ from __future__ import (division, print_function)
 
 from warnings import warn
 from math import (ceil, pi)
-from multiprocessing import (Process, Queue as ProcessQueue)
+from functools import partial
 
 import numpy
 from numpy import fft as npfft
@@ -42,7 +42,8 @@ else:
                             nds2.channel.CHANNEL_TYPE_STATIC)
 
 
-from .. import version
+from .. import (version, parallel)
+from ..fft import rfft
 from ..io import (reader, writer)
 from ..utils import with_import
 from ..utils.docstring import interpolate_docstring
@@ -50,6 +51,7 @@ from ..utils.compat import OrderedDict
 from .core import (TimeSeriesBase, TimeSeriesBaseDict, TimeSeriesBaseList,
                    as_series_dict_class)
 from .filter import create_notch
+from .resample import resample as _resample_array
 
 __author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
 __version__ = version.version
@@ -141,7 +143,7 @@ class TimeSeries(TimeSeriesBase):
 
         Notes
         -----
-        This method, in constrast to the :meth:`numpy.fft.rfft` method
+        This method, in constrast to the :func:`gwpy.fft.rfft` method
         it calls, applies the necessary normalisation such that the
         amplitude of the output :class:`~gwpy.spectrum.Spectrum` is
         correct.
@@ -149,7 +151,7 @@ class TimeSeries(TimeSeriesBase):
         from ..spectrum import Spectrum
         if nfft is None:
             nfft = self.size
-        dft = npfft.rfft(self.value, n=nfft) / nfft
+        dft = rfft(self.value, n=nfft) / nfft
         dft[1:] *= 2.0
         new = Spectrum(dft, epoch=self.epoch, channel=self.channel,
                        unit=self.unit)
@@ -189,7 +191,8 @@ class TimeSeries(TimeSeriesBase):
         :mod:`scipy.fftpack` for the definition of the DFT and conventions
         used.
         """
-        from gwpy.spectrogram import Spectrogram
+        from ..spectrum import Spectrum
+        from ..spectrum.batch import (format_window, fft_segments)
         # format lengths
         if fftlength is None:
             fftlength = self.duration
@@ -198,46 +201,18 @@ class TimeSeries(TimeSeriesBase):
         nfft = int((fftlength * self.sample_rate).decompose().value)
         noverlap = int((overlap * self.sample_rate).decompose().value)
 
-        navg = divmod(self.size-noverlap, (nfft-noverlap))[0]
-
         # format window
-        if window is None:
-            window = 'boxcar'
-        if isinstance(window, str) or type(window) is tuple:
-            win = signal.get_window(window, nfft)
-        else:
-            win = numpy.asarray(window)
-            if len(win.shape) != 1:
-                raise ValueError('window must be 1-D')
-            elif win.shape[0] != nfft:
-                raise ValueError('Window is the wrong size.')
-        win = win.astype(self.dtype)
+        win = format_window(window, nfft, dtype=self.dtype)
         scaling = 1. / numpy.absolute(win).mean()
 
-        if nfft % 2:
-            nfreqs = (nfft + 1) // 2
-        else:
-            nfreqs = nfft // 2 + 1
-        ffts = Spectrogram(numpy.zeros((navg, nfreqs), dtype=numpy.complex),
-                           channel=self.channel, epoch=self.epoch, f0=0,
-                           df=1 / fftlength, dt=1, copy=True)
-        # stride through TimeSeries, recording FFTs as columns of Spectrogram
-        idx = 0
-        for i in range(navg):
-            # find step TimeSeries
-            idx_end = idx + nfft
-            if idx_end > self.size:
-                continue
-            stepseries = self[idx:idx_end].detrend() * win
-            # calculated FFT, weight, and stack
-            fft_ = stepseries.fft(nfft=nfft) * scaling
-            ffts.value[i, :] = fft_.value
-            idx += (nfft - noverlap)
-        mean = ffts.mean(0)
-        mean.name = self.name
-        mean.epoch = self.epoch
-        mean.channel = self.channel
-        return mean
+        # calculate FFTs of all segments in one go, and average
+        ffts = fft_segments(self.value, nfft, noverlap=noverlap,
+                            window=win, detrend='constant')
+        mean = ffts.mean(axis=0) * (scaling / nfft)
+        mean[1:] *= 2.0
+        return Spectrum(mean, unit=self.unit, name=self.name,
+                        epoch=self.epoch, channel=self.channel,
+                        f0=0, df=1 / fftlength, copy=False)
 
     def psd(self, fftlength=None, overlap=None, method='welch', **kwargs):
         """Calculate the PSD `Spectrum` for this `TimeSeries`.
@@ -373,7 +348,7 @@ class TimeSeries(TimeSeriesBase):
         plan : :lal:`REAL8FFTPlan`, optional
             LAL FFT plan to use when generating average spectrum,
             substitute type 'REAL8' as appropriate.
-        nproc : `int`, default: ``1``
+        nproc : `int`, `~gwpy.parallel.Executor`, default: ``1``
             maximum number of independent frame reading processes, default
             is set to single-process file reading.
         cross : :class:`~gwpy.timeseries.core.TimeSeries`
@@ -388,9 +363,11 @@ class TimeSeries(TimeSeriesBase):
             time-frequency power spectrogram as generated from the
             input time-series.
         """
-        from ..spectrum.utils import (safe_import, scale_timeseries_units)
+        from ..spectrum.utils import safe_import
         from ..spectrum.registry import get_method
-        from ..spectrogram import (Spectrogram, SpectrogramList)
+        from ..spectrum.scipy_ import (welch, bartlett)
+        from ..spectrum.cache import get_window
+        from ..spectrogram import SpectrogramList
 
         # format FFT parameters
         if fftlength is None:
@@ -414,7 +391,8 @@ class TimeSeries(TimeSeriesBase):
         nsamp = int((stride * self.sample_rate).decompose().value)
         nfft = int((fftlength * self.sample_rate).decompose().value)
         nsteps = int(self.size // nsamp)
-        nproc = min(nsteps, nproc)
+        if not isinstance(nproc, parallel.Executor):
+            nproc = min(nsteps, nproc)
 
         # generate window and plan if needed
         method_func = get_method(method)
@@ -430,94 +408,35 @@ class TimeSeries(TimeSeriesBase):
             if window is None:
                 window = 'hanning'
             if isinstance(window, str) or type(window) is tuple:
-                window = signal.get_window(window, nfft)
+                window = get_window(window, nfft)
             kwargs['window'] = window
 
-        # set up single process Spectrogram generation
-        def _from_timeseries(ts, cts):
-            """Generate a `Spectrogram` from a `TimeSeries`.
-            """
-            # calculate specgram parameters
-            dt = stride
-            df = 1 / fftlength
-
-            # get size of spectrogram
-            nsteps_ = int(ts.size // nsamp)
-            nfreqs = int(fftlength * ts.sample_rate.value // 2 + 1)
-
-            # generate output spectrogram
-            unit = scale_timeseries_units(
-                ts.unit, kwargs.get('scaling', 'density'))
-            dtype = numpy.float64 if cts is None else complex
-            out = Spectrogram(numpy.zeros((nsteps_, nfreqs)), dtype=dtype,
-                              unit=unit, channel=ts.channel, epoch=ts.epoch,
-                              f0=0, df=df, dt=dt, copy=False)
-
-            if not nsteps_:
-                return out
-
-            # stride through TimeSeries, calculating PSDs or CSDs
-            if cts is not None and method not in (None, 'welch'):
-                warn("Cannot calculate cross spectral density using "
-                     "the %r method. Using 'welch' instead..." % method)
-            for step in range(nsteps_):
-                # find step TimeSeries
-                idx = nsamp * step
-                idx_end = idx + nsamp
-                stepseries = ts[idx:idx_end]
-                if cts is None:
-                    stepsd = stepseries.psd(fftlength=fftlength,
-                                            overlap=overlap,
-                                            method=method, **kwargs)
-                else:
-                    otherstepseries = cts[idx:idx_end]
-                    stepsd = stepseries.csd(otherstepseries,
-                                            fftlength=fftlength,
-                                            overlap=overlap, **kwargs)
-                out.value[step, :] = stepsd.value
-            return out
+        # scipy Welch-style PSDs can be calculated for all strides in
+        # one pass, rather than calling TimeSeries.psd for each stride
+        batched = (method_func in (welch, bartlett) and
+                   set(kwargs) <= set(['window', 'detrend', 'scaling']))
+        if method_func is bartlett:
+            noverlap = 0
+        else:
+            noverlap = int((overlap * self.sample_rate).decompose().value)
+
+        # set up Spectrogram generation for each chunk of data
+        chunkspec = partial(
+            _spectrogram, stride=stride, fftlength=fftlength,
+            overlap=overlap, method=method, nsamp=nsamp, nfft=nfft,
+            noverlap=noverlap, batched=batched, kwargs=kwargs)
 
         # single-process return
-        if nsteps == 0 or nproc == 1:
-            return _from_timeseries(self, cross)
+        executor = parallel.get_executor(nproc)
+        if nsteps == 0 or executor.nworkers == 1:
+            return chunkspec((self, cross))
 
-        # wrap spectrogram generator
-        def _specgram(q, ts, cts):
-            try:
-                q.put(_from_timeseries(ts, cts))
-            except Exception as e:
-                q.put(e)
-
-        # otherwise build process list
-        stepperproc = int(ceil(nsteps / nproc))
-        nsampperproc = stepperproc * nsamp
-        queue = ProcessQueue(nproc)
-        processlist = []
-        for i in range(nproc):
-            tsamp = self[i * nsampperproc:
-                         (i + 1) * nsampperproc]
-            csamp = (None if cross is None else
-                     cross[i * nsampperproc:
-                           (i + 1) * nsampperproc])
-            process = Process(target=_specgram,
-                              args=(queue, tsamp, csamp))
-            process.daemon = True
-            processlist.append(process)
-            process.start()
-            if ((i + 1) * nsampperproc) >= self.size:
-                break
-
-        # get data
-        data = []
-        for process in processlist:
-            result = queue.get()
-            if isinstance(result, Exception):
-                raise result
-            else:
-                data.append(result)
-        # and block
-        for process in processlist:
-            process.join()
+        # otherwise split into several chunks per process
+        tasks = []
+        for chunk in parallel.chunks(nsteps, executor):
+            idx = slice(chunk.start * nsamp, chunk.stop * nsamp)
+            tasks.append((self[idx], None if cross is None else cross[idx]))
+        data = executor.map(chunkspec, tasks)
 
         # format and return
         out = SpectrogramList(*data)
@@ -569,6 +488,8 @@ class TimeSeries(TimeSeriesBase):
         """
         from ..spectrogram import Spectrogram
         from ..spectrum import scale_timeseries_units
+        from ..spectrum.cache import get_window
+        from ..spectrum.batch import periodograms
         # get parameters
         sampling = units.Quantity(self.sample_rate, 'Hz').value
         if isinstance(fftlength, units.Quantity):
@@ -603,18 +524,24 @@ class TimeSeries(TimeSeriesBase):
         if window is None:
             window = 'boxcar'
         if isinstance(window, (str, tuple)):
-            window = signal.get_window(window, nfft)
+            window = get_window(window, nfft)
 
         # calculate overlapping periodograms
-        for i in xrange(nsteps):
-            idx = i * nstride
-            # don't proceed past end of data, causes artefacts
-            if idx+nfft > self.size:
-                break
-            ts = self.value[idx:idx+nfft]
-            tmp[i, :] = signal.periodogram(ts, fs=sampling, window=window,
-                                           nfft=nfft, scaling=scaling,
-                                           **kwargs)[1]
+        if set(kwargs) <= set(['detrend']):
+            psds = periodograms(self.value, nfft, noverlap=noverlap,
+                                window=window, sample_rate=sampling,
+                                scaling=scaling, **kwargs)
+            tmp[:psds.shape[0]] = psds
+        else:
+            for i in xrange(nsteps):
+                idx = i * nstride
+                # don't proceed past end of data, causes artefacts
+                if idx+nfft > self.size:
+                    break
+                ts = self.value[idx:idx+nfft]
+                tmp[i, :] = signal.periodogram(ts, fs=sampling, window=window,
+                                               nfft=nfft, scaling=scaling,
+                                               **kwargs)[1]
         # normalize for over-dense grid
         density = nfft//nstride
         weights = signal.triang(density)
@@ -649,33 +576,21 @@ class TimeSeries(TimeSeriesBase):
             a Fourier-gram
         """
         from ..spectrogram import Spectrogram
+        from ..spectrum.batch import fft_segments
 
         fftlength = stride
         dt = stride
         df = 1/fftlength
-        stride *= self.sample_rate.value
-        # get size of Spectrogram
-        nsteps = int(self.size // stride)
-        # get number of frequencies
-        nfreqs = int(fftlength*self.sample_rate.value)
-
-        # generate output spectrogram
-        dtype = numpy.complex
-        out = Spectrogram(numpy.zeros((nsteps, nfreqs), dtype=dtype),
-                          name=self.name, epoch=self.epoch, f0=0, df=df,
-                          dt=dt, copy=False, unit=self.unit, dtype=dtype)
-        # stride through TimeSeries, recording FFTs as columns of Spectrogram
-        for step in range(nsteps):
-            # find step TimeSeries
-            idx = stride * step
-            idx_end = idx + stride
-            stepseries = self[idx:idx_end]
-            # calculated FFT and stack
-            stepfft = stepseries.fft()
-            out[step] = stepfft.value
-            if step == 0:
-                out.frequencies = stepfft.frequencies
-        return out
+        nfft = int(stride * self.sample_rate.value)
+
+        # calculate FFTs of all strides in one go, normalised as
+        # for TimeSeries.fft
+        ffts = fft_segments(self.value, nfft)
+        ffts /= nfft
+        ffts[:, 1:] *= 2.0
+        return Spectrogram(ffts, name=self.name, epoch=self.epoch, f0=0,
+                           df=df, dt=dt, copy=False, unit=self.unit,
+                           channel=self.channel)
 
     def spectral_variance(self, stride, fftlength=None, overlap=None,
                           method='welch', window=None, nproc=1,
@@ -1000,20 +915,26 @@ class TimeSeries(TimeSeriesBase):
         # apply filter
         return self.filter(*zpk)
 
-    def resample(self, rate, window='hamming', numtaps=61):
+    def resample(self, rate, window='hamming', numtaps=None, chunksize=None):
         """Resample this Series to a new rate
 
+        The resampling is performed by a rational-factor polyphase FIR
+        filter, see :func:`scipy.signal.resample_poly`.
+
         Parameters
         ----------
         rate : `float`
             rate to which to resample this `Series`
-        window : array_like, callable, string, float, or tuple, optional
-            specifies the window applied to the signal in the Fourier
-            domain.
-        numtaps : `int`, default: ``61``
+        window : `str`, `tuple`, optional, default: ``'hamming'``
+            window to use when designing the anti-aliasing FIR filter,
+            see :func:`scipy.signal.firwin`
+        numtaps : `int`, optional
             length of the filter (number of coefficients, i.e. the filter
-            order + 1). This option is only valid for an integer-scale
-            downsampling.
+            order + 1), defaults to ``61`` for integer-scale
+            downsampling, otherwise ``20 * max(up, down) + 1``
+        chunksize : `int`, optional
+            number of input samples to resample at once, to limit memory
+            usage for long series; the result is the same regardless
 
         Returns
         -------
@@ -1023,17 +944,9 @@ class TimeSeries(TimeSeriesBase):
         """
         if isinstance(rate, units.Quantity):
             rate = rate.value
-        factor = (self.sample_rate.value / rate)
-        # if integer down-sampling, use decimate
-        if factor.is_integer():
-            factor = int(factor)
-            new = signal.decimate(self.value, factor, numtaps-1,
-                                  ftype='fir').view(self.__class__)
-        # otherwise use Fourier filtering
-        else:
-            nsamp = int(self.shape[0] * self.dx.value * rate)
-            new = signal.resample(self.value, nsamp,
-                                  window=window).view(self.__class__)
+        new = _resample_array(self.value, self.sample_rate.value, rate,
+                              window=window, numtaps=numtaps,
+                              chunksize=chunksize).view(self.__class__)
         new.__dict__ = self.copy_metadata()
         new.sample_rate = rate
         return new
@@ -1192,7 +1105,7 @@ class TimeSeries(TimeSeriesBase):
         return new
 
     def coherence(self, other, fftlength=None, overlap=None,
-                  window=None, **kwargs):
+                  window=None, detrend=None, pad_to=None, **kwargs):
         """Calculate the frequency-coherence between this `TimeSeries`
         and another.
 
@@ -1205,14 +1118,22 @@ class TimeSeries(TimeSeriesBase):
         overlap : `float`, optional, default: `None`
             number of seconds of overlap between FFTs, defaults to no
             overlap
-        window : `timeseries.window.Window`, optional, default: `HanningWindow`
+        window : `str`, `numpy.ndarray`, optional
             window function to apply to timeseries prior to FFT,
-            default HanningWindow of the relevant size
+            default is a (symmetric) Hann window of the relevant size
+        detrend : `str`, `callable`, optional
+            type of detrending to apply to each segment, see
+            :func:`scipy.signal.detrend` for options, or a function to
+            apply to each segment, as for :func:`matplotlib.mlab.cohere`;
+            default is to not detrend
+        pad_to : `int`, optional
+            number of points to which each FFT segment is zero-padded,
+            increasing the frequency resolution of the output, defaults
+            to the number of samples in ``fftlength``
         **kwargs
-            any other keyword arguments accepted by
-            :func:`matplotlib.mlab.cohere` except ``NFFT``, ``window``,
-            and ``noverlap`` which are superceded by the above keyword
-            arguments
+            the :func:`matplotlib.mlab.cohere` keyword arguments
+            ``sides`` and ``scale_by_freq`` are accepted, but ignored,
+            and will be removed in a future release
 
         Returns
         -------
@@ -1225,13 +1146,27 @@ class TimeSeries(TimeSeriesBase):
         :attr:`TimeSeries.sample_rate` values, the higher sampled
         `TimeSeries` will be down-sampled to match the lower.
 
+        The auto- and cross-spectral densities are calculated from a single
+        set of segment FFTs for each input, the result is the same as that
+        of :func:`matplotlib.mlab.cohere`.
+
         See Also
         --------
-        :func:`matplotlib.mlab.cohere`
+        gwpy.spectrum.batch.coherence_spectrogram
             for details of the coherence calculator
         """
-        from matplotlib import mlab
         from ..spectrum import Spectrum
+        from ..spectrum.batch import coherence_spectrogram
+        for key in ('sides', 'scale_by_freq'):
+            if key in kwargs:
+                kwargs.pop(key)
+                warn("The %r keyword argument to TimeSeries.coherence is "
+                     "ignored, the one-sided coherence is always returned, "
+                     "and it will be removed in the near future." % key,
+                     DeprecationWarning)
+        if kwargs:
+            raise TypeError("coherence() got an unexpected keyword "
+                            "argument %r" % list(kwargs)[0])
         # check sampling rates
         if self.sample_rate.to('Hertz') != other.sample_rate.to('Hertz'):
             sampling = min(self.sample_rate.value, other.sample_rate.value)
@@ -1253,15 +1188,19 @@ class TimeSeries(TimeSeriesBase):
             fftlength = int(self_.size/2. + overlap/2.)
         else:
             fftlength = int((fftlength * self_.sample_rate).decompose().value)
-        if window is not None:
-            kwargs['window'] = window
-        coh, f = mlab.cohere(self_.value, other.value, NFFT=fftlength,
-                             Fs=sampling, noverlap=overlap, **kwargs)
-        out = coh.view(Spectrum)
-        out.xindex = f
-        out.epoch = self.epoch
-        out.name = 'Coherence between %s and %s' % (self.name, other.name)
-        out.unit = 'coherence'
+        # zero-pad short data to a single FFT
+        x = self_.value
+        y = other.value
+        if x.size < fftlength:
+            x = numpy.pad(x, (0, fftlength - x.size), mode='constant')
+            y = numpy.pad(y, (0, fftlength - y.size), mode='constant')
+        coh = coherence_spectrogram(x, y, x.size, fftlength, noverlap=overlap,
+                                    window=window, detrend=detrend,
+                                    pad_to=pad_to)[0]
+        out = Spectrum(coh, f0=0, df=sampling/(pad_to or fftlength),
+                       epoch=self.epoch, unit='coherence', copy=False,
+                       name='Coherence between %s and %s'
+                            % (self.name, other.name))
         return out
 
     def auto_coherence(self, dt, fftlength=None, overlap=None,
@@ -1283,14 +1222,12 @@ class TimeSeries(TimeSeriesBase):
         overlap : `int`, optiona, default: fftlength
             number of seconds of overlap between FFTs, defaults to no
             overlap
-        window : `timeseries.window.Window`, optional, default: `HanningWindow`
+        window : `str`, `numpy.ndarray`, optional
             window function to apply to timeseries prior to FFT,
-            default HanningWindow of the relevant size
+            default is a (symmetric) Hann window of the relevant size
         **kwargs
             any other keyword arguments accepted by
-            :func:`matplotlib.mlab.cohere` except ``NFFT``, ``window``,
-            and ``noverlap`` which are superceded by the above keyword
-            arguments
+            :meth:`TimeSeries.coherence`
 
         Returns
         -------
@@ -1304,7 +1241,7 @@ class TimeSeries(TimeSeriesBase):
 
         See Also
         --------
-        :func:`matplotlib.mlab.cohere`
+        TimeSeries.coherence
             for details of the coherence calculator
         """
         # shifting self backwards is the same as forwards
@@ -1412,38 +1349,24 @@ class TimeSeries(TimeSeriesBase):
         --------
         TimeSeries.asd
             for details on the ASD calculation
-        numpy.fft
-            for details on the Fourier transform algorithm used her
+        Whitener
+            for whitening many series, or a stream of data, against
+            a single ASD
+        gwpy.fft
+            for details on the Fourier transform algorithm used here
         scipy.signal
         """
+        from .whiten import Whitener
+        # format window
+        if type(window).__module__ == 'lal.lal':
+            window = window.data.data
         # build whitener
         if asd is None:
             asd = self.asd(fftlength, overlap=overlap,
                            method=method, window=window, **kwargs)
-        if isinstance(asd, units.Quantity):
-            asd = asd.value
-        invasd = 1. / asd
-        # build window
-        nfft = int((fftlength * self.sample_rate).decompose().value)
-        noverlap = int((overlap * self.sample_rate).decompose().value)
-        # format window
-        if type(window).__module__ == 'lal.lal':
-            window = window.data.data
-        elif not isinstance(window, numpy.ndarray):
-            window = signal.get_window(window, nfft)
-        # create output series
-        nstride = nfft - noverlap
-        nsteps = 1 + int((self.size - nfft) / nstride)
-        out = type(self)(numpy.zeros(nsteps * nstride + noverlap))
-        out.__dict__ = self.copy_metadata()
-        del out.times
-        # loop over ffts and whiten each one
-        for i in range(nsteps):
-             i0 = i * nstride
-             i1 = i0 + nfft
-             in_ = self[i0:i1].detrend(detrend) * window
-             out[i0:i1] += npfft.irfft(in_.fft().value * invasd)
-        return out
+        whitener = Whitener(asd, self.sample_rate, fftlength, overlap=overlap,
+                            window=window, detrend=detrend)
+        return whitener.whiten(self)
 
     def detrend(self, detrend='constant'):
         """Remove the trend from this `TimeSeries`
@@ -1513,8 +1436,373 @@ class TimeSeriesDict(TimeSeriesBaseDict):
     EntryClass = TimeSeries
     read = classmethod(reader(doc=TimeSeriesBaseDict.read.__doc__))
 
+    def resample(self, rate, **kwargs):
+        """Resample items in this dict.
+
+        This operation over-writes items inplace. `TimeSeries` with the
+        same sampling rate, size, and type that are being resampled to
+        the same rate are processed together as a single 2-D array.
+
+        Parameters
+        ----------
+        rate : `dict`, `float`
+            either a `dict` of (channel, `float`) pairs for key-wise
+            resampling, or a single float/int to resample all items.
+        kwargs
+             other keyword arguments to pass to each item's resampling
+             method.
+
+        See Also
+        --------
+        TimeSeries.resample
+            for details of the resampling method
+        """
+        if not isinstance(rate, dict):
+            rate = dict((c, rate) for c in self)
+        # group series that can be resampled together
+        groups = OrderedDict()
+        for key in self:
+            if key not in rate:
+                continue
+            ts = self[key]
+            newrate = rate[key]
+            if isinstance(newrate, units.Quantity):
+                newrate = newrate.to('Hz').value
+            if not isinstance(ts, TimeSeries):  # e.g. StateVector
+                self[key] = ts.resample(newrate, **kwargs)
+                continue
+            group = (ts.sample_rate.to('Hz').value, float(newrate), ts.size,
+                     ts.dtype.str)
+            groups.setdefault(group, []).append(key)
+        # resample each group in one go
+        for (inrate, newrate, _, _), keys in groups.items():
+            data = _resample_array(
+                numpy.vstack([self[key].value for key in keys]),
+                inrate, newrate, **kwargs)
+            for key, row in zip(keys, data):
+                old = self[key]
+                new = row.view(old.__class__)
+                new.__dict__ = old.copy_metadata()
+                new.sample_rate = newrate
+                self[key] = new
+        return self
+
+    def coherence(self, target, fftlength=None, overlap=None, window=None,
+                  detrend=None, nproc=1, asarray=False):
+        """Calculate the coherence of a target with every other channel
+
+        The target is resampled and Fourier transformed only once for
+        each distinct sampling rate, and all other channels at a given
+        rate are resampled together, and transformed as a batch with a
+        single FFT call (per block of channels if the data are large).
+
+        Parameters
+        ----------
+        target : `str`, `TimeSeries`
+            the key of the target channel in this dict, or a separate
+            `TimeSeries`, which must cover the same span as the entries
+            in this dict
+        fftlength : `float`, optional
+            number of seconds in single FFT, defaults to half of the
+            duration (plus half of the ``overlap``), as for
+            :meth:`TimeSeries.coherence`
+        overlap : `float`, optional, default: `None`
+            number of seconds of overlap between FFTs, defaults to no
+            overlap
+        window : `str`, `numpy.ndarray`, optional
+            window function to apply to timeseries prior to FFT,
+            default is a (symmetric) Hann window of the relevant size
+        detrend : `str`, optional
+            type of detrending to apply to each segment, default is to
+            not detrend
+        nproc : `int`, `~gwpy.parallel.Executor`, optional, default: ``1``
+            number of parallel processes across which to distribute
+            the calculation
+        asarray : `bool`, optional, default: `False`
+            return a 2-D `numpy.ndarray` instead of a `dict`
+
+        Returns
+        -------
+        coherence : `dict`, `numpy.ndarray`
+            either a `dict` of (key, `~gwpy.spectrum.Spectrum`) pairs,
+            or a 2-D array with one row for each key (in order), padded
+            with NaN above the Nyquist frequency of each row
+
+        Notes
+        -----
+        As with :meth:`TimeSeries.coherence`, if the target and another
+        channel have different sampling rates, the higher rate series
+        will be down-sampled to match the lower.
+
+        See Also
+        --------
+        TimeSeries.coherence
+            for details of the coherence calculation for a single pair
+        """
+        if overlap is None:
+            overlap = 0
+        return self._one_vs_many(
+            'coherence', target, fftlength, overlap, nproc=nproc,
+            asarray=asarray, window=window, detrend=detrend)
+
+    def csd(self, target, fftlength=None, overlap=None, window='hanning',
+            detrend='constant', scaling='density', nproc=1, asarray=False):
+        """Calculate the CSD of a target with every other channel
+
+        The target is resampled and Fourier transformed only once for
+        each distinct sampling rate, and all other channels at a given
+        rate are resampled together, and transformed as a batch with a
+        single FFT call (per block of channels if the data are large).
+
+        Parameters
+        ----------
+        target : `str`, `TimeSeries`
+            the key of the target channel in this dict, or a separate
+            `TimeSeries`, which must cover the same span as the entries
+            in this dict
+        fftlength : `float`, optional, default: `TimeSeries.duration`
+            number of seconds in single FFT, defaults to a single FFT
+        overlap : `float`, optional
+            number of seconds of overlap between FFTs, defaults to half
+            of ``fftlength``
+        window : `str`, `numpy.ndarray`, optional, default: ``'hanning'``
+            window function to apply to timeseries prior to FFT
+        detrend : `str`, optional, default: ``'constant'``
+            type of detrending to apply to each segment
+        scaling : `str`, optional, default: ``'density'``
+            one of ``'density'`` for a CSD or ``'spectrum'`` for a
+            cross-power spectrum
+        nproc : `int`, `~gwpy.parallel.Executor`, optional, default: ``1``
+            number of parallel processes across which to distribute
+            the calculation
+        asarray : `bool`, optional, default: `False`
+            return a 2-D `numpy.ndarray` instead of a `dict`
+
+        Returns
+        -------
+        csd : `dict`, `numpy.ndarray`
+            either a `dict` of (key, `~gwpy.spectrum.Spectrum`) pairs,
+            or a 2-D complex array with one row for each key (in order),
+            padded with NaN above the Nyquist frequency of each row
+
+        See Also
+        --------
+        TimeSeries.csd
+            for details of the CSD calculation for a single pair
+        """
+        return self._one_vs_many(
+            'csd', target, fftlength, overlap, nproc=nproc, asarray=asarray,
+            window=window, detrend=detrend, scaling=scaling)
+
+    def _one_vs_many(self, method, target, fftlength, overlap, nproc=1,
+                     asarray=False, **kwargs):
+        """Calculate a cross-spectral quantity of a target against
+        every other entry in this dict
+        """
+        from ..spectrum import (Spectrum, scale_timeseries_units)
+        from ..spectrum.batch import (column_ffts, coherence_defaults,
+                                      format_window)
+        # find target and others
+        if not isinstance(target, TimeSeries):
+            target = self[target]
+        others = OrderedDict((key, ts) for key, ts in self.items() if
+                             ts is not target)
+        if not others:
+            raise ValueError("No channels against which to calculate %s"
+                             % method)
+        # spans must match to within half a sample at the higher rate
+        for key, ts in others.items():
+            tol = min(ts.dx.to('s').value, target.dx.to('s').value) / 2.
+            if any(abs(float(a) - float(b)) >= tol for
+                   a, b in zip(ts.span, target.span)):
+                raise ValueError("Cannot calculate %s for %r, which has a "
+                                 "different span to the target"
+                                 % (method, key))
+        if isinstance(fftlength, units.Quantity):
+            fftlength = fftlength.to('s').value
+        if isinstance(overlap, units.Quantity):
+            overlap = overlap.to('s').value
+        if fftlength is None and method == 'coherence':
+            fftlength = (target.duration.value + overlap) / 2.
+        elif fftlength is None:
+            fftlength = target.duration.value
+
+        # group channels by the rate at which each pair is compared
+        trate = target.sample_rate.to('Hz').value
+        groups = OrderedDict()
+        for key, ts in others.items():
+            rate = min(ts.sample_rate.to('Hz').value, trate)
+            groups.setdefault(rate, []).append(key)
+
+        # split groups into tasks, several for each process, sharing
+        # the resampled target and its FFT for each group
+        executor = parallel.get_executor(nproc)
+        nsplit = max(1, executor.nworkers // len(groups))
+        tasks = []
+        for rate, keys in groups.items():
+            nfft = int(fftlength * rate)
+            if overlap is None:
+                noverlap = nfft // 2
+            else:
+                noverlap = int(overlap * rate)
+            if method == 'coherence':
+                window, detrend = coherence_defaults(
+                    nfft, kwargs['window'], kwargs['detrend'])
+            else:
+                window = format_window(kwargs['window'], nfft)
+                detrend = kwargs['detrend']
+            x = target.value
+            if trate != rate:
+                x = _resample_array(x, trate, rate)
+            xfft = column_ffts(x, x.size, nfft, noverlap, window=window,
+                               detrend=detrend)
+            for chunk in parallel.chunks(len(keys), nsplit):
+                tasks.append((rate, nfft, noverlap, x, xfft, [
+                    (key, others[key].sample_rate.to('Hz').value,
+                     others[key].value) for key in keys[chunk]]))
+
+        # calculate, in parallel if requested
+        results = executor.map(
+            partial(_one_vs_many, method=method, kwargs=kwargs), tasks)
+
+        # format output
+        if asarray:
+            nfreq = max(r[2].shape[1] for r in results)
+            dtype = complex if method == 'csd' else float
+            out = numpy.empty((len(others), nfreq), dtype=dtype)
+            out.fill(numpy.nan)
+            index = dict((key, i) for i, key in enumerate(others))
+            for rate, keys, data in results:
+                out[[index[k] for k in keys], :data.shape[1]] = data
+            return out
+        out = OrderedDict((key, None) for key in others)
+        for rate, keys, data in results:
+            df = rate / int(fftlength * rate)
+            for key, row in zip(keys, data):
+                other = others[key]
+                if method == 'coherence':
+                    name = 'Coherence between %s and %s' % (target.name,
+                                                            other.name)
+                    unit = 'coherence'
+                else:
+                    name = '%s---%s' % (target.name, other.name)
+                    unit = scale_timeseries_units(
+                        target.unit, kwargs.get('scaling', 'density'))
+                out[key] = Spectrum(row, f0=0, df=df, unit=unit,
+                                    name=name, epoch=target.epoch,
+                                    channel=target.channel)
+        return out
+
 
 class TimeSeriesList(TimeSeriesBaseList):
     __doc__ = TimeSeriesBaseDict.__doc__.replace('TimeSeriesBase',
                                                  'TimeSeries')
     EntryClass = TimeSeries
+
+
+# -- utilities ----------------------------------------------------------------
+
+def _spectrogram(chunk, stride, fftlength, overlap, method, nsamp, nfft,
+                 noverlap, batched, kwargs):
+    """Generate a `Spectrogram` from one chunk of a `TimeSeries`
+
+    This is the worker for `TimeSeries.spectrogram`, ``chunk`` is a
+    ``(timeseries, cross)`` pair, with ``cross=None`` for a power spectrogram.
+    """
+    from ..spectrum.utils import scale_timeseries_units
+    from ..spectrum.batch import welch_spectrogram
+    from ..spectrogram import Spectrogram
+    ts, cts = chunk
+
+    # calculate specgram parameters
+    dt = stride
+    df = 1 / fftlength
+
+    # get size of spectrogram
+    nsteps = int(ts.size // nsamp)
+    nfreqs = int(fftlength * ts.sample_rate.value // 2 + 1)
+
+    # generate output spectrogram
+    unit = scale_timeseries_units(ts.unit, kwargs.get('scaling', 'density'))
+    dtype = numpy.float64 if cts is None else complex
+    out = Spectrogram(numpy.zeros((nsteps, nfreqs)), dtype=dtype,
+                      unit=unit, channel=ts.channel, epoch=ts.epoch,
+                      f0=0, df=df, dt=dt, copy=False)
+
+    if not nsteps:
+        return out
+
+    # calculate all PSDs in a single batch where possible
+    if cts is None and batched:
+        out.value[:] = welch_spectrogram(
+            ts.value, nsamp, nfft, noverlap=noverlap,
+            sample_rate=ts.sample_rate.decompose().value, **kwargs)
+        return out
+
+    # stride through TimeSeries, calculating PSDs or CSDs
+    if cts is not None and method not in (None, 'welch'):
+        warn("Cannot calculate cross spectral density using "
+             "the %r method. Using 'welch' instead..." % method)
+    for step in range(nsteps):
+        # find step TimeSeries
+        idx = nsamp * step
+        idx_end = idx + nsamp
+        stepseries = ts[idx:idx_end]
+        if cts is None:
+            stepsd = stepseries.psd(fftlength=fftlength, overlap=overlap,
+                                    method=method, **kwargs)
+        else:
+            otherstepseries = cts[idx:idx_end]
+            stepsd = stepseries.csd(otherstepseries, fftlength=fftlength,
+                                    overlap=overlap, **kwargs)
+        out.value[step, :] = stepsd.value
+    return out
+
+
+def _one_vs_many(task, method, kwargs):
+    """Calculate the coherence or CSD of one target against many others
+
+    This is the worker for `TimeSeriesDict.coherence` and
+    `TimeSeriesDict.csd`, ``task`` is a ``(rate, nfft, noverlap, target,
+    target_fft, others)`` tuple, where ``target`` has already been
+    resampled to ``rate``, ``target_fft`` is its segment FFTs, as returned
+    by `~gwpy.spectrum.batch.column_ffts`, and ``others`` is a list of
+    ``(key, sample_rate, data)`` for each other channel.
+
+    Returns
+    -------
+    rate : `float`
+        the rate at which the calculation was performed
+    keys : `list`
+        the key of each other channel
+    data : `numpy.ndarray`
+        the 2-D array of (key, frequency) results
+    """
+    from ..spectrum.batch import (coherence_spectrogram, csd_spectrogram,
+                                  num_segments)
+    rate, nfft, noverlap, x, xfft, others = task
+    keys = [key for key, _, _ in others]
+    # stack and resample channels with matching rates together
+    blocks = []
+    for inrate in set(r for _, r, _ in others):
+        idx = [i for i, (_, r, _) in enumerate(others) if r == inrate]
+        block = numpy.vstack([others[i][2] for i in idx])
+        if inrate != rate:
+            block = _resample_array(block, inrate, rate)
+        blocks.append((idx, block))
+    # resampling can leave arrays differing by a sample, so crop to fit
+    size = min([x.size] + [block.shape[1] for _, block in blocks])
+    x = x[:size]
+    # cropping the target can only drop trailing segments
+    xfft = xfft[:, :num_segments(size, nfft, noverlap)]
+    y = numpy.empty((len(others), size),
+                    dtype=numpy.result_type(x, *[b for _, b in blocks]))
+    for idx, block in blocks:
+        y[idx] = block[:, :size]
+    if method == 'coherence':
+        out = coherence_spectrogram(x, y, x.size, nfft, noverlap=noverlap,
+                                    xfft=xfft, **kwargs)
+    else:
+        out = csd_spectrogram(x, y, x.size, nfft, noverlap=noverlap,
+                              sample_rate=rate, xfft=xfft, **kwargs)
+    return rate, keys, out[:, 0]
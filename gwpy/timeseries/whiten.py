@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Overlap-add whitening of time-series data against a fixed ASD
+"""
+
+from __future__ import division
+
+import numpy
+from numpy.lib.stride_tricks import as_strided
+
+from astropy import units
+
+from ..fft import irfft
+from ..spectrum.batch import (format_window, num_segments, _rfft_block)
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+__all__ = ['Whitener']
+
+
+class Whitener(object):
+    """Whiten time-series data against a fixed amplitude spectral density
+
+    The input data are split into overlapping segments, each of which is
+    detrended, windowed, Fourier transformed, divided by the ASD, and
+    transformed back, with the results overlap-added into the output.
+    All segments of a single input are transformed as one batch.
+
+    A `Whitener` can be used to whiten complete series in one go (with
+    :meth:`~Whitener.whiten`), or fed consecutive chunks of a stream (with
+    :meth:`~Whitener.feed`), in which case the concatenated outputs are
+    identical to whitening the concatenated inputs.
+
+    Parameters
+    ----------
+    asd : `~gwpy.spectrum.Spectrum`, `numpy.ndarray`
+        the amplitude spectral density against which to whiten,
+        of length ``fftlength * sample_rate // 2 + 1``
+    sample_rate : `float`, `~astropy.units.Quantity`
+        the sampling rate of the data to be whitened
+    fftlength : `float`
+        number of seconds in single FFT
+    overlap : `float`, optional, default: ``0``
+        number of seconds by which to overlap neighbouring FFTs
+    window : `str`, `numpy.ndarray`, optional, default: ``'hanning'``
+        name of the window function to use, or an array of length
+        ``fftlength * sample_rate`` to use as the window
+    detrend : `str`, optional, default: ``'constant'``
+        type of detrending to apply to each segment
+
+    See Also
+    --------
+    TimeSeries.whiten
+        for the simple interface to whitening a single series
+
+    Examples
+    --------
+    To whiten each new second of data from a stream, using an ASD
+    estimated once from some reference data:
+
+    >>> from gwpy.timeseries import Whitener
+    >>> whitener = Whitener.from_timeseries(reference, 2, 1)
+    >>> for chunk in stream:
+    ...     white = whitener.feed(chunk)
+    """
+    def __init__(self, asd, sample_rate, fftlength, overlap=0,
+                 window='hanning', detrend='constant'):
+        if isinstance(sample_rate, units.Quantity):
+            sample_rate = sample_rate.to('Hz').value
+        if isinstance(fftlength, units.Quantity):
+            fftlength = fftlength.to('s').value
+        if isinstance(overlap, units.Quantity):
+            overlap = overlap.to('s').value
+        self.sample_rate = float(sample_rate)
+        self.nfft = int(fftlength * self.sample_rate)
+        self.noverlap = int(overlap * self.sample_rate)
+        if self.noverlap >= self.nfft:
+            raise ValueError("overlap must be less than fftlength")
+        self.detrend = detrend
+        self.window = format_window(window, self.nfft)
+
+        # build frequency-domain filter, including the normalisation
+        # applied by TimeSeries.fft
+        if isinstance(asd, units.Quantity):
+            asd = asd.value
+        asd = numpy.asarray(asd)
+        if asd.shape != (self.nfft // 2 + 1,):
+            raise ValueError("ASD has %d samples, expected %d for "
+                             "fftlength=%s and sample_rate=%s"
+                             % (asd.size, self.nfft // 2 + 1, fftlength,
+                                self.sample_rate))
+        self.filter = 1. / asd / self.nfft
+        self.filter[1:] *= 2
+        self.reset()
+
+    @classmethod
+    def from_timeseries(cls, timeseries, fftlength, overlap=0,
+                        method='welch', window='hanning', detrend='constant',
+                        **kwargs):
+        """Build a `Whitener` using the ASD of the given `TimeSeries`
+
+        Parameters
+        ----------
+        timeseries : `TimeSeries`
+            the data from which to estimate the ASD
+        fftlength : `float`
+            number of seconds in single FFT
+        overlap : `float`, optional, default: ``0``
+            number of seconds by which to overlap neighbouring FFTs
+        method : `str`, optional, default: ``'welch'``
+            average spectrum method
+        window : `str`, `numpy.ndarray`, optional, default: ``'hanning'``
+            window function to use for both the ASD and the whitening
+        detrend : `str`, optional, default: ``'constant'``
+            type of detrending to apply to each whitening segment
+        **kwargs
+            other keyword arguments are passed to the `TimeSeries.asd`
+            method
+
+        Returns
+        -------
+        whitener : `Whitener`
+            a new `Whitener`
+        """
+        asd = timeseries.asd(fftlength, overlap=overlap, method=method,
+                             window=window, **kwargs)
+        return cls(asd, timeseries.sample_rate, fftlength, overlap=overlap,
+                   window=window, detrend=detrend)
+
+    @property
+    def nstride(self):
+        """Number of samples between the starts of neighbouring segments
+        """
+        return self.nfft - self.noverlap
+
+    def reset(self):
+        """Discard any buffered stream data
+        """
+        self._inbuf = numpy.zeros(0)
+        self._outbuf = numpy.zeros(self.noverlap)
+        self._meta = None
+        self._epoch = None
+
+    # -------------------------------------------
+    # whitening
+
+    def _whiten_array(self, data):
+        """Whiten all complete segments of the data array
+
+        Returns the overlap-added output of length
+        ``nseg * nstride + noverlap``, and the number of segments.
+        """
+        nfft = self.nfft
+        nstride = self.nstride
+        nseg = num_segments(data.size, nfft, self.noverlap)
+        out = numpy.zeros(nseg * nstride + self.noverlap)
+        if not nseg:
+            return out, nseg
+        step = data.strides[0]
+        segments = as_strided(data, shape=(nseg, nfft),
+                              strides=(nstride * step, step))
+        ffts = _rfft_block(segments, nfft, window=self.window,
+                           detrend=self.detrend)
+        ffts *= self.filter
+        blocks = irfft(ffts, n=nfft, axis=-1)
+        # overlap-add: each segment spans ``k`` strides, so add the
+        # blocks one stride-sized slice at a time
+        k = -(-nfft // nstride)
+        if k * nstride != nfft:
+            blocks = numpy.pad(blocks, ((0, 0), (0, k * nstride - nfft)),
+                               mode='constant')
+        blocks = blocks.reshape(nseg, k, nstride)
+        for j in range(k):
+            seg = out[j * nstride:(j + nseg) * nstride]
+            if seg.size < nseg * nstride:  # padded tail of last block
+                seg[:] += blocks[:, j].ravel()[:seg.size]
+            else:
+                seg.reshape(nseg, nstride)[:] += blocks[:, j]
+        return out, nseg
+
+    def whiten(self, data):
+        """Whiten a complete series of data
+
+        Only complete segments are used, so any samples after the end of
+        the last complete segment are dropped.
+
+        Parameters
+        ----------
+        data : `TimeSeries`, `numpy.ndarray`
+            the input data
+
+        Returns
+        -------
+        out : `TimeSeries`, `numpy.ndarray`
+            the whitened data, of the same type as the input
+        """
+        out = self._whiten_array(numpy.asarray(data, dtype=float))[0]
+        return self._format_output(out, data)
+
+    def feed(self, data):
+        """Whiten the next chunk of a data stream
+
+        Samples are only returned once every segment that overlaps them
+        has been processed, so each output lags the input by up to
+        ``nfft`` samples; call :meth:`~Whitener.flush` at the end of the
+        stream to retrieve the remainder.
+
+        Parameters
+        ----------
+        data : `TimeSeries`, `numpy.ndarray`
+            the next chunk of input data, directly following the previous
+            chunk
+
+        Returns
+        -------
+        out : `TimeSeries`, `numpy.ndarray`
+            the newly completed whitened samples, which may be empty
+        """
+        if self._epoch is None and hasattr(data, 'epoch'):
+            self._epoch = data.epoch.gps
+        if hasattr(data, 'copy_metadata'):
+            self._meta = data
+        buf = numpy.concatenate((self._inbuf,
+                                 numpy.asarray(data, dtype=float)))
+        out, nseg = self._whiten_array(buf)
+        if not nseg:
+            self._inbuf = buf
+            return self._emit(numpy.zeros(0))
+        nout = nseg * self.nstride
+        out[:self.noverlap] += self._outbuf
+        self._outbuf = out[nout:].copy()
+        self._inbuf = buf[nout:].copy()
+        return self._emit(out[:nout])
+
+    def flush(self):
+        """Return the final whitened samples of a stream, and reset
+
+        Returns
+        -------
+        out : `TimeSeries`, `numpy.ndarray`
+            the ``noverlap`` whitened samples not yet returned by
+            :meth:`~Whitener.feed`
+        """
+        out = self._emit(self._outbuf)
+        self.reset()
+        return out
+
+    def _emit(self, out):
+        """Format streamed output, and advance the stream epoch
+        """
+        new = self._format_output(out, self._meta, epoch=self._epoch)
+        if self._epoch is not None:
+            self._epoch += out.size / self.sample_rate
+        return new
+
+    @staticmethod
+    def _format_output(out, like, epoch=None):
+        """Format an output array to match the metadata of the input
+        """
+        if not hasattr(like, 'copy_metadata'):
+            return out
+        new = type(like)(out)
+        new.__dict__ = like.copy_metadata()
+        if epoch is not None:
+            new.epoch = epoch
+        try:
+            del new.times
+        except AttributeError:
+            pass
+        return new
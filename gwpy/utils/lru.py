@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Duncan Macleod (2013)
+#
+# This file is part of GWpy.
+#
+# GWpy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GWpy is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GWpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Size-bounded, least-recently-used caches
+
+These are shared by the spectral methods (for FFT windows and plans) and
+the resampling methods (for anti-aliasing filters), so live here rather
+than in either package, to avoid an import cycle between them.
+"""
+
+from threading import Lock
+
+from .compat import OrderedDict
+from .. import version
+__author__ = 'Duncan Macleod <duncan.macleod@ligo.org>'
+__version__ = version.version
+
+__all__ = ['LRUCache', 'window_key']
+
+
+class LRUCache(object):
+    """A size-bounded, least-recently-used cache
+
+    Parameters
+    ----------
+    maxsize : `int`, optional, default: ``32``
+        maximum number of entries to store
+
+    Attributes
+    ----------
+    hits : `int`
+        number of requests served from the cache
+    misses : `int`
+        number of requests that required a new entry to be generated
+    """
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, factory, *args, **kwargs):
+        """Return the cached entry for ``key``, generating it if needed
+
+        Parameters
+        ----------
+        key : `tuple`
+            hashable key for this entry
+        factory : `callable`
+            method to call to generate the entry on a cache miss
+        *args, **kwargs
+            other arguments are passed to ``factory``
+
+        Returns
+        -------
+        value : `object`
+            the cached entry
+        """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                pass
+            else:
+                self._data[key] = value  # move to most-recently-used
+                self.hits += 1
+                return value
+        value = factory(*args, **kwargs)
+        with self._lock:
+            self.misses += 1
+            self._data[key] = value
+            while len(self._data) > max(self.maxsize, 0):
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Empty this cache, and reset the hit/miss counters
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Return the current statistics for this cache
+
+        Returns
+        -------
+        info : `dict`
+            `dict` of ``hits``, ``misses``, ``size``, and ``maxsize``
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self), 'maxsize': self.maxsize}
+
+
+def window_key(window):
+    """Format a window specification into a hashable cache key
+    """
+    if isinstance(window, (list, tuple)):
+        return tuple(window)
+    return window